@@ -0,0 +1,7 @@
+"""Puts backend/ on sys.path so these scripts reuse its embedding cache and pooled HTTP clients."""
+import sys
+from pathlib import Path
+
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent / "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
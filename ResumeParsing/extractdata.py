@@ -1,11 +1,17 @@
 import fitz  # PyMuPDF
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
+
+# Use the backend's pooled OpenAI client
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+from llm_scheduler import estimate_tokens, get_scheduler
+from openai_clients import get_sync_openai_client
 
 # Load API Key
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_sync_openai_client()
 
 def extract_text_and_images(pdf_path: str, output_dir: str = "images") -> dict:
     doc = fitz.open(pdf_path)
@@ -50,12 +56,16 @@ Resume Images:
 Return the result in structured Markdown format.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that extracts structured info from resumes."},
-            {"role": "user", "content": prompt}
-        ]
+    # The shared client has SDK retries off; the scheduler handles rate limits and backoff
+    response = get_scheduler().call(
+        lambda: client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that extracts structured info from resumes."},
+                {"role": "user", "content": prompt}
+            ]
+        ),
+        estimate_tokens([prompt]),
     )
 
     return response.choices[0].message.content
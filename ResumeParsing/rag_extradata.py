@@ -2,10 +2,13 @@ import os
 import fitz  # PyMuPDF
 from dotenv import load_dotenv
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from langchain_openai import ChatOpenAI
 from langchain_community.vectorstores import FAISS
 from langchain.chains import RetrievalQA
 
+import _backend_path  # noqa: F401
+from openai_clients import get_http_client, get_sync_http_client, openai_embeddings
+
 # Load API Key from .env
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -40,11 +43,11 @@ def build_rag_pipeline(resume_text: str) -> RetrievalQA:
     splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
     resume_chunks = splitter.split_text(resume_text)
 
-    embeddings = OpenAIEmbeddings()
+    embeddings = openai_embeddings()
     vectorstore = FAISS.from_texts(resume_chunks, embedding=embeddings)
 
     qa_chain = RetrievalQA.from_chain_type(
-        llm=ChatOpenAI(model="gpt-4o-mini"),
+        llm=ChatOpenAI(model="gpt-4o-mini", http_client=get_sync_http_client(), http_async_client=get_http_client()),
         retriever=vectorstore.as_retriever(),
         return_source_documents=True
     )
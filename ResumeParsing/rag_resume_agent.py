@@ -2,16 +2,19 @@ import os
 import fitz  # PyMuPDF
 from dotenv import load_dotenv
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from langchain_openai import ChatOpenAI
 from langchain_community.vectorstores import FAISS
 from langchain.chains import RetrievalQA
+
+import _backend_path  # noqa: F401
+from openai_clients import get_http_client, get_sync_http_client, openai_embeddings, openai_model
+from llm_agents.agent_cache import run_agent
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 import asyncio
 
-# Load API Key from .env
+# Load API Key from .env (read by the shared OpenAI client)
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # ----------- Step 1: Extract text and images from PDF -----------
 def extract_text_and_images(pdf_path: str, output_dir: str = "images") -> dict:
@@ -47,11 +50,11 @@ def build_rag_pipeline(resume_text: str) -> RetrievalQA:
     for i, chunk in enumerate(resume_chunks):
         print(f"\n--- Chunk {i + 1} ---\n{chunk}\n")
 
-    embeddings = OpenAIEmbeddings()
+    embeddings = openai_embeddings()
     vectorstore = FAISS.from_texts(resume_chunks, embedding=embeddings)
 
     qa_chain = RetrievalQA.from_chain_type(
-        llm=ChatOpenAI(model="gpt-4o-mini"),
+        llm=ChatOpenAI(model="gpt-4o-mini", http_client=get_sync_http_client(), http_async_client=get_http_client()),
         retriever=vectorstore.as_retriever(),
         return_source_documents=True
     )
@@ -70,8 +73,7 @@ class ResumeAgentOutput(BaseModel):
     summary: str = Field(..., description="Short summary of the candidate.")
 
 resume_agent = Agent(
-    "openai:gpt-4o-mini",
-    api_key=OPENAI_API_KEY,
+    openai_model("gpt-4o-mini"),
     output_type=ResumeAgentOutput,
     system_prompt=(
         "You are an expert career assistant. Based ONLY on the provided resume text, "
@@ -82,8 +84,7 @@ resume_agent = Agent(
 )
 
 async def extract_with_agent(text):
-    result = await resume_agent.run(text)
-    return result.output
+    return await run_agent(resume_agent, text)
 
 
 # ----------- Main Runner -----------
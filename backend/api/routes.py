@@ -2,44 +2,85 @@
 FastAPI routes for Personalized Learning Marketplace backend.
 Exposes pipeline as an async API endpoint.
 """
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from pydantic import BaseModel
-from graph.dag import run_full_pipeline
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from graph.dag import run_full_pipeline, iter_graph, select_nodes
+from graph.batch import iter_batch
 from llm_agents.quiz_agent import get_quiz, validate_quiz_answers, QuizQuestion
-from embeddings.utils import extract_resume_text
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional
+import settings
+import json
 from resume_parser_main import process_resume
+from course_retriever import retrieval_cache_stats
+from embeddings.cache import get_embedding_cache
+from llm_agents.agent_cache import agent_cache_stats
+from storage import SessionStore, get_session_store
+from llm_scheduler import scheduler_stats
+from openai_clients import pool_stats
 
 router = APIRouter()
 
-# Simple in-memory XP/badge store for demo (keyed by user_id)
-USER_XP = {}
-USER_BADGES = {}
-
 import uuid
+import asyncio
+import hashlib
+
+# Session store namespaces (storage.py; memory or SQLite backend, bounded and TTL'd)
+RESUMES = "resumes"              # resume_id -> parsed resume result
+RESUME_HASHES = "resume_hashes"  # sha256 of uploaded file bytes -> resume_id
+USER_PROGRESS = "user_progress"  # user_id -> {"xp": int, "badges": [...]}
+
+_INFLIGHT_UPLOADS: Dict[str, asyncio.Task] = {}
 
-RESUME_STORE = {}
+async def _in_store(fn: Callable[[SessionStore], Any]) -> Any:
+    """Runs fn(store) in a worker thread; the SQLite backend blocks on disk I/O and other writers' locks."""
+    return await asyncio.to_thread(lambda: fn(get_session_store()))
+
+def _upload_response(resume_id: str, result: Dict) -> Dict:
+    return {"resume_id": resume_id,  "name": result["name"],
+        "avatarUri": result["avatarUri"],
+        "summary": result["summary"],
+        "skills": result["skills"]}
 
 @router.post("/upload-resume")
 async def upload_resume(file: UploadFile = File(...)):
     print(f"[UPLOAD] Received upload request: filename={file.filename}, content_type={file.content_type}")
     try:
         file_bytes = await file.read()
+        fingerprint = hashlib.sha256(file_bytes).hexdigest()
+
+        resume_id = await _in_store(lambda store: store.get(RESUME_HASHES, fingerprint))
+        stored = await _in_store(lambda store: store.get(RESUMES, resume_id)) if resume_id else None
+        if stored is not None:
+            print(f"[UPLOAD] Duplicate upload; returning stored resume_id={resume_id}")
+            return _upload_response(resume_id, stored)
 
-        # Run the AI pipeline
-        result = await process_resume(file_bytes, file.filename)
+        # Run the AI pipeline (concurrent uploads of the same file share one run)
+        task = _INFLIGHT_UPLOADS.get(fingerprint)
+        if task is None:
+            task = asyncio.ensure_future(process_resume(file_bytes, file.filename))
+            _INFLIGHT_UPLOADS[fingerprint] = task
+            task.add_done_callback(lambda _: _INFLIGHT_UPLOADS.pop(fingerprint, None))
+        # Reason: shield so one client disconnecting doesn't cancel the run for the others
+        result = await asyncio.shield(task)
         if result is None:
             raise HTTPException(status_code=400, detail="Failed to process resume.")
 
-        resume_id = str(uuid.uuid4())
-        print(result)
-        RESUME_STORE[resume_id] = result  # Store full result instead of raw text
+        def save(store: SessionStore) -> str:
+            resume_id = store.get(RESUME_HASHES, fingerprint)
+            if resume_id is None or store.get(RESUMES, resume_id) is None:
+                resume_id = str(uuid.uuid4())
+                store.set(RESUMES, resume_id, result)  # Store full result instead of raw text
+                store.set(RESUME_HASHES, fingerprint, resume_id)
+            return resume_id
+
+        resume_id = await _in_store(save)
 
         print(f"[UPLOAD] Successfully processed and stored resume_id={resume_id}")
-        return {"resume_id": resume_id,  "name": result["name"],
-            "avatarUri": result["avatarUri"],
-            "summary": result["summary"],
-            "skills": result["skills"]}
+        return _upload_response(resume_id, result)
+    except HTTPException:
+        raise
     except ValueError as e:
         print(f"[UPLOAD] ValueError: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -51,9 +92,14 @@ class PipelineRequest(BaseModel):
     resume_id: str
     chat_transcript: str
 
+class BatchPipelineRequest(BaseModel):
+    items: List[PipelineRequest]
+    # Max items in flight; capped at settings.BATCH_CONCURRENCY
+    concurrency: Optional[int] = Field(None, ge=1)
+
 @router.get("/get-resume-text/{resume_id}")
 async def get_resume_text(resume_id: str):
-    data = RESUME_STORE.get(resume_id)
+    data = await _in_store(lambda store: store.get(RESUMES, resume_id))
     if not data:
         raise HTTPException(status_code=404, detail="Resume not found")
     return data
@@ -70,32 +116,37 @@ class QuizSubmitRequest(BaseModel):
     quiz: List[Dict]
     answers: List[str]
 
-@router.post("/recommend-bundle")
-async def recommend_bundle(request: PipelineRequest):
-    """
-    Runs the full pipeline and returns a module-level personalized learning bundle.
-    Response includes summary, skills, skill gap, and recommended_modules (with course/module/subtopics/rationale).
-    """
-    resume_data = RESUME_STORE.get(request.resume_id)
+INSUFFICIENT_CONTEXT = "Insufficient context. Please tell me more about your learning goals."
 
-    resume_text = f"""
+async def _resume_text(resume_id: str) -> str:
+    resume_data = await _in_store(lambda store: store.get(RESUMES, resume_id))
+    if not resume_data:
+        raise HTTPException(status_code=400, detail="Invalid or expired resume_id.")
+    return f"""
     Name: {resume_data.get("name", "Unknown")}
     Summary: {resume_data.get("summary", "Not provided")}
     Skills: {', '.join(resume_data.get("skills", []))}
-    """
+    """.strip()
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
 
-    if not resume_text:
-        raise HTTPException(status_code=400, detail="Invalid or expired resume_id.")
-    state = await run_full_pipeline(resume_text.strip(), request.chat_transcript)
-    if not state.target_role:
-        raise HTTPException(status_code=400, detail="Insufficient context. Please tell me more about your learning goals.")
+@router.post("/recommend-bundle")
+async def recommend_bundle(request: PipelineRequest):
+    """
+    Runs the full pipeline and returns a module-level personalized learning bundle.
+    Response includes summary, skills, skill gap, and recommended_modules (with course/module/subtopics/rationale).
+    """
+    resume_text = await _resume_text(request.resume_id)
+    state = await run_full_pipeline(resume_text, request.chat_transcript)
+    return _bundle_response(state)
 
-    if not state.goal_skills:
-        raise HTTPException(status_code=400, detail="Insufficient context. Please tell me more about your learning goals.")
+def _has_profile(values: Dict) -> bool:
+    return bool(values.get("target_role") and values.get("goal_skills") and values.get("budget_eur"))
 
-    if not state.budget_eur:
-        raise HTTPException(status_code=400, detail="Insufficient context. Please tell me more about your learning goals.")
+def _bundle_response(state) -> Dict:
+    if not _has_profile(dict(state)):
+        raise HTTPException(status_code=400, detail=INSUFFICIENT_CONTEXT)
 
     return {
 #       "summary": state.summary,
@@ -105,9 +156,95 @@ async def recommend_bundle(request: PipelineRequest):
         "budget_eur": state.budget_eur,
 #        "skills_gap": state.skills_gap,
         "recommended_modules": state.recommended_modules or [],
+        "course_selection": state.course_selection,
+        "timings": state.timings,
 #        "final_bundle": state.final_bundle or [],
     }
 
+@router.post("/recommend-bundle/batch")
+async def recommend_bundle_batch(request: BatchPipelineRequest):
+    """
+    Runs /recommend-bundle for many (resume_id, chat_transcript) pairs and streams NDJSON,
+    one line per input item as it completes: {"index", "resume_id", "status", "result" | "detail"}.
+    Identical inputs run once; candidate retrieval is batched across the whole request (graph/batch.py).
+    """
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_ITEMS} items per batch.")
+    concurrency = min(request.concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_CONCURRENCY)
+
+    def line(index: int, status: int, **body) -> str:
+        payload = {"index": index, "resume_id": request.items[index].resume_id, "status": status, **body}
+        return json.dumps(jsonable_encoder(payload), ensure_ascii=False) + "\n"
+
+    async def results():
+        # Reason: Dedupe on the resolved resume text so re-uploads under another resume_id also collapse
+        groups: Dict[tuple, List[int]] = {}
+        for index, item in enumerate(request.items):
+            try:
+                groups.setdefault((await _resume_text(item.resume_id), item.chat_transcript), []).append(index)
+            except HTTPException as e:
+                yield line(index, e.status_code, detail=e.detail)
+        inputs = list(groups)
+        print(f"[BATCH] {len(request.items)} items, {len(inputs)} unique, concurrency={concurrency}")
+        async for position, outcome in iter_batch(inputs, concurrency, should_continue=_has_profile):
+            for index in groups[inputs[position]]:
+                if isinstance(outcome, Exception):
+                    print(f"[BATCH] Item {index} failed: {outcome}")
+                    yield line(index, 500, detail="Recommendation failed due to a server error.")
+                    continue
+                try:
+                    yield line(index, 200, result=_bundle_response(outcome))
+                except HTTPException as e:
+                    yield line(index, e.status_code, detail=e.detail)
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@router.post("/recommend-bundle/stream")
+async def recommend_bundle_stream(request: PipelineRequest, http_request: Request):
+    """
+    Server-sent-events variant of /recommend-bundle. Emits, as each stage completes:
+    `profile` (target_role, goal_skills, budget_eur), `candidates` (retrieved modules),
+    one `module` per ModuleRecommendation, `selection` (fast path or LLM, with confidence),
+    then `done` (per-stage timings) or `error`.
+    Remaining stages are cancelled if the client disconnects.
+    """
+    resume_text = await _resume_text(request.resume_id)
+
+    async def events():
+        values = {"resume_text": resume_text, "chat_transcript": request.chat_transcript}
+        timings = {}
+        graph = iter_graph(select_nodes(), values)
+        try:
+            async for name, outputs, elapsed in graph:
+                timings[name] = round(elapsed, 4)
+                if await http_request.is_disconnected():
+                    print(f"[STREAM] Client disconnected after stage={name}; cancelling remaining stages")
+                    return
+                if name == "conversation":
+                    if not (outputs["target_role"] and outputs["goal_skills"] and outputs["budget_eur"]):
+                        yield _sse("error", {"detail": INSUFFICIENT_CONTEXT})
+                        return
+                    yield _sse("profile", outputs)
+                elif name == "course_candidates":
+                    yield _sse("candidates", {"modules": outputs["candidate_modules"]})
+                elif name == "course_retrieval":
+                    for module in outputs["recommended_modules"]:
+                        yield _sse("module", module.dict())
+                    yield _sse("selection", outputs["course_selection"])
+            yield _sse("done", {"timings": timings})
+        except Exception as e:
+            print(f"[STREAM] Pipeline error: {e}")
+            yield _sse("error", {"detail": "Recommendation failed due to a server error."})
+        finally:
+            # Reason: Cancels any stage still running (LLM calls) when the stream ends early
+            await graph.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.post("/quiz")
 async def get_quiz_endpoint(request: QuizRequest):
     quiz_output = await get_quiz(request.current_skill, request.module_title)
@@ -119,12 +256,39 @@ async def submit_quiz(request: QuizSubmitRequest):
     quiz_objs = [QuizQuestion(**q) for q in request.quiz]
     result = validate_quiz_answers(quiz_objs, request.answers)
     # XP/badge logic (simple): +10 XP per correct, badge if perfect
-    user_id = request.user_id
-    USER_XP[user_id] = USER_XP.get(user_id, 0) + int(result["correct"]) * 10
-    if result["score"] == 1.0:
-        USER_BADGES.setdefault(user_id, set()).add("Quiz Master")
-    return {"score": result["score"], "correct": result["correct"], "total": result["total"], "xp": USER_XP[user_id], "badges": list(USER_BADGES.get(user_id, []))}
+    earned_xp = int(result["correct"]) * 10
+    perfect = result["score"] == 1.0
+
+    def apply(progress):
+        progress = dict(progress or {"xp": 0, "badges": []})
+        progress["xp"] = progress.get("xp", 0) + earned_xp
+        if perfect and "Quiz Master" not in progress["badges"]:
+            progress["badges"] = progress["badges"] + ["Quiz Master"]
+        return progress
+
+    # Reason: Atomic read-modify-write so concurrent submissions (or workers) don't lose XP
+    progress = await _in_store(lambda store: store.update(USER_PROGRESS, request.user_id, apply))
+    return {"score": result["score"], "correct": result["correct"], "total": result["total"], "xp": progress["xp"], "badges": progress["badges"]}
 
 @router.get("/xp/{user_id}")
 async def get_xp(user_id: str):
-    return {"xp": USER_XP.get(user_id, 0), "badges": list(USER_BADGES.get(user_id, []))}
+    progress = await _in_store(lambda store: store.get(USER_PROGRESS, user_id)) or {"xp": 0, "badges": []}
+    return {"xp": progress["xp"], "badges": progress["badges"]}
+
+@router.get("/cache-stats")
+async def cache_stats():
+    return {
+        "retrieval": retrieval_cache_stats(),
+        "embeddings": get_embedding_cache().stats(),
+        "agents": agent_cache_stats(),
+    }
+
+@router.get("/scheduler-stats")
+async def get_scheduler_stats():
+    """Per-lane queue depth, wait times and retries of the shared LLM scheduler."""
+    return scheduler_stats()
+
+@router.get("/http-pool-stats")
+async def get_http_pool_stats():
+    """Requests sent and open / idle / in-use connections of the shared OpenAI HTTP clients."""
+    return pool_stats()
@@ -0,0 +1,111 @@
+"""
+Import-time profile of the backend, from `python -X importtime` in a fresh interpreter.
+- Per top-level package: the summed self time of all its modules, i.e. what importing it costs
+  no matter which module pulled it in first.
+- Per backend module (first-party): cumulative time including everything it imported first.
+- The total is the cumulative time of the profiled module (default: main, the FastAPI app).
+- Import times are noisy, so the interpreter is started --repeat times and each figure is the median.
+Run from backend/: python -m benchmarks.import_profile [--module main] [--top 25] [--repeat 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+class ImportRow(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRow]:
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            indent = len(match.group(3))
+            rows.append(ImportRow(match.group(4), int(match.group(1)), int(match.group(2)), (indent - 1) // 2))
+    return rows
+
+
+def first_party_modules() -> set:
+    names = {p.stem for p in BACKEND_DIR.glob("*.py")}
+    names |= {p.name for p in BACKEND_DIR.iterdir() if (p / "__init__.py").exists()}
+    return names
+
+
+def profile_imports(module: str = "main", repeat: int = 1) -> List[ImportRow]:
+    """Median self / cumulative import time per module over `repeat` fresh interpreters."""
+    env = dict(os.environ)
+    # Reason: The agents build their OpenAI clients at import time and need a key to exist
+    env.setdefault("OPENAI_API_KEY", "sk-import-profile")
+    runs = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{process.stderr[-2000:]}")
+        runs.append({row.module: row for row in parse_importtime(process.stderr)})
+    return [
+        ImportRow(
+            name,
+            int(statistics.median(run[name].self_us for run in runs if name in run)),
+            int(statistics.median(run[name].cumulative_us for run in runs if name in run)),
+            row.depth,
+        )
+        for name, row in runs[0].items()
+    ]
+
+
+def summarize(rows: List[ImportRow], module: str, top: int) -> Dict:
+    first_party = first_party_modules()
+    by_package: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        by_package[row.module.split(".")[0]] += row.self_us
+    total = next((row.cumulative_us for row in rows if row.module == module), sum(r.self_us for r in rows))
+    packages = sorted(((p, us) for p, us in by_package.items() if p not in first_party), key=lambda x: -x[1])
+    own = sorted(((r.module, r.cumulative_us) for r in rows if r.module.split(".")[0] in first_party), key=lambda x: -x[1])
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 1),
+        "packages_ms": {p: round(us / 1000, 1) for p, us in packages[:top]},
+        "backend_modules_ms": {m: round(us / 1000, 1) for m, us in own[:top]},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report where import time goes when loading the backend.")
+    parser.add_argument("--module", default="main", help="Module to import (default: main, the FastAPI app).")
+    parser.add_argument("--top", type=int, default=25, help="Rows per section.")
+    parser.add_argument("--repeat", type=int, default=5, help="Interpreter runs to take the median over.")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = summarize(profile_imports(args.module, args.repeat), args.module, args.top)
+    print(f"import {args.module}: {report['total_ms']} ms\n")
+    print("Third-party packages (self time of all their modules):")
+    for package, ms in report["packages_ms"].items():
+        print(f"  {ms:>9.1f} ms  {package}")
+    print("\nBackend modules (cumulative, including what they imported first):")
+    for name, ms in report["backend_modules_ms"].items():
+        print(f"  {ms:>9.1f} ms  {name}")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
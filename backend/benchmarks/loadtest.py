@@ -0,0 +1,325 @@
+"""
+Offline end-to-end load test: runs the API against benchmarks/mock_openai.py and reports latency and throughput.
+- Starts the mock OpenAI server and the app (uvicorn main:app) as subprocesses on free ports and
+  waits for the app's /ready (startup warm-up done). The app gets a throwaway DATA_DIR, so mock
+  embeddings never reach the real caches, and the LLM scheduler's rate limits are off unless
+  LLM_RPM / LLM_TPM are set in the environment.
+- Phases run in order, each sending --requests requests with at most --concurrency in flight:
+  upload (/api/upload-resume with the files in test_documents/, made unique per request unless
+  --repeat-uploads), recommend (/api/recommend-bundle), quiz (/api/quiz), quiz_submit (/api/quiz/submit).
+- Reports count, errors, requests/s and p50/p95/p99 latency per phase, and compares them with the
+  stored baseline: a phase regresses when p95 grows, or requests/s drops, by more than
+  --max-regression. Exits non-zero on a regression or any failed request.
+Run from backend/: python -m benchmarks.loadtest [--requests 50] [--concurrency 8] [--latency-ms 300]
+  python -m benchmarks.loadtest --save-baseline   # record the current numbers as the baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from embeddings.catalog import load_catalog
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DOCUMENTS_DIR = BACKEND_DIR / "test_documents"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "loadtest.json"
+PHASES = ("upload", "recommend", "quiz", "quiz_submit")
+TRANSCRIPTS = (
+    "I want to become a data scientist within six months. My budget is 200 euros.",
+    "I'd like to move into machine learning engineering and learn cloud deployment. Budget 150 EUR.",
+    "Looking to become a full-stack web developer; I can spend about 300 euros.",
+)
+STARTUP_TIMEOUT_S = 120
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (q in [0, 100])."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(min(rank, len(sorted_values))) - 1]
+
+
+def summarize(latencies: List[float], errors: int, wall_s: float) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round(len(latencies) / wall_s, 2) if wall_s > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """Human-readable regressions of results against baseline (empty when none)."""
+    regressions = []
+    for phase, current in results.items():
+        base = baseline.get(phase)
+        if not base:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{phase}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if base["rps"] and current["rps"] < base["rps"] * (1 - max_regression):
+            regressions.append(f"{phase}: {current['rps']} req/s vs baseline {base['rps']} req/s")
+    return regressions
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, log_path: Path) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}; see {log_path}")
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {STARTUP_TIMEOUT_S}s; see {log_path}")
+
+
+@contextmanager
+def running_stack(latency_ms: float, jitter_ms: float, workdir: Path) -> Iterator[str]:
+    """Starts the mock OpenAI server and the app; yields the app's base URL."""
+    mock_port, app_port = _free_port(), _free_port()
+    env = dict(os.environ)
+    env.update(
+        OPENAI_API_KEY="sk-loadtest",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{mock_port}/v1",
+        DATA_DIR=str(workdir / "data"),
+        EMBEDDING_CHECK_CTX_LENGTH="0",
+        QUIZ_WARMUP_ON_STARTUP="0",
+        # Reason: The mock talks plain HTTP/1.1; h2 would only add an upgrade attempt
+        HTTP_HTTP2="0",
+    )
+    env.pop("OPENAI_API_BASE", None)
+    env.setdefault("LLM_RPM", "0")
+    env.setdefault("LLM_TPM", "0")
+    commands = {
+        "mock_openai": [sys.executable, "-m", "benchmarks.mock_openai", "--port", str(mock_port),
+                        "--latency-ms", str(latency_ms), "--jitter-ms", str(jitter_ms)],
+        "app": [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port), "--log-level", "warning"],
+    }
+    health = {"mock_openai": f"http://127.0.0.1:{mock_port}/health", "app": f"http://127.0.0.1:{app_port}/ready"}
+    processes = []
+    try:
+        for name, command in commands.items():
+            log_path = workdir / f"{name}.log"
+            with open(log_path, "wb") as log:
+                process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+            processes.append(process)
+            _wait_until_up(health[name], process, log_path)
+        yield f"http://127.0.0.1:{app_port}"
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def run_phase(
+    requests: int,
+    concurrency: int,
+    send: Callable[[int], Awaitable[httpx.Response]],
+) -> Tuple[Dict, List[httpx.Response]]:
+    """Calls send(i) for i in range(requests), concurrency at a time; returns stats and the OK responses."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    responses: List[httpx.Response] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await send(i)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                errors += 1
+                if errors <= 3:
+                    print(f"[LOADTEST] Request {i} failed: {e}")
+                return
+            latencies.append(time.perf_counter() - started)
+            responses.append(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(latencies, errors, time.perf_counter() - started), responses
+
+
+def _upload_files(unique: bool) -> Callable[[int], Tuple[str, bytes]]:
+    documents = sorted(p for p in DOCUMENTS_DIR.iterdir() if p.suffix.lower() in (".pdf", ".txt"))
+    if not documents:
+        raise RuntimeError(f"No .pdf/.txt files in {DOCUMENTS_DIR}")
+    contents = [(p.name, p.read_bytes()) for p in documents]
+
+    def file_for(i: int) -> Tuple[str, bytes]:
+        name, data = contents[i % len(contents)]
+        if unique:
+            # Reason: Defeats the upload dedup; trailing bytes after %%EOF are ignored by PDF readers
+            data = data + (b"\n%" if name.lower().endswith(".pdf") else b"\n") + uuid.uuid4().hex.encode()
+        return name, data
+
+    return file_for
+
+
+def _quiz_targets() -> List[Tuple[str, str]]:
+    return [(course["skills"][0], module["title"]) for course in load_catalog() for module in course.get("modules", [])
+            if course.get("skills")]
+
+
+async def run_load(base_url: str, phases: List[str], requests: int, concurrency: int, unique_uploads: bool) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        file_for = _upload_files(unique_uploads)
+        resume_ids: List[str] = []
+        if "upload" in phases or "recommend" in phases:
+            upload_count = requests if "upload" in phases else 1
+            stats, responses = await run_phase(
+                upload_count, concurrency,
+                lambda i: client.post("/api/upload-resume", files={"file": file_for(i)}),
+            )
+            resume_ids = [r.json()["resume_id"] for r in responses]
+            if "upload" in phases:
+                results["upload"] = stats
+        if "recommend" in phases:
+            if not resume_ids:
+                raise RuntimeError("No resume uploaded successfully; cannot run the recommend phase.")
+            results["recommend"], _ = await run_phase(
+                requests, concurrency,
+                lambda i: client.post("/api/recommend-bundle", json={
+                    "resume_id": resume_ids[i % len(resume_ids)],
+                    "chat_transcript": TRANSCRIPTS[i % len(TRANSCRIPTS)],
+                }),
+            )
+        quizzes: List[List[Dict]] = []
+        if "quiz" in phases or "quiz_submit" in phases:
+            targets = _quiz_targets()
+            quiz_count = requests if "quiz" in phases else len(targets)
+            stats, responses = await run_phase(
+                quiz_count, concurrency,
+                lambda i: client.post("/api/quiz", json={
+                    "user_id": f"loadtest-{i}",
+                    "current_skill": targets[i % len(targets)][0],
+                    "module_title": targets[i % len(targets)][1],
+                }),
+            )
+            quizzes = [r.json()["quiz"] for r in responses if r.json()["quiz"]]
+            if "quiz" in phases:
+                results["quiz"] = stats
+        if "quiz_submit" in phases:
+            if not quizzes:
+                raise RuntimeError("No quiz generated successfully; cannot run the quiz_submit phase.")
+            results["quiz_submit"], _ = await run_phase(
+                requests, concurrency,
+                lambda i: client.post("/api/quiz/submit", json={
+                    "user_id": f"loadtest-{i % concurrency}",
+                    "quiz": quizzes[i % len(quizzes)],
+                    "answers": [q["options"][0].lower() for q in quizzes[i % len(quizzes)]],
+                }),
+            )
+    return results
+
+
+def print_report(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]]) -> None:
+    print(f"\n{'phase':<12} {'n':>5} {'err':>4} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for phase, stats in results.items():
+        print(f"{phase:<12} {stats['requests']:>5} {stats['errors']:>4} {stats['rps']:>8} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+        base = (baseline or {}).get(phase)
+        if base:
+            def delta(key):
+                return f"{(stats[key] - base[key]) / base[key] * 100:+.0f}%" if base[key] else "n/a"
+            print(f"{'  vs base':<12} {'':>5} {'':>4} {delta('rps'):>8} {delta('p50_ms'):>9} "
+                  f"{delta('p95_ms'):>9} {delta('p99_ms'):>9}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline load test of the API against a mock OpenAI server.")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per phase.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max requests in flight.")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mock OpenAI latency per call.")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Extra mock latency, up to this much.")
+    parser.add_argument("--phases", default=",".join(PHASES), help=f"Comma-separated subset of {','.join(PHASES)}.")
+    parser.add_argument("--repeat-uploads", action="store_true", help="Upload the documents as-is (mostly dedup hits).")
+    parser.add_argument("--url", default=None, help="Load an already running app instead of starting one (and the mock).")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline.")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed p95 growth / req/s drop (0.25 = 25%%).")
+    args = parser.parse_args(argv)
+
+    phases = [p.strip() for p in args.phases.split(",") if p.strip()]
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        parser.error(f"unknown phases: {', '.join(sorted(unknown))}")
+    config = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "unique_uploads": not args.repeat_uploads,
+    }
+
+    def load(base_url: str) -> Dict[str, Dict]:
+        return asyncio.run(run_load(base_url, phases, args.requests, args.concurrency, not args.repeat_uploads))
+
+    print(f"[LOADTEST] {', '.join(phases)}: {args.requests} requests per phase at concurrency {args.concurrency}, "
+          f"mock latency {args.latency_ms}+{args.jitter_ms}ms")
+    if args.url:
+        results = load(args.url)
+    else:
+        with tempfile.TemporaryDirectory(prefix="qhack-loadtest-") as workdir:
+            with running_stack(args.latency_ms, args.jitter_ms, Path(workdir)) as base_url:
+                results = load(base_url)
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    baseline = stored["results"] if stored and not args.save_baseline else None
+    if stored and baseline and stored.get("config") != config:
+        print(f"[LOADTEST] Warning: baseline was recorded with {stored.get('config')}; numbers may not be comparable.")
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            "config": config,
+            "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "results": results,
+        }, indent=2) + "\n")
+        print(f"\n[LOADTEST] Baseline written to {args.baseline}")
+
+    failed = sum(stats["errors"] for stats in results.values())
+    regressions = compare(results, baseline, args.max_regression) if baseline else []
+    for regression in regressions:
+        print(f"[LOADTEST] REGRESSION {regression}")
+    if failed:
+        print(f"[LOADTEST] {failed} requests failed")
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
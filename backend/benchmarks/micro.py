@@ -0,0 +1,375 @@
+"""
+Microbenchmarks for the CPU-side hot paths, with a stored baseline and a regression gate.
+- Cases: resume text/image extraction (the sample resume and synthetic multi-page PDFs),
+  ingest_resume, compute_skills_gap, LexicalCourseIndex build + retrieve_courses on synthetic
+  catalogs, FAISS IndexFlatL2 search, adjust_pricing and load_quiz / QuizPool.get.
+- Each case is auto-ranged (enough loops per round to last --min-time / --rounds) and reports the
+  median, min and stddev per call over the rounds. Inputs are seeded, so runs are repeatable.
+- Every timed round of a case is preceded by a round of a fixed calibration workload (interpreter,
+  hashing and a small matmul). The gate compares the median over rounds of case time / calibration
+  time, so a slower, throttled or busier machine scales both and cancels out. Baselines without
+  calibration times are compared on the raw min.
+- Results are written as JSON to --output; cases whose normalized time is more than --max-regression
+  slower than in the baseline (benchmarks/baselines/micro.json) are re-measured once, and only those
+  that regress again fail the run with a non-zero exit.
+- Re-baselining: after an intended performance change, or to gate on a new kind of machine, run
+  `python -m benchmarks.micro --save-baseline` (optionally with --groups / --only; results are merged
+  into the stored baseline) on an otherwise idle machine, check the printed numbers look sane, and
+  commit benchmarks/baselines/micro.json together with the change that moved them. Record it with
+  the same --sizes and --dim the gate runs with.
+- Catalog sizes come from --sizes (default 1k, 10k and 100k courses). 1000000 works too but needs
+  several GB of RAM: about 6 GB for the FAISS case at the default 1536 dimensions (see --dim).
+Run from backend/: python -m benchmarks.micro [--only retrieve] [--sizes 1000,10000] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = BACKEND_DIR / "test_documents" / "SampleResumeHack.pdf"
+SAMPLE_TXT = BACKEND_DIR / "test_documents" / "SampleResumeHack.txt"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "micro.json"
+RESULTS_PATH = Path(__file__).resolve().parent / "results" / "micro.json"
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+SEED = 1234
+
+WORDS = (
+    "data analysis pipeline model cloud api web design testing deployment security network database query "
+    "visual dashboard stream batch service mobile backend frontend system learning agile product metrics"
+).split()
+SKILLS = [
+    "python", "sql", "machine learning", "deep learning", "statistics", "react", "javascript", "typescript",
+    "docker", "kubernetes", "aws", "azure", "gcp", "html", "css", "pandas", "numpy", "tensorflow", "pytorch",
+    "data visualization", "git", "linux", "java", "c++", "go", "rust", "node.js", "spark", "airflow", "tableau",
+]
+
+
+class Case(NamedTuple):
+    name: str
+    fn: Callable[[], object]
+
+
+class Timing(NamedTuple):
+    median_s: float
+    min_s: float
+    stdev_s: float
+    loops: int
+    rounds: int
+
+
+def run_sync(coroutine):
+    """Result of a coroutine that never awaits (the DAG's CPU-only async nodes), without an event loop."""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    coroutine.close()
+    raise RuntimeError("coroutine awaited; run it on an event loop instead")
+
+
+def _time_loops(fn: Callable[[], object], loops: int) -> float:
+    started = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - started) / loops
+
+
+def _autorange(fn: Callable[[], object], budget: float) -> int:
+    """Loops per round so that one round of fn lasts at least `budget` seconds."""
+    fn()  # Reason: Warm caches and lazy initialization outside the timed rounds
+    loops = 1
+    while True:
+        elapsed = _time_loops(fn, loops) * loops
+        if elapsed >= budget or loops >= 1_000_000:
+            return loops
+        loops = max(loops * 2, int(loops * budget / max(elapsed, 1e-9) * 1.1))
+
+
+def measure(fn: Callable[[], object], min_time: float = 1.0, rounds: int = 7) -> Timing:
+    """Per-call timings over `rounds` rounds, each running fn enough times to last min_time / rounds."""
+    loops = _autorange(fn, min_time / rounds)
+    samples = [_time_loops(fn, loops) for _ in range(rounds)]
+    return Timing(statistics.median(samples), min(samples), statistics.pstdev(samples), loops, rounds)
+
+
+_CALIBRATION_MATRIX = np.random.default_rng(SEED).standard_normal((96, 96)).astype("float32")
+_CALIBRATION_TEXT = " ".join(WORDS * 40)
+
+
+def calibration_workload() -> None:
+    """Fixed mix of interpreter, string, hashing and BLAS work, timed next to every case."""
+    counts: Dict[str, int] = {}
+    for word in _CALIBRATION_TEXT.split():
+        counts[word] = counts.get(word, 0) + 1
+    zlib.crc32(_CALIBRATION_TEXT.encode("utf-8"))
+    sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    _CALIBRATION_MATRIX @ _CALIBRATION_MATRIX
+
+
+def measure_case(fn: Callable[[], object], min_time: float, rounds: int) -> Dict:
+    """
+    Like measure(fn), with a calibration round timed right before every round of fn. "normalized" is
+    the median over rounds of (fn time / calibration time), so machine-wide slowdowns cancel out.
+    """
+    loops = _autorange(fn, min_time / rounds)
+    calibration_loops = _autorange(calibration_workload, min(0.2, min_time) / rounds)
+    samples, calibrations = [], []
+    for _ in range(rounds):
+        calibrations.append(_time_loops(calibration_workload, calibration_loops))
+        samples.append(_time_loops(fn, loops))
+    timing = Timing(statistics.median(samples), min(samples), statistics.pstdev(samples), loops, rounds)
+    return {
+        **timing._asdict(),
+        "calibration_s": statistics.median(calibrations),
+        "normalized": statistics.median(s / c for s, c in zip(samples, calibrations)),
+    }
+
+
+def relative_change(current: Dict, base: Optional[Dict]) -> Optional[float]:
+    """Slowdown of current vs base (0.5 = 50% slower): normalized when both have it, else raw min."""
+    if not base or base["min_s"] <= 0:
+        return None
+    if current.get("normalized") and base.get("normalized"):
+        return current["normalized"] / base["normalized"] - 1
+    return current["min_s"] / base["min_s"] - 1
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """Cases whose calibration-normalized time (or, for old baselines, min) grew by more than max_regression."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        change = relative_change(current, base)
+        if change is not None and change > max_regression:
+            regressions.append(f"{name}: {current['min_s'] * 1e6:.1f}us vs baseline {base['min_s'] * 1e6:.1f}us "
+                               f"({change * 100:+.0f}% normalized)")
+    return regressions
+
+
+# ----- synthetic inputs -----
+
+def synthetic_catalog(size: int, seed: int = SEED) -> List[Dict]:
+    """Courses shaped like embeddings/courses.json, with three modules each."""
+    rng = random.Random(seed)
+
+    def phrase(n: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    return [
+        {
+            "id": i,
+            "title": f"{phrase(3).title()} {i}",
+            "description": phrase(12),
+            "skills": rng.sample(SKILLS, 3),
+            "price": rng.randrange(19, 199),
+            "time_hours": rng.randrange(4, 40),
+            "modules": [
+                {"title": phrase(3).title(), "description": phrase(8), "subtopics": [phrase(2) for _ in range(3)]}
+                for _ in range(3)
+            ],
+        }
+        for i in range(size)
+    ]
+
+
+def synthetic_pdf(pages: int, images_per_page: int = 1, seed: int = SEED) -> bytes:
+    """A resume-like PDF with `pages` pages of text and small embedded images."""
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 128, 128), False)
+    pixmap.clear_with(180)
+    for page_no in range(pages):
+        page = doc.new_page()
+        lines = [f"Experience {page_no + 1}"] + [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(45)]
+        page.insert_text((72, 72), "\n".join(lines), fontsize=9)
+        for i in range(images_per_page):
+            page.insert_image(fitz.Rect(400, 60 + i * 140, 528, 188 + i * 140), pixmap=pixmap)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+# ----- cases -----
+
+def parsing_cases(workdir: Path) -> Iterator[Case]:
+    from embeddings.utils import extract_images_from_pdf, extract_resume_text, ingest_resume
+
+    documents = {
+        "sample.pdf": SAMPLE_PDF.read_bytes(),
+        "synthetic-5p.pdf": synthetic_pdf(5),
+        "synthetic-50p.pdf": synthetic_pdf(50),
+    }
+    for name, data in documents.items():
+        yield Case(f"extract_resume_text[{name}]", lambda data=data, name=name: extract_resume_text(data, name))
+        yield Case(f"extract_images_from_pdf[{name}]",
+                   lambda data=data: extract_images_from_pdf(data, str(workdir / "images")))
+        yield Case(f"ingest_resume[{name}]", lambda data=data, name=name: ingest_resume(data, name))
+    text = SAMPLE_TXT.read_bytes()
+    yield Case("extract_resume_text[sample.txt]", lambda: extract_resume_text(text, "sample.txt"))
+
+
+def skills_gap_cases() -> Iterator[Case]:
+    from graph.dag import PipelineState, compute_skills_gap
+
+    rng = random.Random(SEED)
+    for size in (10, 1_000):
+        pool = [f"{rng.choice(SKILLS)} {i}" for i in range(size * 2)]
+        state = PipelineState(skills=pool[:size], goal_skills=pool[size // 2: size + size // 2])
+        yield Case(f"compute_skills_gap[skills={size}]", lambda state=state: run_sync(compute_skills_gap(state)))
+
+
+def retrieval_cases(sizes: List[int]) -> Iterator[Case]:
+    from embeddings.lexical import LexicalCourseIndex
+    from embeddings.retriever import retrieve_courses
+
+    for size in sizes:
+        catalog = synthetic_catalog(size)
+        yield Case(f"LexicalCourseIndex.build[n={size}]", lambda catalog=catalog: LexicalCourseIndex(catalog))
+        index = LexicalCourseIndex(catalog)
+        yield Case(f"retrieve_courses[n={size}]",
+                   lambda index=index: retrieve_courses(["machine learning", "sql", "docker"], top_n=3, index=index))
+        # Reason: Free each catalog before building the next, larger one
+        del catalog, index
+
+
+def faiss_cases(sizes: List[int], dim: int) -> Iterator[Case]:
+    import faiss
+
+    rng = np.random.default_rng(SEED)
+    for size in sizes:
+        index = faiss.IndexFlatL2(dim)
+        index.add(rng.standard_normal((size, dim), dtype="float32"))
+        single = rng.standard_normal((1, dim), dtype="float32")
+        batch = rng.standard_normal((32, dim), dtype="float32")
+        yield Case(f"faiss_search[n={size},q=1]", lambda index=index, q=single: index.search(q, 8))
+        yield Case(f"faiss_search[n={size},q=32]", lambda index=index, q=batch: index.search(q, 8))
+        del index
+
+
+def pricing_cases() -> Iterator[Case]:
+    from llm_agents.pricing_agent import Module, adjust_pricing
+
+    rng = random.Random(SEED)
+    for count in (8, 16, 32):
+        modules = [
+            Module(course_title=f"Course {i}", module_title=f"{rng.choice(SKILLS)} module {i}",
+                   module_description=" ".join(rng.choice(WORDS) for _ in range(8)),
+                   selected_subtopics=[rng.choice(SKILLS)], why_selected="", price=rng.randrange(10, 80))
+            for i in range(count)
+        ]
+        gap = rng.sample(SKILLS, 6)
+        yield Case(f"adjust_pricing[modules={count}]",
+                   lambda modules=modules, gap=gap: run_sync(adjust_pricing(modules, 150, gap)))
+
+
+def quiz_cases(workdir: Path) -> Iterator[Case]:
+    from embeddings.loader import QuizPool, load_quiz
+
+    yield Case("load_quiz[hit]", lambda: load_quiz("Python", "Intro to Python"))
+    yield Case("load_quiz[miss]", lambda: load_quiz("Python", "No Such Module"))
+    entries = [{"skill": f"skill {i % 300}", "module_title": f"Module {i}", "quiz": []} for i in range(10_000)]
+    path = workdir / "quizzes.json"
+    path.write_text(json.dumps(entries))
+    pool = QuizPool(path=path, shard_dir=workdir / "quizzes.d")
+    pool.refresh(force=True)
+    yield Case("QuizPool.get[n=10000]", lambda: pool.get("Skill 42", "module 9042"))
+
+
+GROUPS = ("parsing", "skills_gap", "retrieval", "faiss", "pricing", "quiz")
+
+
+def iter_cases(groups: List[str], sizes: List[int], dim: int, workdir: Path) -> Iterator[Case]:
+    factories = {
+        "parsing": lambda: parsing_cases(workdir),
+        "skills_gap": skills_gap_cases,
+        "retrieval": lambda: retrieval_cases(sizes),
+        "faiss": lambda: faiss_cases(sizes, dim),
+        "pricing": pricing_cases,
+        "quiz": lambda: quiz_cases(workdir),
+    }
+    for group in groups:
+        yield from factories[group]()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the CPU-side microbenchmarks and check them against a baseline.")
+    parser.add_argument("--groups", default=",".join(GROUPS), help=f"Comma-separated subset of {','.join(GROUPS)}.")
+    parser.add_argument("--only", default=None, help="Only run cases whose name contains this string.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Synthetic catalog / FAISS sizes.")
+    parser.add_argument("--dim", type=int, default=1536, help="FAISS vector dimension (text-embedding-ada-002: 1536).")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to spend timing each case.")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH, help="Where to write this run's results.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline.")
+    parser.add_argument("--max-regression", type=float, default=0.5,
+                        help="Allowed slowdown of the median per-round case/calibration time ratio "
+                             "(0.5 = 50%%); tighten it on a dedicated runner.")
+    args = parser.parse_args(argv)
+
+    groups = [g.strip() for g in args.groups.split(",") if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    baseline = {} if args.save_baseline else stored.get("results", {})
+    results: Dict[str, Dict] = {}
+    regressions: List[str] = []
+    print(f"{'case':<44} {'median':>12} {'min':>12} {'stdev':>9} {'vs base':>12}")
+    with tempfile.TemporaryDirectory(prefix="qhack-micro-") as workdir:
+        for case in iter_cases(groups, sizes, args.dim, Path(workdir)):
+            if args.only and args.only not in case.name:
+                continue
+            result = measure_case(case.fn, args.min_time, args.rounds)
+            if compare({case.name: result}, baseline, args.max_regression):
+                # Reason: Re-measure before failing; a one-off stall shouldn't fail the gate
+                result = measure_case(case.fn, args.min_time, args.rounds)
+                regressions += compare({case.name: result}, baseline, args.max_regression)
+            results[case.name] = result
+            change = relative_change(result, baseline.get(case.name))
+            delta = f"{change * 100:+.0f}%" if change is not None else ""
+            print(f"{case.name:<44} {result['median_s'] * 1e6:>10.1f}us {result['min_s'] * 1e6:>10.1f}us "
+                  f"{result['stdev_s'] / result['median_s'] * 100:>8.1f}% {delta:>12}", flush=True)
+
+    run = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"sizes": sizes, "dim": args.dim, "min_time": args.min_time, "rounds": args.rounds},
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(run, indent=2) + "\n")
+    print(f"\n[MICRO] Results written to {args.output}")
+    if args.save_baseline:
+        # Reason: Merge, so re-baselining one group (--groups / --only) keeps the other cases
+        merged = {**run, "results": {**stored.get("results", {}), **results}}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(merged, indent=2) + "\n")
+        print(f"[MICRO] Baseline written to {args.baseline}")
+        return 0
+
+    if stored.get("machine") and stored["machine"] != run["machine"]:
+        print(f"[MICRO] Baseline was recorded on {stored['machine']}; times are calibration-normalized, "
+              "but re-baseline on this machine for a tighter gate.")
+    for regression in regressions:
+        print(f"[MICRO] REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Deterministic stand-in for the OpenAI chat completions and embeddings endpoints, for offline load tests.
+- POST /v1/chat/completions: answers pydantic-ai's output tool call (or a json_schema response_format)
+  with an object generated from the request's JSON schema. Values are derived from a hash of the
+  prompt, so the same prompt always gets the same answer. Fields named like "skill" are filled with
+  skills from the course catalog so the recommendation pipeline finds matching modules.
+- POST /v1/embeddings: unit vectors seeded by a hash of each input (text or token ids), as floats or
+  base64, like the real API.
+- Every response waits --latency-ms (+ up to --jitter-ms, also deterministic) before returning.
+- GET /stats: request counts per endpoint.
+Run from backend/: python -m benchmarks.mock_openai --port 8100 --latency-ms 300
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+
+from embeddings.catalog import load_catalog
+
+EMBEDDING_DIM = 1536
+ARRAY_ITEMS = 3
+
+
+def stable_hash(value: Any) -> int:
+    return zlib.crc32(json.dumps(value, sort_keys=True, default=str).encode("utf-8"))
+
+
+def catalog_skills() -> List[str]:
+    return sorted({skill.lower() for course in load_catalog() for skill in course.get("skills", [])})
+
+
+class SchemaSampler:
+    """Builds a deterministic instance of a JSON schema (as emitted by pydantic) from a seed."""
+
+    def __init__(self, schema: Dict, seed: int, skills: List[str]):
+        self.defs = schema.get("$defs", {})
+        self.seed = seed
+        self.skills = skills
+
+    def _pick(self, options: List, salt: Any):
+        return options[(self.seed + stable_hash(salt)) % len(options)]
+
+    def sample(self, schema: Dict, key: str = "value", index: int = 0):
+        if "$ref" in schema:
+            return self.sample(self.defs[schema["$ref"].split("/")[-1]], key, index)
+        for combinator in ("anyOf", "oneOf", "allOf"):
+            if combinator in schema:
+                options = [s for s in schema[combinator] if s.get("type") != "null"] or schema[combinator]
+                return self.sample(options[0], key, index)
+        if "enum" in schema:
+            return self._pick(schema["enum"], (key, index))
+        kind = schema.get("type", "object")
+        if kind == "object":
+            value = {name: self.sample(prop, name, index) for name, prop in schema.get("properties", {}).items()}
+            # Reason: Keep multiple-choice answers valid, e.g. QuizQuestion.correct_answer in options
+            if isinstance(value.get("options"), list) and value["options"]:
+                for name in value:
+                    if "answer" in name and isinstance(value[name], str):
+                        value[name] = value["options"][0]
+            return value
+        if kind == "array":
+            count = max(schema.get("minItems", ARRAY_ITEMS), min(ARRAY_ITEMS, schema.get("maxItems", ARRAY_ITEMS)))
+            items = [self.sample(schema.get("items", {}), key, i) for i in range(count)]
+            if all(isinstance(item, str) for item in items):
+                items = list(dict.fromkeys(items))
+            return items
+        if kind == "string":
+            if "skill" in key.lower() and self.skills:
+                return self._pick(self.skills, (key, index))
+            return f"Mock {key.replace('_', ' ')} {(self.seed + index) % 1000}"
+        if kind == "integer":
+            return max(schema.get("minimum", 0), 1 + (self.seed + index) % 100)
+        if kind == "number":
+            return float(max(schema.get("minimum", 0), 1 + (self.seed + index) % 100))
+        if kind == "boolean":
+            return True
+        return None
+
+
+def _prompt_tokens(messages: List[Dict]) -> int:
+    return sum(len(json.dumps(m.get("content", ""))) for m in messages) // 4 + 1
+
+
+def _embedding(value: Any, dim: int) -> np.ndarray:
+    vector = np.random.default_rng(stable_hash(value)).standard_normal(dim).astype("float32")
+    return vector / np.linalg.norm(vector)
+
+
+def create_app(latency_ms: float = 0.0, jitter_ms: float = 0.0, dim: int = EMBEDDING_DIM) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI")
+    skills = catalog_skills()
+    counts = {"chat": 0, "embeddings": 0}
+
+    async def delay(seed: int) -> None:
+        wait_ms = latency_ms + (seed % 1000) / 1000 * jitter_ms
+        if wait_ms > 0:
+            await asyncio.sleep(wait_ms / 1000)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counts["chat"] += 1
+        messages = body.get("messages", [])
+        seed = stable_hash(messages)
+        await delay(seed)
+
+        message: Dict[str, Any] = {"role": "assistant", "content": None}
+        finish_reason = "stop"
+        tools = body.get("tools") or []
+        response_format = body.get("response_format") or {}
+        if tools:
+            function = tools[0]["function"]
+            arguments = SchemaSampler(function.get("parameters", {}), seed, skills).sample(function.get("parameters", {}))
+            message["tool_calls"] = [{
+                "id": f"call_{seed:08x}",
+                "type": "function",
+                "function": {"name": function["name"], "arguments": json.dumps(arguments)},
+            }]
+            finish_reason = "tool_calls"
+        elif response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"].get("schema", {})
+            message["content"] = json.dumps(SchemaSampler(schema, seed, skills).sample(schema))
+        else:
+            message["content"] = f"Mock completion {seed % 1000}"
+
+        completion_tokens = len(json.dumps(message)) // 4 + 1
+        prompt_tokens = _prompt_tokens(messages)
+        return {
+            "id": f"chatcmpl-mock-{seed:08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        counts["embeddings"] += 1
+        inputs = body.get("input", [])
+        # Reason: A single string, a list of strings, or token ids (one list or a list of lists)
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        await delay(stable_hash(inputs[:1]))
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for i, value in enumerate(inputs):
+            vector = _embedding(value, body.get("dimensions") or dim)
+            encoded = base64.b64encode(vector.tobytes()).decode("ascii") if as_base64 else vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": encoded})
+        tokens = sum(len(v) // 4 + 1 if isinstance(v, str) else len(v) for v in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "mock"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    @app.get("/stats")
+    async def stats():
+        return dict(counts)
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a deterministic mock of the OpenAI chat and embeddings API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra delay, up to this much, derived from the request.")
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
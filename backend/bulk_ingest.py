@@ -0,0 +1,160 @@
+"""
+Bulk resume ingestion: parses every PDF/TXT resume under a directory into a JSONL file.
+- PyMuPDF parsing runs in the shared process pool (parsing_pool.py); ResumeAgent extraction runs with
+  at most --concurrency documents in flight, in the LLM scheduler's batch lane.
+- Each finished document is appended to the output as one line
+  {"path", "sha256", "status": "ok" | "error", "result" | "error"} and flushed right away.
+- The output doubles as the checkpoint: a rerun skips documents whose path and content hash already
+  have an "ok" line (failed ones are retried; --skip-failed skips them too). A line cut short by a
+  crash is ignored and cut off before appending, so the next record starts on a line of its own.
+Run from backend/: python -m bulk_ingest <resume_dir> [--output resumes.jsonl] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from llm_scheduler import BATCH, llm_priority
+from parsing_pool import shutdown_parsing_pool
+from resume_parser_main import parse_resume
+
+RESUME_SUFFIXES = (".pdf", ".txt")
+DEFAULT_CONCURRENCY = 8
+
+
+def iter_resume_files(root: Path) -> Iterator[Path]:
+    """Every .pdf / .txt file under root, in a stable order."""
+    for path in sorted(root.rglob("*")):
+        if path.is_file() and path.suffix.lower() in RESUME_SUFFIXES:
+            yield path
+
+
+def load_checkpoint(output_path: Path, skip_failed: bool = False) -> Set[Tuple[str, str]]:
+    """(path, sha256) pairs already done according to the output file."""
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Reason: Partial last line from an interrupted run
+            if entry.get("status") == "ok" or skip_failed:
+                done.add((entry["path"], entry["sha256"]))
+    return done
+
+
+def drop_partial_line(output_path: Path) -> None:
+    """Truncates a trailing line that has no newline (a record cut short by a crash)."""
+    if not output_path.exists():
+        return
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+async def ingest_directory(
+    root: Path,
+    output_path: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    skip_failed: bool = False,
+    limit: Optional[int] = None,
+) -> Dict[str, int]:
+    """Ingests every resume under root that the checkpoint doesn't cover yet; returns counts."""
+    done = load_checkpoint(output_path, skip_failed)
+    drop_partial_line(output_path)
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        def record(entry: Dict) -> None:
+            # Reason: Writes happen on the event loop thread, so lines never interleave
+            out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[entry["status"]] += 1
+            total = counts["ok"] + counts["error"]
+            if total % 50 == 0:
+                print(f"[BULK] {total} ingested ({counts['error']} failed)")
+
+        async def worker() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                rel_path, file_bytes, digest = item
+                entry = {"path": rel_path, "sha256": digest}
+                try:
+                    entry.update(status="ok", result=await parse_resume(file_bytes, rel_path))
+                except Exception as e:
+                    entry.update(status="error", error=str(e))
+                    print(f"[BULK] Failed {rel_path}: {e}")
+                record(entry)
+
+        with llm_priority(BATCH):
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            queued = 0
+            for path in iter_resume_files(root):
+                if limit is not None and queued >= limit:
+                    break
+                rel_path = path.relative_to(root).as_posix()
+                # Reason: Read lazily; the bounded queue keeps at most ~2x concurrency files in memory
+                file_bytes = await asyncio.to_thread(path.read_bytes)
+                digest = hashlib.sha256(file_bytes).hexdigest()
+                if (rel_path, digest) in done:
+                    counts["skipped"] += 1
+                    continue
+                done.add((rel_path, digest))
+                await queue.put((rel_path, file_bytes, digest))
+                queued += 1
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory of PDF/TXT resumes into a resumable JSONL file.")
+    parser.add_argument("root", type=Path, help="Directory to scan (recursively) for .pdf / .txt resumes.")
+    parser.add_argument("--output", type=Path, default=Path("resumes.jsonl"), help="JSONL output, also used as the checkpoint.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Max documents in flight.")
+    parser.add_argument("--skip-failed", action="store_true", help="Don't retry documents that failed in an earlier run.")
+    parser.add_argument("--limit", type=int, default=None, help="Only ingest this many new documents.")
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        parser.error(f"not a directory: {args.root}")
+    started = time.perf_counter()
+    try:
+        counts = asyncio.run(ingest_directory(args.root, args.output, args.concurrency, args.skip_failed, args.limit))
+    finally:
+        shutdown_parsing_pool()
+    print(f"[BULK] Done in {time.perf_counter() - started:.1f}s: {counts['ok']} ok, {counts['error']} failed, "
+          f"{counts['skipped']} already in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Deterministic bundle pricing that replaces the pricing_agent LLM call.
+- A module's list price is its course price split evenly across the course's modules (PriceBook).
+- optimize_bundle picks the subset of recommended modules that covers the most gap skills within
+  budget_eur, then keeps the most modules, then spends the least: an exact 0/1 knapsack DP keyed by
+  (covered-skill set, module count) that keeps the cheapest subset per key. The state count can grow
+  as 2^(gap skills), so past MAX_DP_STATES it falls back to a greedy pick (most new skills, then
+  cheapest) that still respects the budget.
+- Discount rules are fixed: VOLUME_DISCOUNTS by bundle size, applied per module and rounded down,
+  so the discounted bundle total never exceeds the budget.
+"""
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from embeddings.catalog import catalog_modules
+from embeddings.lexical import normalize_skill, tokenize
+
+# (minimum modules in the bundle, discount rate), checked in order
+VOLUME_DISCOUNTS = ((5, 0.15), (3, 0.10))
+
+# Exact DP states allowed before falling back to greedy (keeps a long skill gap at milliseconds)
+MAX_DP_STATES = 20_000
+
+
+def volume_discount(module_count: int) -> float:
+    for min_modules, rate in VOLUME_DISCOUNTS:
+        if module_count >= min_modules:
+            return rate
+    return 0.0
+
+
+def _title_key(title: str) -> str:
+    return " ".join((title or "").split()).casefold()
+
+
+class PriceBook:
+    """List prices and skill tags per catalog module, looked up by (course title, module title)."""
+
+    def __init__(self, courses: Sequence[Dict]):
+        self.modules: Dict[Tuple[str, str], Dict] = {}
+        self.courses: Dict[str, Dict] = {}
+        for course in courses:
+            self.courses.setdefault(_title_key(course["title"]), course)
+        for module in catalog_modules(list(courses)):
+            key = (_title_key(module["course_title"]), _title_key(module["title"]))
+            self.modules.setdefault(key, module)
+
+    def price(self, course_title: str, module_title: str) -> int:
+        module = self.modules.get((_title_key(course_title), _title_key(module_title)))
+        course = self.courses.get(_title_key(course_title))
+        # Reason: The LLM path can paraphrase a module title; price it as an average module of its course
+        if module is None and course is not None:
+            module = {"course_price": course.get("price"), "course_module_count": len(course.get("modules", []))}
+        if module is None or not module.get("course_price"):
+            return 0
+        return max(1, round(module["course_price"] / max(1, module["course_module_count"])))
+
+    def skills(self, course_title: str) -> List[str]:
+        course = self.courses.get(_title_key(course_title))
+        return course.get("skills", []) if course else []
+
+
+def covered_skills(module: Dict, skills_gap: Iterable[str], tags: Iterable[str] = ()) -> FrozenSet[str]:
+    """Gap skills the module covers: an exact course tag, or every token of the skill in the module text."""
+    text_tokens = set(tokenize(" ".join([
+        module.get("course_title", ""),
+        module.get("module_title", ""),
+        module.get("module_description", ""),
+        " ".join(module.get("selected_subtopics", [])),
+    ])))
+    tag_set = {normalize_skill(t) for t in tags}
+    covered = set()
+    for skill in skills_gap:
+        normalized = normalize_skill(skill)
+        skill_tokens = set(tokenize(normalized))
+        if normalized in tag_set or (skill_tokens and skill_tokens <= text_tokens):
+            covered.add(normalized)
+    return frozenset(covered)
+
+
+def _fits(cost: int, count: int, budget: Optional[float]) -> bool:
+    return budget is None or cost * (1 - volume_discount(count)) <= budget
+
+
+def _may_fit(cost: int, budget: Optional[float]) -> bool:
+    # Reason: A bigger bundle can earn a bigger discount, so only prune subsets no superset can rescue
+    max_rate = max((rate for _, rate in VOLUME_DISCOUNTS), default=0.0)
+    return budget is None or cost * (1 - max_rate) <= budget
+
+
+def _greedy_within_budget(
+    prices: Sequence[int],
+    coverage: Sequence[FrozenSet[str]],
+    budget: Optional[float],
+) -> Tuple[int, ...]:
+    """Adds modules by (new skills covered, -price, -index) while the discounted total still fits."""
+    chosen: List[int] = []
+    covered: FrozenSet[str] = frozenset()
+    cost = 0
+    remaining = set(range(len(prices)))
+    while remaining:
+        best = max(remaining, key=lambda i: (len(coverage[i] - covered), -prices[i], -i))
+        remaining.discard(best)
+        if _fits(cost + prices[best], len(chosen) + 1, budget):
+            chosen.append(best)
+            covered |= coverage[best]
+            cost += prices[best]
+    return tuple(sorted(chosen))
+
+
+def select_within_budget(
+    prices: Sequence[int],
+    coverage: Sequence[FrozenSet[str]],
+    budget: Optional[float],
+) -> Tuple[int, ...]:
+    """
+    Indices of the subset maximizing (skills covered, modules kept, -cost) whose discounted total
+    fits the budget; ties go to the earliest-recommended modules. Exact up to MAX_DP_STATES, greedy beyond.
+    """
+    # (covered skills, module count) -> (cost, chosen indices); the cheapest subset per key dominates
+    states: Dict[Tuple[FrozenSet[str], int], Tuple[int, Tuple[int, ...]]] = {(frozenset(), 0): (0, ())}
+    for i, (price, skills) in enumerate(zip(prices, coverage)):
+        for (covered, count), (cost, chosen) in list(states.items()):
+            key = (covered | skills, count + 1)
+            candidate = (cost + price, chosen + (i,))
+            if not _may_fit(candidate[0], budget):
+                continue
+            best = states.get(key)
+            if best is None or candidate < best:
+                states[key] = candidate
+        if len(states) > MAX_DP_STATES:
+            return _greedy_within_budget(prices, coverage, budget)
+    feasible = [item for item in states.items() if _fits(item[1][0], item[0][1], budget)]
+    (covered, count), (cost, chosen) = max(
+        feasible,
+        key=lambda item: (len(item[0][0]), item[0][1], -item[1][0], [-i for i in item[1][1]]),
+    )
+    return chosen
+
+
+def optimize_bundle(
+    recommended_modules: Sequence[Dict],
+    budget_eur,
+    skills_gap: Sequence[str],
+    price_book: PriceBook,
+) -> List[Dict]:
+    """
+    Returns the chosen modules (recommendation order) with `price` (list) and `final_price` (discounted).
+    A missing or non-numeric budget keeps every module.
+    """
+    try:
+        budget = float(budget_eur) if budget_eur is not None else None
+    except (TypeError, ValueError):
+        budget = None
+    modules = [dict(m) for m in recommended_modules]
+    prices = [price_book.price(m.get("course_title", ""), m.get("module_title", "")) for m in modules]
+    coverage = [
+        covered_skills(m, skills_gap or [], price_book.skills(m.get("course_title", "")))
+        for m in modules
+    ]
+    chosen = select_within_budget(prices, coverage, budget)
+    rate = volume_discount(len(chosen))
+    bundle = []
+    for i in chosen:
+        bundle.append({**modules[i], "price": prices[i], "final_price": int(prices[i] * (1 - rate))})
+    return bundle
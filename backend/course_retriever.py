@@ -1,36 +1,260 @@
 """
-CourseRetriever: FAISS-backed semantic course retrieval using LangChain embeddings.
-- Loads a mock course catalog (for MVP).
-- Builds FAISS index on course descriptions.
-- Retrieves top-N courses relevant to skills_gap.
+CourseRetriever: FAISS-backed semantic course retrieval using LangChain embeddings (shared HTTP pool).
+- Loads the persisted indexes written by embeddings/embed_courses.py: one vector per course
+  (courses.index + metadata.json) and one per module (modules.index + modules_metadata.json), from the
+  faiss_index/versions/<version>/ directory named by manifest.json. Vector and row counts are checked
+  against the manifest; on a mismatch the manifest is re-read once, since a rebuild may have just swapped it.
+- Detects a stale index via the catalog hash in faiss_index/manifest.json and falls back to an in-memory build.
+- One process-wide instance is shared by all requests (get_course_retriever) and is reloaded
+  when the catalog or manifest changes on disk.
+- Results are cached per canonical skill-gap set, top_k, granularity and catalog version (LRU + TTL).
+- Retrieves top-N courses (retrieve) or modules (retrieve_modules) relevant to skills_gap by fusing
+  exact skill-tag hits, BM25 and FAISS similarity (embeddings/lexical.py); the embedding call is
+  skipped when the tag index alone answers the query.
 """
-from typing import List, Dict
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain.docstore.document import Document
+from typing import Callable, List, Dict, Optional, Tuple
+import faiss
+import numpy as np
 import os
+import threading
+import time
 
-import json
+import settings
+from bundle_optimizer import PriceBook
+from caching import LRUTTLCache
+from embeddings.lexical import LexicalCourseIndex
+from openai_clients import openai_embeddings
+from telemetry import record_cache, span
+from embeddings.catalog import (
+    COURSE_PATH,
+    EMBEDDING_MODEL,
+    INDEX_FILE,
+    MANIFEST_PATH,
+    META_FILE,
+    MODULE_INDEX_FILE,
+    MODULE_META_FILE,
+    catalog_hash,
+    catalog_modules,
+    course_text,
+    index_dir,
+    load_catalog,
+    load_manifest,
+    module_text,
+)
+
+# Dense candidates fetched per requested result, so fusion has enough overlap to re-rank
+DENSE_OVERFETCH = 4
+
+# Reason: Shared across retriever reloads; keys carry the catalog version and it is cleared on reload
+_RESULT_CACHE = LRUTTLCache(settings.RETRIEVAL_CACHE_SIZE, settings.RETRIEVAL_CACHE_TTL_S)
+
+
+def canonical_skills_gap(skills_gap: List[str]) -> Tuple[str, ...]:
+    """Order-insensitive, case-folded, de-duplicated form of a skill gap."""
+    return tuple(sorted({skill.strip().casefold() for skill in skills_gap or [] if skill.strip()}))
+
+
+def _source_mtimes() -> Tuple[float, float]:
+    def mtime(path) -> float:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return 0.0
+    return mtime(COURSE_PATH), mtime(MANIFEST_PATH)
 
-# Load real course catalog with modules from embeddings/courses.json
-COURSE_JSON_PATH = os.path.join(os.path.dirname(__file__), "embeddings", "courses.json")
-with open(COURSE_JSON_PATH, "r", encoding="utf-8") as f:
-    ALL_COURSES = json.load(f)
 
 class CourseRetriever:
-    def __init__(self, courses: List[Dict] = None):
-        self.courses = courses or ALL_COURSES
-        self.embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
-        self._build_index()
+    def __init__(
+        self,
+        courses: List[Dict] = None,
+        index: Optional[faiss.Index] = None,
+        source_mtimes: Optional[Tuple[float, float]] = None,
+        modules: List[Dict] = None,
+        module_index: Optional[faiss.Index] = None,
+    ):
+        self.source_mtimes = source_mtimes
+        self.courses = courses if courses is not None else load_catalog()
+        self.catalog_hash = catalog_hash(self.courses)
+        self.embeddings = openai_embeddings(EMBEDDING_MODEL)
+        self.lexical = LexicalCourseIndex(self.courses)
+        self.price_book = PriceBook(self.courses)
+        if index is None:
+            self.index = self._build_index([course_text(course) for course in self.courses])
+        else:
+            self.index = index
+        self.modules = modules if modules is not None else catalog_modules(self.courses)
+        self.module_lexical = LexicalCourseIndex(self.modules)
+        # Reason: Built on first retrieve_modules call when no persisted module index is available
+        self.module_index = module_index
+        self._module_index_lock = threading.Lock()
+
+    @classmethod
+    def from_index(cls) -> "CourseRetriever":
+        """
+        Loads the persisted index if it matches the current catalog, otherwise builds one in memory.
+        """
+        source_mtimes = _source_mtimes()
+        courses = load_catalog()
+        for attempt in range(2):
+            manifest = load_manifest(MANIFEST_PATH) or {}
+            if manifest.get("catalog_hash") != catalog_hash(courses) or manifest.get("model") != EMBEDDING_MODEL:
+                print("[RETRIEVER] Persisted index missing or stale; building in memory. "
+                      "Run `python -m embeddings.embed_courses` to refresh it.")
+                return cls(courses, source_mtimes=source_mtimes)
+            directory = index_dir(manifest)
+            try:
+                index = faiss.read_index(str(directory / INDEX_FILE))
+                metadata = load_catalog(directory / META_FILE)
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"[RETRIEVER] Could not read persisted index from {directory}: {e}")
+                continue
+            if index.ntotal == len(metadata) == manifest.get("count", len(metadata)):
+                break
+            print(f"[RETRIEVER] Index has {index.ntotal} vectors, metadata {len(metadata)} rows and "
+                  f"manifest {manifest.get('count')} (attempt {attempt + 1}).")
+        else:
+            print("[RETRIEVER] Persisted index is inconsistent; rebuilding in memory.")
+            return cls(courses, source_mtimes=source_mtimes)
+        print(f"[RETRIEVER] Loaded persisted index with {index.ntotal} courses from {directory}")
+        modules, module_index = cls._load_module_index(manifest)
+        return cls(metadata, index=index, source_mtimes=source_mtimes, modules=modules, module_index=module_index)
+
+    @staticmethod
+    def _load_module_index(manifest: Dict) -> Tuple[Optional[List[Dict]], Optional[faiss.Index]]:
+        directory = index_dir(manifest)
+        if "modules" not in manifest or not (directory / MODULE_INDEX_FILE).exists():
+            print("[RETRIEVER] No persisted module index; it will be built in memory on first use.")
+            return None, None
+        try:
+            module_index = faiss.read_index(str(directory / MODULE_INDEX_FILE))
+            modules = load_catalog(directory / MODULE_META_FILE)
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"[RETRIEVER] Could not read persisted module index from {directory}: {e}; ignoring it.")
+            return None, None
+        if not module_index.ntotal == len(modules) == manifest.get("module_count", len(modules)):
+            print(f"[RETRIEVER] Module index has {module_index.ntotal} vectors, metadata {len(modules)} rows and "
+                  f"manifest {manifest.get('module_count')}; ignoring it.")
+            return None, None
+        print(f"[RETRIEVER] Loaded persisted index with {module_index.ntotal} modules from {directory}")
+        return modules, module_index
+
+    def _build_index(self, texts: List[str]) -> faiss.Index:
+        # Reason: Build FAISS index on the same text embed_courses.py uses (but keep full metadata)
+        vectors_np = np.array(self.embeddings.embed_documents(texts), dtype="float32")
+        index = faiss.IndexFlatL2(vectors_np.shape[1])
+        index.add(vectors_np)
+        return index
+
+    def warm_up(self) -> None:
+        """Builds the module index now instead of on the first retrieve_modules call."""
+        self._get_module_index()
 
-    def _build_index(self):
-        # Reason: Build FAISS index on course descriptions (but keep full metadata)
-        docs = [Document(page_content=course["description"], metadata=course) for course in self.courses]
-        self.vectorstore = FAISS.from_documents(docs, self.embeddings)
+    def _get_module_index(self) -> faiss.Index:
+        if self.module_index is None:
+            with self._module_index_lock:
+                if self.module_index is None:
+                    self.module_index = self._build_index([module_text(m) for m in self.modules])
+        return self.module_index
 
     def retrieve(self, skills_gap: List[str], top_k: int = 3) -> List[Dict]:
         # Reason: Retrieve top-K courses relevant to skills_gap, returning full course dict (with modules)
-        query = ", ".join(skills_gap)
-        docs = self.vectorstore.similarity_search(query, k=top_k)
+        canonical = canonical_skills_gap(skills_gap)
+        cache_key = (canonical, top_k, self.catalog_hash)
+        cached = _RESULT_CACHE.get(cache_key)
+        record_cache("retrieval", int(cached is not None), int(cached is None))
+        if cached is not None:
+            return list(cached)
         # Return the original course dicts (with modules) for downstream LLM selection
-        return [doc.metadata for doc in docs]
+        rows = self._search_many([canonical], top_k, self.lexical, lambda: self.index)[0]
+        results = [self.courses[row] for row in rows]
+        _RESULT_CACHE.set(cache_key, tuple(results))
+        return results
+
+    def retrieve_modules(self, skills_gap: List[str], top_n: int = None) -> List[Dict]:
+        """
+        Top-N individual modules for skills_gap, each with its parent course's title, price and skills
+        (see embeddings.catalog.catalog_modules). Much smaller than whole courses as LLM input.
+        """
+        return self.retrieve_modules_many([skills_gap], top_n)[0]
+
+    def retrieve_modules_many(self, skills_gaps: List[List[str]], top_n: int = None) -> List[List[Dict]]:
+        """
+        Batched retrieve_modules: identical gaps are searched once, and every uncached gap that needs
+        dense scores shares one embeddings request and one FAISS search over the query matrix.
+        """
+        top_n = top_n or settings.MODULE_CANDIDATES
+        canonicals = [canonical_skills_gap(gap) for gap in skills_gaps]
+        results: Dict[Tuple[str, ...], List[Dict]] = {}
+        missing = []
+        for canonical in dict.fromkeys(canonicals):
+            cached = _RESULT_CACHE.get(("modules", canonical, top_n, self.catalog_hash))
+            if cached is not None:
+                results[canonical] = list(cached)
+            else:
+                missing.append(canonical)
+        record_cache("retrieval", len(results), len(missing))
+        for canonical, rows in zip(missing, self._search_many(missing, top_n, self.module_lexical, self._get_module_index)):
+            results[canonical] = [self.modules[row] for row in rows]
+            _RESULT_CACHE.set(("modules", canonical, top_n, self.catalog_hash), tuple(results[canonical]))
+        return [list(results[canonical]) for canonical in canonicals]
+
+    def _search_many(
+        self,
+        canonicals: List[Tuple[str, ...]],
+        top_k: int,
+        lexical: LexicalCourseIndex,
+        get_index: Callable[[], faiss.Index],
+    ) -> List[List[int]]:
+        skills = lexical.skills
+        # Reason: If every gap skill is an exact tag and tag hits alone fill top_k, skip the embedding call
+        needs_dense = [
+            canonical for canonical in canonicals
+            if canonical and not (skills.covers(canonical) and len(skills.lookup(canonical)) >= top_k)
+        ]
+        dense_rankings = {}
+        if needs_dense:
+            queries = [", ".join(canonical) for canonical in needs_dense]
+            dense_rankings = dict(zip(needs_dense, self._dense_rankings(get_index(), queries, top_k * DENSE_OVERFETCH)))
+        return [
+            lexical.search(canonical, top_k, dense_rankings.get(canonical, []))
+            if canonical else list(range(min(top_k, len(lexical.courses))))
+            for canonical in canonicals
+        ]
+
+    def _dense_rankings(self, index: faiss.Index, queries: List[str], k: int) -> List[List[int]]:
+        # Reason: One embeddings request and one FAISS search over the whole query matrix
+        query_np = np.array(self.embeddings.embed_documents(queries), dtype="float32")
+        with span("faiss.search", type(index).__name__) as search_span:
+            search_span.set(queries=len(queries), k=k, ntotal=index.ntotal)
+            _, ids = index.search(query_np, min(k, index.ntotal))
+        return [[int(i) for i in row if i >= 0] for row in ids]
+
+
+_RETRIEVER: Optional[CourseRetriever] = None
+_RETRIEVER_LOCK = threading.Lock()
+_LAST_RELOAD_CHECK = 0.0
+
+
+def get_course_retriever() -> CourseRetriever:
+    """
+    Returns the process-wide CourseRetriever, loading the index on first use.
+    At most every INDEX_RELOAD_CHECK_S seconds, reloads it (and drops cached results)
+    if courses.json or the index manifest changed on disk.
+    """
+    global _RETRIEVER, _LAST_RELOAD_CHECK
+    now = time.monotonic()
+    if _RETRIEVER is not None and now - _LAST_RELOAD_CHECK < settings.INDEX_RELOAD_CHECK_S:
+        return _RETRIEVER
+    with _RETRIEVER_LOCK:
+        if _RETRIEVER is None:
+            _RETRIEVER = CourseRetriever.from_index()
+        elif now - _LAST_RELOAD_CHECK >= settings.INDEX_RELOAD_CHECK_S and _source_mtimes() != _RETRIEVER.source_mtimes:
+            print("[RETRIEVER] Catalog or index changed on disk; reloading.")
+            _RETRIEVER = CourseRetriever.from_index()
+            _RESULT_CACHE.clear()
+        _LAST_RELOAD_CHECK = now
+    return _RETRIEVER
+
+
+def retrieval_cache_stats() -> Dict:
+    return _RESULT_CACHE.stats()
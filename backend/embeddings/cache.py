@@ -0,0 +1,189 @@
+"""
+Persistent, content-addressed embedding cache shared by every embedding call site.
+- Key: sha256 of (model, whitespace-normalized text); value: float32 vector stored in SQLite.
+  Only the key is normalized: misses are embedded from the original text, so texts that differ
+  only in whitespace share the vector of whichever was embedded first.
+- Size-based eviction of the least recently used entries, plus hit/miss counters.
+- CachedEmbeddings wraps a LangChain Embeddings object (e.g. OpenAIEmbeddings) so identical
+  texts never hit the network twice, across requests and process restarts; cache misses are
+  embedded through the shared rate-limit-aware scheduler (llm_scheduler.py).
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+import settings
+from llm_scheduler import estimate_tokens, get_scheduler
+from telemetry import record_cache, span
+
+_SQLITE_MAX_VARS = 500
+
+
+def normalize_text(text: str) -> str:
+    # Reason: Collapse whitespace only; casing and punctuation change the embedding
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    def __init__(self, path: Path, max_entries: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [self.key(model, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for i in range(0, len(unique), _SQLITE_MAX_VARS):
+                chunk = unique[i:i + _SQLITE_MAX_VARS]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        now = time.time()
+        rows = [(self.key(model, text), model, array("f", vector).tobytes(), now) for text, vector in zip(texts, vectors)]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)", rows
+            )
+            self._entries += self._conn.total_changes - before
+            if self._entries > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Reason: Evict down to 90% of capacity so eviction runs rarely instead of on every insert
+        excess = self._entries - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._entries,
+            "max_entries": self.max_entries,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain Embeddings wrapper that serves repeated texts from an EmbeddingCache."""
+
+    def __init__(self, underlying: Embeddings, model: str, cache: EmbeddingCache):
+        self.underlying = underlying
+        self.model = model
+        self.cache = cache
+
+    def _split(self, texts: List[str]):
+        cached = self.cache.get_many(self.model, texts)
+        # Reason: Deduplicate misses by cache key so a batch with repeated texts embeds each one once
+        missing: Dict[str, str] = {}
+        for text, vector in zip(texts, cached):
+            if vector is None:
+                missing.setdefault(self.cache.key(self.model, text), text)
+        record_cache("embeddings", len(texts) - len(missing), len(missing))
+        return cached, list(missing.values())
+
+    def _merge(self, texts, cached, missing, vectors) -> List[List[float]]:
+        self.cache.put_many(self.model, missing, vectors)
+        fresh = {self.cache.key(self.model, text): vector for text, vector in zip(missing, vectors)}
+        return [v if v is not None else fresh[self.cache.key(self.model, t)] for t, v in zip(texts, cached)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with span("embeddings", self.model) as embed_span:
+            cached, missing = self._split(texts)
+            tokens = estimate_tokens(missing)
+            embed_span.set(texts=len(texts), tokens_in=tokens)
+            vectors = get_scheduler().call(lambda: self.underlying.embed_documents(missing), tokens) if missing else []
+            return self._merge(texts, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        with span("embeddings", self.model) as embed_span:
+            cached = self.cache.get_many(self.model, [text])[0]
+            record_cache("embeddings", int(cached is not None), int(cached is None))
+            if cached is not None:
+                return cached
+            tokens = estimate_tokens([text])
+            embed_span.set(texts=1, tokens_in=tokens)
+            vector = get_scheduler().call(lambda: self.underlying.embed_query(text), tokens)
+            self.cache.put_many(self.model, [text], [vector])
+            return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        with span("embeddings", self.model) as embed_span:
+            cached, missing = self._split(texts)
+            tokens = estimate_tokens(missing)
+            embed_span.set(texts=len(texts), tokens_in=tokens)
+            vectors = await get_scheduler().run(lambda: self.underlying.aembed_documents(missing), tokens) if missing else []
+            return self._merge(texts, cached, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        with span("embeddings", self.model) as embed_span:
+            cached = self.cache.get_many(self.model, [text])[0]
+            record_cache("embeddings", int(cached is not None), int(cached is None))
+            if cached is not None:
+                return cached
+            tokens = estimate_tokens([text])
+            embed_span.set(texts=1, tokens_in=tokens)
+            vector = await get_scheduler().run(lambda: self.underlying.aembed_query(text), tokens)
+            self.cache.put_many(self.model, [text], [vector])
+            return vector
+
+
+_CACHE: Optional[EmbeddingCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Returns the process-wide embedding cache (opened on first use)."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = EmbeddingCache(settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_CACHE_MAX_ENTRIES)
+    return _CACHE
+
+
+def cached_embeddings(embeddings: Embeddings) -> CachedEmbeddings:
+    """Wraps a LangChain embeddings object with the shared cache, keyed by its model name."""
+    model = getattr(embeddings, "model", None) or type(embeddings).__name__
+    return CachedEmbeddings(embeddings, model, get_embedding_cache())
@@ -0,0 +1,85 @@
+"""
+Course catalog and persisted FAISS index locations.
+- Single source of truth for courses.json and faiss_index/ paths. Each build writes its index and
+  metadata files into its own faiss_index/versions/<version>/ directory; manifest.json names the
+  current version, so swapping the manifest switches all files at once.
+- Module-level view of the catalog (one row per module, mapped back to its parent course).
+- Catalog hashing used to detect a stale index.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+COURSE_PATH = Path(__file__).parent / "courses.json"
+INDEX_DIR = Path(__file__).parent / "faiss_index"
+VERSIONS_DIR = INDEX_DIR / "versions"
+MANIFEST_PATH = INDEX_DIR / "manifest.json"
+INDEX_FILE = "courses.index"
+META_FILE = "metadata.json"
+MODULE_INDEX_FILE = "modules.index"
+MODULE_META_FILE = "modules_metadata.json"
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBEDDING_DIM = 1536
+
+
+def load_catalog(path: Path = COURSE_PATH) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def course_text(course: Dict) -> str:
+    """Text that gets embedded for a course (must match at build and query time)."""
+    return f"{course['title']}: {course['description']}"
+
+
+def catalog_modules(courses: List[Dict]) -> List[Dict]:
+    """
+    Flattens courses into one entry per module, carrying the parent course's id, title, price and skills.
+    Modules have no tags of their own, so "skills" is the course's list (course-level, not per module).
+    """
+    modules = []
+    for course in courses:
+        for position, module in enumerate(course.get("modules", [])):
+            modules.append({
+                "course_id": course.get("id", course["title"]),
+                "course_title": course["title"],
+                "course_price": course.get("price"),
+                "course_module_count": len(course["modules"]),
+                "module_position": position,
+                "title": module["title"],
+                "description": module.get("description", ""),
+                "subtopics": module.get("subtopics", []),
+                "skills": course.get("skills", []),
+            })
+    return modules
+
+
+def module_key(module: Dict) -> str:
+    return f"{module['course_id']}:{module['module_position']}"
+
+
+def module_text(module: Dict) -> str:
+    """Text that gets embedded for a module (must match at build and query time)."""
+    return f"{module['course_title']} - {module['title']}: {module['description']} ({', '.join(module['subtopics'])})"
+
+
+def catalog_hash(courses: List[Dict]) -> str:
+    # Reason: Hash the parsed catalog (not the raw file) so whitespace-only edits don't invalidate the index
+    payload = json.dumps(courses, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def index_dir(manifest: Optional[Dict]) -> Path:
+    """Directory holding the files a manifest describes (flat INDEX_DIR for manifests from before versioning)."""
+    version = (manifest or {}).get("version")
+    return VERSIONS_DIR / version if version else INDEX_DIR
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Optional[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -1,51 +1,229 @@
 """
-Embeds all course descriptions using OpenAI text-embedding-ada-002 and stores them in a FAISS index.
-Saves metadata mapping for retrieval.
+Incremental course embedding job for the persisted FAISS indexes.
+- Builds two indexes: one vector per course (courses.index) and one per module (modules.index).
+- Sends course and module texts to the OpenAI embeddings API in large batches with bounded concurrency.
+- Keeps a manifest of per-course and per-module content hashes: a rerun only embeds new or changed
+  entries and drops deleted ones; unchanged vectors are copied over from the previous index.
+- Writes the index and metadata files into a new, never-modified faiss_index/versions/<version>/
+  directory, then atomically replaces manifest.json to point at it. A reader that loads the manifest
+  first always gets files from one build; the last KEEP_VERSIONS builds are kept for slow readers.
+Run from backend/: python -m embeddings.embed_courses [--batch-size 256] [--concurrency 4] [--full]
 """
+import argparse
+import asyncio
+import hashlib
 import json
 import os
+import shutil
+import time
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
 import faiss
 import numpy as np
-import openai
 from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+from llm_scheduler import BATCH, estimate_tokens, get_scheduler, llm_priority
+from openai_clients import get_openai_client
+
+from embeddings.catalog import (
+    EMBEDDING_DIM,
+    EMBEDDING_MODEL,
+    INDEX_DIR,
+    INDEX_FILE,
+    MANIFEST_PATH,
+    META_FILE,
+    MODULE_INDEX_FILE,
+    MODULE_META_FILE,
+    VERSIONS_DIR,
+    catalog_hash,
+    catalog_modules,
+    course_text,
+    index_dir,
+    load_catalog,
+    load_manifest,
+    module_key,
+    module_text,
+)
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_CONCURRENCY = 4
+KEEP_VERSIONS = 3
+
+
+def course_key(course: Dict) -> str:
+    return str(course.get("id", course["title"]))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def embed_texts(client: AsyncOpenAI, texts: List[str], batch_size: int, concurrency: int) -> List[List[float]]:
+    """
+    Embeds texts in batches, at most `concurrency` requests in flight; preserves input order.
+    Runs in the scheduler's batch lane, so live traffic keeps priority.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def embed_batch(batch: List[str]) -> List[List[float]]:
+        async with semaphore:
+            resp = await get_scheduler().run(
+                lambda: client.embeddings.create(input=batch, model=EMBEDDING_MODEL), estimate_tokens(batch),
+            )
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    with llm_priority(BATCH):
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+    return [vector for batch in results for vector in batch]
+
+
+def _load_previous_vectors(index_path: Path, entries: Dict[str, Dict]) -> Optional[faiss.Index]:
+    if not entries or not index_path.exists():
+        return None
+    index = faiss.read_index(str(index_path))
+    if any(entry["row"] >= index.ntotal for entry in entries.values()):
+        return None
+    return index
+
+
+async def sync_index(
+    client: AsyncOpenAI,
+    items: List[Dict],
+    key_fn: Callable[[Dict], str],
+    text_fn: Callable[[Dict], str],
+    index_path: Path,
+    previous_entries: Dict[str, Dict],
+    batch_size: int,
+    concurrency: int,
+) -> Tuple[faiss.Index, Dict[str, Dict], Dict[str, int]]:
+    """
+    Builds an index whose rows follow `items` order, reusing vectors whose content hash is unchanged.
+    Returns (index, manifest entries keyed by item key, stats).
+    """
+    previous_index = _load_previous_vectors(index_path, previous_entries)
+    keys = [key_fn(item) for item in items]
+    texts = [text_fn(item) for item in items]
+    hashes = [content_hash(text) for text in texts]
+
+    to_embed = [
+        row for row, (key, digest) in enumerate(zip(keys, hashes))
+        if previous_index is None or previous_entries.get(key, {}).get("hash") != digest
+    ]
+    fresh = await embed_texts(client, [texts[row] for row in to_embed], batch_size, concurrency) if to_embed else []
+
+    dim = len(fresh[0]) if fresh else (previous_index.d if previous_index is not None else EMBEDDING_DIM)
+    vectors = np.empty((len(items), dim), dtype="float32")
+    for row, vector in zip(to_embed, fresh):
+        vectors[row] = vector
+    embedded = set(to_embed)
+    for row, key in enumerate(keys):
+        if row not in embedded:
+            vectors[row] = previous_index.reconstruct(previous_entries[key]["row"])
+
+    index = faiss.IndexFlatL2(dim)
+    index.add(vectors)
+    entries = {key: {"hash": digest, "row": row} for row, (key, digest) in enumerate(zip(keys, hashes))}
+    stats = {
+        "embedded": len(to_embed),
+        "reused": len(items) - len(to_embed),
+        "dropped": len(set(previous_entries) - set(keys)),
+    }
+    return index, entries, stats
+
+
+def _replace_atomically(path: Path, write: Callable[[Path], None]) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(data) -> Callable[[Path], None]:
+    def write(path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    return write
+
+
+def _prune_versions(current: str) -> None:
+    # Reason: Version names start with a UTC timestamp, so name order is build order
+    older = sorted(p for p in VERSIONS_DIR.iterdir() if p.is_dir() and p.name != current)
+    for path in older[:len(older) - (KEEP_VERSIONS - 1)]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+async def rebuild_index(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    full: bool = False,
+    client: Optional[AsyncOpenAI] = None,
+) -> Dict[str, Dict[str, int]]:
+    courses = load_catalog()
+    if not courses:
+        raise RuntimeError("Course catalog is empty; nothing to embed.")
+    if len({course_key(c) for c in courses}) != len(courses):
+        raise RuntimeError("Course ids in courses.json must be unique.")
+
+    manifest = load_manifest(MANIFEST_PATH) or {}
+    if full or manifest.get("model") != EMBEDDING_MODEL:
+        manifest = {}
+
+    previous_dir = index_dir(manifest)
+    client = client or get_openai_client()
+    modules = catalog_modules(courses)
+    (index, entries, stats), (module_index, module_entries, module_stats) = await asyncio.gather(
+        sync_index(
+            client, courses, course_key, course_text, previous_dir / INDEX_FILE,
+            manifest.get("courses", {}), batch_size, concurrency,
+        ),
+        sync_index(
+            client, modules, module_key, module_text, previous_dir / MODULE_INDEX_FILE,
+            manifest.get("modules", {}), batch_size, concurrency,
+        ),
+    )
+
+    digest = catalog_hash(courses)
+    now_ns = time.time_ns()
+    version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now_ns / 1e9))}.{now_ns % 10**9:09d}-{digest[:12]}"
+    staging = VERSIONS_DIR / f".{version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    faiss.write_index(index, str(staging / INDEX_FILE))
+    _write_json(courses)(staging / META_FILE)
+    faiss.write_index(module_index, str(staging / MODULE_INDEX_FILE))
+    _write_json(modules)(staging / MODULE_META_FILE)
+    os.rename(staging, VERSIONS_DIR / version)
+
+    # Reason: The manifest swap is the single atomic step that switches readers to the new files
+    _replace_atomically(MANIFEST_PATH, _write_json({
+        "version": version,
+        "model": EMBEDDING_MODEL,
+        "catalog_hash": digest,
+        "count": len(courses),
+        "module_count": len(modules),
+        "courses": entries,
+        "modules": module_entries,
+    }))
+    _prune_versions(version)
+    return {"courses": stats, "modules": module_stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally (re)build the course and module FAISS indexes.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Texts per embeddings request.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Max embeddings requests in flight.")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-embed everything.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    started = time.perf_counter()
+    stats = asyncio.run(rebuild_index(args.batch_size, args.concurrency, args.full))
+    for kind, counts in stats.items():
+        print(f"{kind}: embedded {counts['embedded']}, reused {counts['reused']}, dropped {counts['dropped']}")
+    print(f"Done in {time.perf_counter() - started:.1f}s -> {INDEX_DIR}")
+
 
-COURSE_PATH = Path(__file__).parent / "courses.json"
-INDEX_DIR = Path(__file__).parent / "faiss_index"
-INDEX_DIR.mkdir(exist_ok=True)
-INDEX_PATH = INDEX_DIR / "courses.index"
-META_PATH = INDEX_DIR / "metadata.json"
-
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
-EMBEDDING_MODEL = "text-embedding-ada-002"
-EMBEDDING_DIM = 1536
-
-with open(COURSE_PATH, "r", encoding="utf-8") as f:
-    courses = json.load(f)
-
-vectors = []
-metadata = []
-
-for course in courses:
-    text = f"{course['title']}: {course['description']}"
-    try:
-        resp = openai.Embedding.create(input=text, model=EMBEDDING_MODEL)
-        emb = resp["data"][0]["embedding"]
-        vectors.append(emb)
-        metadata.append(course)
-        print(f"Embedded: {course['title']}")
-    except Exception as e:
-        print(f"Error embedding {course['title']}: {e}")
-
-if not vectors:
-    raise RuntimeError("No embeddings generated. Check OpenAI API key and input data.")
-
-vectors_np = np.array(vectors).astype("float32")
-index = faiss.IndexFlatL2(EMBEDDING_DIM)
-index.add(vectors_np)
-faiss.write_index(index, str(INDEX_PATH))
-with open(META_PATH, "w", encoding="utf-8") as f:
-    json.dump(metadata, f, ensure_ascii=False, indent=2)
-print(f"Saved {len(vectors)} course embeddings to {INDEX_PATH} and metadata to {META_PATH}")
+if __name__ == "__main__":
+    main()
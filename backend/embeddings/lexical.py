@@ -0,0 +1,131 @@
+"""
+Lexical course indexes used alongside FAISS for hybrid retrieval.
+- SkillIndex: inverted index from normalized skill tag to course rows (exact tag hits in O(matches)).
+- BM25Index: Okapi BM25 over title, description, skills and module titles/descriptions/subtopics.
+- LexicalCourseIndex: both indexes over one course list, plus reciprocal-rank fusion helpers.
+Rows are positions in the course list, so they line up with FAISS row ids built from the same list.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+# Reciprocal rank fusion constant (Cormack et al.); larger values flatten the rank curve
+RRF_K = 60
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(skill.split()).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    # Keeps tokens like "c++", "c#" and "node.js" intact
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def course_document(course: Dict) -> str:
+    # Also indexes module entries from catalog_modules (top-level subtopics, no nested modules)
+    parts = [
+        course.get("title", ""),
+        course.get("description", ""),
+        " ".join(course.get("skills", [])),
+        " ".join(course.get("subtopics", [])),
+    ]
+    for module in course.get("modules", []):
+        parts += [module.get("title", ""), module.get("description", ""), " ".join(module.get("subtopics", []))]
+    return " ".join(parts)
+
+
+class SkillIndex:
+    def __init__(self, courses: Sequence[Dict]):
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for row, course in enumerate(courses):
+            for skill in {normalize_skill(s) for s in course.get("skills", [])}:
+                self.postings[skill].append(row)
+
+    def lookup(self, skills: Iterable[str]) -> Dict[int, int]:
+        """Returns {row: number of the given skills tagged on that course}."""
+        hits: Dict[int, int] = Counter()
+        for skill in {normalize_skill(s) for s in skills}:
+            for row in self.postings.get(skill, ()):
+                hits[row] += 1
+        return hits
+
+    def covers(self, skills: Iterable[str]) -> bool:
+        return all(normalize_skill(s) in self.postings for s in skills)
+
+
+class BM25Index:
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[tuple]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        for row, document in enumerate(documents):
+            counts = Counter(tokenize(document))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((row, tf))
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+        n = len(self.doc_lengths)
+        self.idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in self.postings.items()}
+
+    def score(self, query: str) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for row, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[row] / self.avg_length)
+                scores[row] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+
+def ranked(scores: Dict[int, float]) -> List[int]:
+    """Rows ordered by descending score, ties broken by catalog order for determinism."""
+    return sorted(scores, key=lambda row: (-scores[row], row))
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[int]], weights: Sequence[float]) -> Dict[int, float]:
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, row in enumerate(ranking):
+            fused[row] += weight / (RRF_K + rank + 1)
+    return fused
+
+
+def first_tagged(skills: Iterable[str], items: Sequence[Dict]) -> Dict[str, int]:
+    """{skill: first row in `items` whose skills tags contain it}; untagged skills are omitted."""
+    wanted = {normalize_skill(s): s for s in skills}
+    matches: Dict[str, int] = {}
+    for row, item in enumerate(items):
+        for tag in {normalize_skill(t) for t in item.get("skills", [])} & wanted.keys():
+            matches.setdefault(wanted[tag], row)
+    return matches
+
+
+class LexicalCourseIndex:
+    # Reason: Exact tag hits are the most reliable signal, so they outweigh BM25 and dense ranks
+    SKILL_WEIGHT = 2.0
+    BM25_WEIGHT = 1.0
+
+    def __init__(self, courses: Sequence[Dict]):
+        self.courses = courses
+        self.skills = SkillIndex(courses)
+        self.bm25 = BM25Index([course_document(course) for course in courses])
+
+    def rankings(self, skills_gap: Sequence[str]) -> tuple:
+        """Returns (skill-tag ranking, BM25 ranking) as lists of rows."""
+        skill_hits = self.skills.lookup(skills_gap)
+        return ranked(skill_hits), ranked(self.bm25.score(" ".join(skills_gap)))
+
+    def search(self, skills_gap: Sequence[str], top_n: int, dense_ranking: List[int] = (), dense_weight: float = 1.0) -> List[int]:
+        skill_ranking, bm25_ranking = self.rankings(skills_gap)
+        fused = reciprocal_rank_fusion(
+            [skill_ranking, bm25_ranking, list(dense_ranking)],
+            [self.SKILL_WEIGHT, self.BM25_WEIGHT, dense_weight],
+        )
+        return ranked(fused)[:top_n]
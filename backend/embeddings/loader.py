@@ -1,15 +1,118 @@
+"""
+Static quiz pool, indexed by normalized (skill, module_title).
+- Loaded once into a dict, so lookups are O(1) with no file I/O per request.
+- Hot-reloaded when a source file changes (mtime/size checked at most every QUIZ_POOL_CHECK_S seconds).
+  A file that vanishes between listing and stat is skipped; if the listing itself fails, the
+  previous snapshot stays in use.
+- Sources: quizzes.json (JSON list) plus any *.json / *.jsonl shards in quizzes.d/;
+  later sources override earlier ones for the same (skill, module_title).
+"""
 import json
+import threading
+import time
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import settings
 
 QUIZ_PATH = Path(__file__).parent / "quizzes.json"
+QUIZ_SHARD_DIR = Path(__file__).parent / "quizzes.d"
+
+QuizKey = Tuple[str, str]
+
+
+def quiz_key(skill: str, module_title: str) -> QuizKey:
+    return " ".join(skill.split()).casefold(), " ".join(module_title.split()).casefold()
+
+
+def _read_entries(path: Path) -> Iterable[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    print(f"[QUIZ] Skipping malformed line {path.name}:{line_no}: {e}")
+        else:
+            yield from json.load(f)
+
+
+class QuizPool:
+    def __init__(self, path: Path = QUIZ_PATH, shard_dir: Path = QUIZ_SHARD_DIR, check_interval: float = 5.0):
+        self.path = path
+        self.shard_dir = shard_dir
+        self.check_interval = check_interval
+        self._index: Dict[QuizKey, List[Dict]] = {}
+        self._signature = None
+        self._last_check = float("-inf")
+        self._lock = threading.Lock()
+
+    def _sources(self) -> List[Path]:
+        sources = [self.path] if self.path.exists() else []
+        if self.shard_dir.is_dir():
+            sources += sorted(p for p in self.shard_dir.iterdir() if p.suffix in (".json", ".jsonl"))
+        return sources
+
+    def _snapshot(self) -> Tuple[List[Path], Tuple]:
+        """Sources that still exist, with their (path, mtime, size) signature; one stat per file."""
+        sources, signature = [], []
+        for path in self._sources():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            sources.append(path)
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return sources, tuple(signature)
+
+    def _load(self, sources: List[Path]) -> Dict[QuizKey, List[Dict]]:
+        index = {}
+        for path in sources:
+            try:
+                for entry in _read_entries(path):
+                    index[quiz_key(entry["skill"], entry["module_title"])] = entry["quiz"]
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"[QUIZ] Failed to load {path}: {e}")
+        return index
+
+    def refresh(self, force: bool = False) -> None:
+        """Reloads the pool if any source file was added, removed or modified."""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            try:
+                sources, signature = self._snapshot()
+            except OSError as e:
+                print(f"[QUIZ] Could not list quiz sources, keeping the current pool: {e}")
+                return
+            if force or signature != self._signature:
+                self._index = self._load(sources)
+                self._signature = signature
+                print(f"[QUIZ] Loaded {len(self._index)} quizzes from {len(sources)} file(s)")
+
+    def get(self, skill: str, module_title: str) -> Optional[List[Dict]]:
+        self.refresh()
+        return self._index.get(quiz_key(skill, module_title))
+
+    def __contains__(self, key: QuizKey) -> bool:
+        self.refresh()
+        return key in self._index
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._index)
+
+
+_POOL = QuizPool(check_interval=settings.QUIZ_POOL_CHECK_S)
+
+
+def get_quiz_pool() -> QuizPool:
+    return _POOL
+
 
 def load_quiz(skill: str, module_title: str):
-    try:
-        with open(QUIZ_PATH, "r", encoding="utf-8") as f:
-            quizzes = json.load(f)
-        for q in quizzes:
-            if q["skill"].lower() == skill.lower() and q["module_title"].lower() == module_title.lower():
-                return q["quiz"]
-    except Exception:
-        pass
-    return None
+    return _POOL.get(skill, module_title)
@@ -1,23 +1,32 @@
 """
-Dummy retriever for course embeddings.
-Replace with real FAISS vector search logic later.
+Embedding-free course retrieval over the catalog.
+- Ranks courses by exact skill-tag hits fused with BM25 over title, description and modules
+  (embeddings/lexical.py); CourseRetriever adds FAISS similarity on top of the same index.
+- Pads deterministically (catalog order) instead of with random samples.
+- The catalog and index are built on first use, not at import time.
 """
-import json
-from pathlib import Path
-import random
+from typing import Dict, List, Optional
 
-COURSE_PATH = Path(__file__).parent / "courses.json"
+from embeddings.catalog import load_catalog
+from embeddings.lexical import LexicalCourseIndex
 
-with open(COURSE_PATH, "r", encoding="utf-8") as f:
-    COURSES = json.load(f)
+_INDEX: Optional[LexicalCourseIndex] = None
 
-def retrieve_courses(skill_gap=None, top_n=3):
-    """Return top_n random courses that match any skill in skill_gap."""
-    if not skill_gap:
-        return random.sample(COURSES, min(top_n, len(COURSES)))
-    filtered = [c for c in COURSES if any(s.lower() in [sk.lower() for sk in c["skills"]] for s in skill_gap)]
-    if len(filtered) < top_n:
-        filtered += random.sample(COURSES, min(top_n - len(filtered), len(COURSES)))
-    return filtered[:top_n]
+
+def _default_index() -> LexicalCourseIndex:
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = LexicalCourseIndex(load_catalog())
+    return _INDEX
+
+
+def retrieve_courses(skill_gap=None, top_n=3, index: Optional[LexicalCourseIndex] = None) -> List[Dict]:
+    """Return the top_n best-matching courses for skill_gap, padded in catalog order if fewer match."""
+    index = index or _default_index()
+    rows = index.search(skill_gap, top_n) if skill_gap else []
+    if len(rows) < top_n:
+        selected = set(rows)
+        rows += [row for row in range(len(index.courses)) if row not in selected][:top_n - len(rows)]
+    return [index.courses[row] for row in rows]
 
 # Usage: retrieve_courses(["Python", "React"])
@@ -3,30 +3,35 @@ Resume file parser for PDF and TXT resumes using PyMuPDF (fitz).
 - Securely extracts text and images from PDF or TXT files for pipeline ingestion.
 - Input: file-like object (e.g., UploadFile.file or BytesIO)
 - Output: extracted plain text (str) and optional image paths (list)
+- ingest_resume is the single-pass, in-memory entry point run in the parsing process pool (parsing_pool.py).
+- PyMuPDF is imported on first use: the API process only hands these functions to the pool workers.
 """
 
 import io
 import os
-import fitz  # PyMuPDF
-from typing import BinaryIO
+from typing import BinaryIO, Optional
 
 
 
-def extract_resume_text(file: BinaryIO, filename: str) -> str:
+def extract_resume_text(file: BinaryIO, filename: str, max_pages: Optional[int] = None) -> str:
     """
     Extracts text from a PDF or TXT resume file using fitz.
     Args:
         file: File-like object (opened in binary mode)
         filename: Name of the uploaded file (for type detection)
+        max_pages: Only read the first max_pages pages of a PDF (None = all)
     Returns:
         Extracted plain text
     Raises:
         ValueError: If file type is unsupported or extraction fails
     """
     if filename.lower().endswith(".pdf"):
+        import fitz  # PyMuPDF
+
         try:
             doc = fitz.open(stream=file, filetype="pdf")
-            text = "\n".join([page.get_text() for page in doc])
+            page_count = len(doc) if max_pages is None else min(len(doc), max_pages)
+            text = "\n".join([doc[i].get_text() for i in range(page_count)])
             if not text.strip():
                 raise ValueError("No extractable text found in PDF.")
             return text.strip()
@@ -44,13 +49,16 @@ def extract_resume_text(file: BinaryIO, filename: str) -> str:
         raise ValueError("Unsupported file type. Only PDF and TXT are accepted.")
 
 
-def extract_images_from_pdf(file: BinaryIO, output_dir: str = "images") -> list[str]:
+def extract_images_from_pdf(file: BinaryIO, output_dir: str = "images", max_pages: Optional[int] = None) -> list[str]:
+    import fitz  # PyMuPDF
+
     doc = fitz.open(stream=file, filetype="pdf")
     image_paths = []
 
     os.makedirs(output_dir, exist_ok=True)
 
-    for page_index in range(len(doc)):
+    page_count = len(doc) if max_pages is None else min(len(doc), max_pages)
+    for page_index in range(page_count):
         for img_index, img in enumerate(doc[page_index].get_images(full=True)):
             xref = img[0]
             base_image = doc.extract_image(xref)
@@ -65,10 +73,64 @@ def extract_images_from_pdf(file: BinaryIO, output_dir: str = "images") -> list[
     return image_paths
 
 
-# ------------ CLI Test Runner ------------
-from PIL import Image
+# Reason: Skip icons, logos and separators; a candidate photo is reasonably sized and roughly square
+AVATAR_MIN_SIDE = 64
+AVATAR_MAX_ASPECT = 2.0
+
+
+def _looks_like_avatar(width: int, height: int) -> bool:
+    if min(width, height) < AVATAR_MIN_SIDE:
+        return False
+    return max(width, height) / min(width, height) <= AVATAR_MAX_ASPECT
+
 
+def ingest_resume(file: bytes, filename: str, max_pages: Optional[int] = None) -> dict:
+    """
+    Single-pass resume ingestion; meant to run in a worker process (parsing_pool.py).
+    Opens a PDF once, reads page text and decodes only the first avatar-like image,
+    skipping image scanning for the remaining pages once it is found. Nothing is written to disk.
+    Returns: {"text": str, "avatar": bytes | None, "avatar_ext": str | None}
+    """
+    if not filename.lower().endswith(".pdf"):
+        return {"text": extract_resume_text(file, filename), "avatar": None, "avatar_ext": None}
+    import fitz  # PyMuPDF
+
+    try:
+        doc = fitz.open(stream=file, filetype="pdf")
+    except Exception as e:
+        raise ValueError(f"PDF extraction failed: {e}")
+
+    texts = []
+    avatar, avatar_ext = None, None
+    page_count = len(doc) if max_pages is None else min(len(doc), max_pages)
+    try:
+        for page_index in range(page_count):
+            page = doc[page_index]
+            texts.append(page.get_text())
+            if avatar is not None:
+                continue
+            # get_images(full=True) rows: (xref, smask, width, height, ...); decode only the chosen one
+            for img in page.get_images(full=True):
+                if _looks_like_avatar(img[2], img[3]):
+                    base_image = doc.extract_image(img[0])
+                    avatar, avatar_ext = base_image["image"], base_image["ext"]
+                    break
+    except Exception as e:
+        # Reason: A corrupt page is a bad upload (400), not a server error
+        raise ValueError(f"PDF extraction failed on page {page_index + 1}: {e}")
+    finally:
+        doc.close()
+
+    text = "\n".join(texts).strip()
+    if not text:
+        raise ValueError("PDF extraction failed: No extractable text found in PDF.")
+    return {"text": text, "avatar": avatar, "avatar_ext": avatar_ext}
+
+
+# ------------ CLI Test Runner ------------
 if __name__ == "__main__":
+    from PIL import Image
+
     test_files = [
         ("SampleResumeHack.pdf", "application/pdf"),
         ("SampleResumeHack.txt", "text/plain"),
@@ -0,0 +1,170 @@
+"""
+Batch execution of the recommendation DAG for many (resume_text, chat_transcript) pairs.
+- Stages up to the skill gap run per item, at most `concurrency` items at a time.
+- Candidate retrieval runs in waves (CourseRetriever.retrieve_modules_many: one embeddings
+  request and one FAISS search per wave). A wave is sent once BATCH_RETRIEVAL_WAVE_SIZE items
+  are ready for it, or BATCH_RETRIEVAL_WAVE_MS after its first item was, so early items don't
+  wait for the slowest item in the batch.
+- The remaining stages run per item as soon as its wave is retrieved; results are yielded as
+  each item finishes.
+- LLM and embedding calls run in the scheduler's batch lane, behind interactive requests.
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import settings
+from course_retriever import get_course_retriever
+from graph.dag import Node, PipelineState, iter_graph, select_nodes
+from llm_scheduler import BATCH, llm_priority
+from telemetry import span
+
+RETRIEVAL_STAGE = "course_candidates"
+
+
+def split_at_retrieval(nodes: List[Node]) -> Tuple[List[Node], Optional[Node], List[Node]]:
+    """(nodes independent of retrieval, the retrieval node or None, nodes downstream of it)."""
+    retrieval = next((node for node in nodes if node.name == RETRIEVAL_STAGE), None)
+    if retrieval is None:
+        return nodes, None, []
+    downstream_fields = set(retrieval.outputs)
+    post = []
+    # Reason: Nodes are listed in pipeline order, so one pass propagates downstream fields
+    for node in nodes:
+        if node is not retrieval and downstream_fields & set(node.inputs):
+            downstream_fields |= set(node.outputs)
+            post.append(node)
+    pre = [node for node in nodes if node is not retrieval and node not in post]
+    return pre, retrieval, post
+
+
+async def iter_batch(
+    inputs: List[Tuple[str, str]],
+    concurrency: Optional[int] = None,
+    stages: Optional[Iterable[str]] = None,
+    should_continue: Callable[[Dict[str, Any]], bool] = lambda values: True,
+) -> AsyncIterator[Tuple[int, Union[PipelineState, Exception]]]:
+    """
+    Runs the pipeline for each (resume_text, chat_transcript) and yields (position, final state or
+    the exception it failed with) in completion order. Items for which `should_continue(values)` is
+    false after the pre-retrieval stages are yielded right away without running the rest.
+    """
+    pre, retrieval, post = split_at_retrieval(select_nodes(stages))
+    wave_size = max(1, settings.BATCH_RETRIEVAL_WAVE_SIZE)
+    wave_wait = settings.BATCH_RETRIEVAL_WAVE_MS / 1000
+    semaphore = asyncio.Semaphore(concurrency or settings.BATCH_CONCURRENCY)
+    values = [{"resume_text": resume_text, "chat_transcript": transcript} for resume_text, transcript in inputs]
+    timings: List[Dict[str, float]] = [{} for _ in inputs]
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def finish(i: int, error: Optional[Exception] = None) -> None:
+        queue.put_nowait((i, error or PipelineState.model_construct(**values[i], timings=timings[i])))
+
+    async def run_stages(i: int, nodes: List[Node]) -> bool:
+        try:
+            async with semaphore:
+                async for name, _, elapsed in iter_graph(nodes, values[i]):
+                    timings[i][name] = round(elapsed, 4)
+        except Exception as e:
+            finish(i, e)
+            return False
+        return True
+
+    async def first_phase(i: int) -> bool:
+        if not await run_stages(i, pre):
+            return False
+        if not should_continue(values[i]):
+            finish(i)
+            return False
+        return True
+
+    async def second_phase(i: int) -> None:
+        if await run_stages(i, post):
+            finish(i)
+
+    async def retrieve_wave(wave: List[int]) -> List[int]:
+        """Fills candidate_modules for the wave; returns the items that can go on to the next stages."""
+        if retrieval is None:
+            return wave
+        started = time.perf_counter()
+        try:
+            retriever = get_course_retriever()
+            with span("dag.node", RETRIEVAL_STAGE) as retrieval_span:
+                retrieval_span.set(batch_size=len(wave))
+                # Reason: Query embedding is a blocking HTTP call; keep it off the event loop
+                candidates = await asyncio.to_thread(
+                    retriever.retrieve_modules_many,
+                    [values[i].get("skills_gap") or [] for i in wave],
+                    settings.MODULE_CANDIDATES,
+                )
+        except Exception as e:
+            for i in wave:
+                finish(i, e)
+            return []
+        elapsed = round(time.perf_counter() - started, 4)
+        for i, candidate_modules in zip(wave, candidates):
+            values[i]["candidate_modules"] = candidate_modules
+            timings[i][RETRIEVAL_STAGE] = elapsed
+        return wave
+
+    async def drive() -> None:
+        loop = asyncio.get_running_loop()
+        ready: asyncio.Queue = asyncio.Queue()
+
+        async def run_first_phase(i: int) -> None:
+            if await first_phase(i):
+                ready.put_nowait(i)
+
+        first_phases = asyncio.ensure_future(asyncio.gather(*(run_first_phase(i) for i in range(len(inputs)))))
+        second_phases = []
+        try:
+            while True:
+                wave: List[int] = []
+                deadline = None
+                while len(wave) < wave_size:
+                    if not ready.empty():
+                        wave.append(ready.get_nowait())
+                        deadline = deadline or loop.time() + wave_wait
+                        continue
+                    if first_phases.done():
+                        break
+                    timeout = None if deadline is None else deadline - loop.time()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    getter = asyncio.ensure_future(ready.get())
+                    await asyncio.wait({getter, first_phases}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    if getter.done():
+                        wave.append(getter.result())
+                        deadline = deadline or loop.time() + wave_wait
+                    else:
+                        getter.cancel()
+                if not wave:
+                    break
+                second_phases += [asyncio.ensure_future(second_phase(i)) for i in await retrieve_wave(wave)]
+            await first_phases
+            await asyncio.gather(*second_phases)
+        finally:
+            for task in [first_phases, *second_phases]:
+                task.cancel()
+
+    with llm_priority(BATCH):
+        # Reason: The driver task and everything it spawns inherit the lane from this context
+        driver = asyncio.create_task(drive())
+    try:
+        for _ in inputs:
+            if not driver.done():
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, driver}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                    continue
+                getter.cancel()
+            if queue.empty():
+                driver.result()  # Re-raises a driver failure
+                raise RuntimeError("Batch finished without a result for every item.")
+            yield queue.get_nowait()
+        await driver
+    finally:
+        if not driver.done():
+            driver.cancel()
+            await asyncio.gather(driver, return_exceptions=True)
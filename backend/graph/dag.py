@@ -1,14 +1,25 @@
 """
-Async LangGraph DAG orchestration for Personalized Learning Marketplace.
-Wires resume_agent, conversation_agent, course_retrieval_agent, pricing_agent.
+Async DAG orchestration for Personalized Learning Marketplace.
+Wires resume_agent, conversation_agent, course_retrieval_agent and quiz_agent, plus the
+deterministic bundle optimizer for pricing.
+- Each node declares the state fields it reads and writes; a node starts as soon as the
+  nodes producing its inputs have finished, so independent nodes run concurrently.
+- Per-node wall time is recorded in PipelineState.timings and as a "dag.node" span (telemetry.py).
 """
+from dataclasses import dataclass
 from pydantic import BaseModel
-from typing import Any, List
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import settings
+from telemetry import current_span, span
+from llm_agents.agent_cache import run_agent
 from llm_agents.resume_agent import resume_agent, ResumeAgentOutput
 from llm_agents.conversation_agent import conversation_agent, ConversationAgentOutput
-from llm_agents.course_retrieval_agent import course_retrieval_agent, CourseRetrievalAgentOutput
-from llm_agents.pricing_agent import pricing_agent, PricingAgentOutput
-from llm_agents.quiz_agent import quiz_agent, QuizAgentOutput
+from llm_agents.course_retrieval_agent import course_retrieval_agent, CourseRetrievalAgentOutput, build_course_retrieval_prompt
+from llm_agents.module_selector import select_modules
+from bundle_optimizer import optimize_bundle
+from llm_agents.quiz_agent import quiz_agent, QuizAgentOutput, build_quiz_prompt
 
 class PipelineState(BaseModel):
     resume_text: str = ""
@@ -19,22 +30,27 @@ class PipelineState(BaseModel):
     goal_skills: Any = None
     budget_eur: Any = None
 
-    # Commented out since not used in this step
     skills: Any = None
-    # summary: Any = None
+    summary: Any = None
     skills_gap: Any = None
+    candidate_modules: Any = None
     recommended_modules: Any = None
-    # final_bundle: Any = None
-    # quiz: Any = None
+    # {"path": "fast" | "llm", "confidence": float}, set by the course_retrieval node
+    course_selection: Any = None
+    final_bundle: Any = None
+    quiz: Any = None
     # quiz_score: Any = None
 
+    # Seconds spent in each node that ran
+    timings: Dict[str, float] = {}
+
 async def run_resume_agent(state: PipelineState) -> dict:
-    result = await resume_agent.run(state.resume_text)
-    return {"skills": result.output.skills, "summary": result.output.summary}
+    output = await run_agent(resume_agent, state.resume_text)
+    return {"skills": output.skills, "summary": output.summary}
 
 async def run_conversation_agent(state: PipelineState) -> dict:
-    result = await conversation_agent.run(state.chat_transcript)
-    return {"target_role": result.output.target_role, "goal_skills": result.output.goal_skills, "budget_eur": result.output.budget_eur}
+    output = await run_agent(conversation_agent, state.chat_transcript)
+    return {"target_role": output.target_role, "goal_skills": output.goal_skills, "budget_eur": output.budget_eur}
 
 async def compute_skills_gap(state: PipelineState) -> dict:
     skills = set(state.skills or [])
@@ -42,47 +58,129 @@ async def compute_skills_gap(state: PipelineState) -> dict:
     gap = list(goals - skills)
     return {"skills_gap": gap}
 
-from course_retriever import CourseRetriever
+from course_retriever import get_course_retriever
+
+async def retrieve_course_candidates(state: PipelineState) -> dict:
+    """
+    Retrieves the top-N relevant modules (from the module-level index) for the user's skill gap.
+    Returns: {"candidate_modules": ...}
+    """
+    retriever = get_course_retriever()
+    # Reason: Query embedding is a blocking HTTP call; keep it off the event loop
+    candidate_modules = await asyncio.to_thread(retriever.retrieve_modules, state.skills_gap, settings.MODULE_CANDIDATES)
+    return {"candidate_modules": candidate_modules}
 
 async def run_course_retrieval_agent(state: PipelineState) -> dict:
     """
-    Retrieves top-N relevant courses (with modules), then uses LLM to select and package the most relevant modules/subtopics for the user's skill gap.
-    Returns: {"recommended_modules": ...}
+    Selects and packages the most relevant candidate modules/subtopics for the user's skill gap.
+    Takes the deterministic fast path when every gap skill is confidently matched by a tagged module
+    (tags are course-level, see llm_agents/module_selector.py), otherwise asks the LLM.
+    The path and confidence are recorded on the "dag.node" span.
+    Returns: {"recommended_modules": ..., "course_selection": {"path": "fast" | "llm", "confidence": ...}}
     """
-    retriever = CourseRetriever()
-    candidate_courses = retriever.retrieve(state.skills_gap, top_k=5)
+    candidate_modules = state.candidate_modules
+    if candidate_modules is None:
+        candidate_modules = (await retrieve_course_candidates(state))["candidate_modules"]
+    recommended, confidence = select_modules(state.skills_gap or [], candidate_modules)
+    node_span = current_span()
+    if node_span is not None:
+        node_span.set(selection_path="fast" if recommended is not None else "llm", selection_confidence=confidence)
+    if recommended is not None:
+        return {"recommended_modules": recommended, "course_selection": {"path": "fast", "confidence": confidence}}
     # Use LLM to select/package modules
-    result = await course_retrieval_agent.run(skills_gap=state.skills_gap, candidate_courses=candidate_courses)
-    return {"recommended_modules": result.output.recommended_modules}
+    output = await run_agent(course_retrieval_agent, build_course_retrieval_prompt(state.skills_gap, candidate_modules))
+    return {"recommended_modules": output.recommended_modules, "course_selection": {"path": "llm", "confidence": confidence}}
 
-async def run_pricing_agent(state: PipelineState) -> dict:
-    result = await pricing_agent.run(recommended_modules=state.recommended_modules, budget_eur=state.budget_eur)
-    return {"final_bundle": result.output.final_bundle}
+async def run_pricing(state: PipelineState) -> dict:
+    """
+    Fits recommended_modules to budget_eur with the deterministic knapsack optimizer (no LLM call).
+    Returns: {"final_bundle": [module dict with price and final_price, ...]}
+    """
+    modules = [m.dict() if isinstance(m, BaseModel) else m for m in state.recommended_modules or []]
+    price_book = get_course_retriever().price_book
+    return {"final_bundle": optimize_bundle(modules, state.budget_eur, state.skills_gap or [], price_book)}
 
 async def run_quiz_agent(state: PipelineState) -> dict:
     # Use first missing skill and first course as quiz context
     skill = (state.skills_gap or ["skill"])[0]
     module = state.recommended_modules[0].module_title if state.recommended_modules else "Module"
-    result = await quiz_agent.run(current_skill=skill, module_title=module)
-    return {"quiz": result.output.quiz}
-
-# Orchestration function (async, linear for MVP)
-async def run_full_pipeline(resume_text: str, chat_transcript: str) -> PipelineState:
-    state = PipelineState(resume_text=resume_text, chat_transcript=chat_transcript)
-#    state_dict = await run_resume_agent(state)
-#    state = state.copy(update=state_dict)
-    state_dict = await run_conversation_agent(state)
-    state = state.copy(update=state_dict)
-    state_dict = await compute_skills_gap(state)
-    state = state.copy(update=state_dict)
-    state_dict = await run_course_retrieval_agent(state)
-    state = state.copy(update=state_dict)
-#    state_dict = await run_pricing_agent(state)
-#    state = state.copy(update=state_dict)
-#    state_dict = await run_quiz_agent(state)
-#    state = state.copy(update=state_dict)
-    return state
+    output = await run_agent(quiz_agent, build_quiz_prompt(skill, module))
+    return {"quiz": output.quiz}
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    fn: Callable[[PipelineState], Awaitable[dict]]
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+
+NODES: Dict[str, Node] = {node.name: node for node in [
+    Node("resume", run_resume_agent, ("resume_text",), ("skills", "summary")),
+    Node("conversation", run_conversation_agent, ("chat_transcript",), ("target_role", "goal_skills", "budget_eur")),
+    Node("skills_gap", compute_skills_gap, ("skills", "goal_skills"), ("skills_gap",)),
+    Node("course_candidates", retrieve_course_candidates, ("skills_gap",), ("candidate_modules",)),
+    Node("course_retrieval", run_course_retrieval_agent, ("skills_gap", "candidate_modules"), ("recommended_modules", "course_selection")),
+    Node("pricing", run_pricing, ("skills_gap", "recommended_modules", "budget_eur"), ("final_bundle",)),
+    Node("quiz", run_quiz_agent, ("skills_gap", "recommended_modules"), ("quiz",)),
+]}
+
+def select_nodes(stages: Optional[Iterable[str]] = None) -> List[Node]:
+    stages = list(stages) if stages is not None else settings.PIPELINE_STAGES
+    unknown = [name for name in stages if name not in NODES]
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages: {unknown}")
+    return [NODES[name] for name in stages]
+
+async def _run_node(node: Node, state: PipelineState) -> Tuple[dict, float]:
+    started = time.perf_counter()
+    with span("dag.node", node.name):
+        outputs = await node.fn(state)
+    return outputs, time.perf_counter() - started
+
+async def iter_graph(nodes: List[Node], values: Dict[str, Any]) -> AsyncIterator[Tuple[str, dict, float]]:
+    """
+    Runs nodes as soon as their inputs are available and yields (name, outputs, seconds) as each finishes.
+    An input not produced by any selected node is read from `values` (or the PipelineState default).
+    `values` is updated in place; on error or early exit, still-running nodes are cancelled.
+    """
+    producers = {field: node.name for node in nodes for field in node.outputs}
+    pending = {node.name: node for node in nodes}
+    finished = set()
+    running: Dict[asyncio.Task, Node] = {}
+    try:
+        while pending or running:
+            for name, node in list(pending.items()):
+                if all(producers.get(field) in (None, name) or producers[field] in finished for field in node.inputs):
+                    # Reason: Nodes only read the state, so an unvalidated snapshot is enough
+                    snapshot = PipelineState.model_construct(**values)
+                    running[asyncio.create_task(_run_node(node, snapshot))] = node
+                    del pending[name]
+            if not running:
+                raise RuntimeError(f"Pipeline stages {sorted(pending)} have unsatisfiable dependencies.")
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = running.pop(task)
+                outputs, elapsed = task.result()
+                values.update(outputs)
+                finished.add(node.name)
+                yield node.name, outputs, elapsed
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+async def run_full_pipeline(resume_text: str, chat_transcript: str, stages: Optional[Iterable[str]] = None) -> PipelineState:
+    """
+    Runs the selected stages (default: settings.PIPELINE_STAGES) as a dependency-driven DAG.
+    End-to-end latency is the critical path through the graph, not the sum of all nodes.
+    """
+    values: Dict[str, Any] = {"resume_text": resume_text, "chat_transcript": chat_transcript}
+    timings: Dict[str, float] = {}
+    async for name, _, elapsed in iter_graph(select_nodes(stages), values):
+        timings[name] = round(elapsed, 4)
+    return PipelineState.model_construct(**values, timings=timings)
 
 # Usage example (async):
-# result_state = await run_full_pipeline(resume_text, chat_transcript)
-# print(result_state.final_bundle)
+# result_state = await run_full_pipeline(resume_text, chat_transcript, stages=["resume", "conversation", "skills_gap", "course_retrieval", "pricing", "quiz"])
+# print(result_state.final_bundle, result_state.timings)
@@ -0,0 +1,106 @@
+"""
+Opt-in response cache for pydantic-ai agent runs.
+- Key: sha256 of (model name, system prompt, user input, output type JSON schema).
+- Stores the validated pydantic output as JSON and re-validates it against the output type on a hit.
+- Backends: in-memory LRU + TTL (default) or a persistent local SQLite file (AGENT_CACHE_BACKEND=sqlite).
+- Disabled unless AGENT_CACHE_ENABLED=1; TTL/size via AGENT_CACHE_TTL_S / AGENT_CACHE_MAX_ENTRIES.
+- Every uncached run goes through the shared rate-limit-aware scheduler (llm_scheduler.py).
+"""
+import hashlib
+import json
+from typing import Dict, Optional
+
+from pydantic_ai import Agent
+
+import settings
+from caching import LRUTTLCache, SQLiteTTLCache
+from llm_scheduler import estimate_tokens, get_scheduler
+from telemetry import record_cache, span
+
+_CACHE = None
+_FINGERPRINTS: Dict[int, str] = {}
+
+
+def _get_cache():
+    global _CACHE
+    if _CACHE is None:
+        if settings.AGENT_CACHE_BACKEND == "sqlite":
+            _CACHE = SQLiteTTLCache(settings.AGENT_CACHE_PATH, settings.AGENT_CACHE_MAX_ENTRIES, settings.AGENT_CACHE_TTL_S)
+        else:
+            _CACHE = LRUTTLCache(settings.AGENT_CACHE_MAX_ENTRIES, settings.AGENT_CACHE_TTL_S)
+    return _CACHE
+
+
+def _agent_fingerprint(agent: Agent) -> str:
+    # Reason: Model, system prompt and output schema are fixed per agent, so serialize them once
+    fingerprint = _FINGERPRINTS.get(id(agent))
+    if fingerprint is None:
+        model = agent.model
+        model_name = model if isinstance(model, str) else getattr(model, "model_name", repr(model))
+        fingerprint = json.dumps(
+            {
+                "model": model_name,
+                "system_prompt": list(getattr(agent, "_system_prompts", ())),
+                "output_schema": agent.output_type.model_json_schema(),
+            },
+            sort_keys=True,
+        )
+        _FINGERPRINTS[id(agent)] = fingerprint
+    return fingerprint
+
+
+def cache_key(agent: Agent, user_prompt: str) -> str:
+    return hashlib.sha256(f"{_agent_fingerprint(agent)}\x00{user_prompt}".encode("utf-8")).hexdigest()
+
+
+def _usage(result) -> Dict[str, int]:
+    try:
+        usage = result.usage()
+    except Exception:
+        return {}
+    # Reason: pydantic-ai renamed request/response_tokens to input/output_tokens
+    tokens_in = getattr(usage, "input_tokens", None) or getattr(usage, "request_tokens", None) or 0
+    tokens_out = getattr(usage, "output_tokens", None) or getattr(usage, "response_tokens", None) or 0
+    return {"tokens_in": tokens_in, "tokens_out": tokens_out}
+
+
+def _usage_tokens(result) -> Optional[int]:
+    usage = _usage(result)
+    return (usage["tokens_in"] + usage["tokens_out"]) if usage else None
+
+
+def _agent_name(agent: Agent) -> str:
+    return getattr(agent, "name", None) or agent.output_type.__name__
+
+
+async def _scheduled_run(agent: Agent, user_prompt: str):
+    tokens = estimate_tokens([user_prompt]) + settings.LLM_COMPLETION_TOKENS_ESTIMATE
+    with span("agent.run", _agent_name(agent)) as run_span:
+        result = await get_scheduler().run(lambda: agent.run(user_prompt), tokens, usage=_usage_tokens)
+        run_span.set(**_usage(result))
+    return result
+
+
+async def run_agent(agent: Agent, user_prompt: str, use_cache: bool = True):
+    """
+    Runs agent.run(user_prompt) and returns its validated output, serving identical
+    (agent, prompt) pairs from the cache when AGENT_CACHE_ENABLED is set.
+    """
+    if not (settings.AGENT_CACHE_ENABLED and use_cache):
+        result = await _scheduled_run(agent, user_prompt)
+        return result.output
+
+    cache = _get_cache()
+    key = cache_key(agent, user_prompt)
+    cached = cache.get(key)
+    record_cache("agent", int(cached is not None), int(cached is None))
+    if cached is not None:
+        return agent.output_type.model_validate_json(cached)
+
+    result = await _scheduled_run(agent, user_prompt)
+    cache.set(key, result.output.model_dump_json())
+    return result.output
+
+
+def agent_cache_stats() -> Optional[Dict]:
+    return _get_cache().stats() if settings.AGENT_CACHE_ENABLED else None
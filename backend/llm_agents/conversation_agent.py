@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
+from openai_clients import openai_model
 import os
 from dotenv import load_dotenv
 
@@ -18,7 +19,7 @@ class ConversationAgentOutput(BaseModel):
     context: Optional[str] = Field(None, description="Other relevant context if present.")
 
 conversation_agent = Agent(
-    "openai:gpt-4o-mini",
+    openai_model("gpt-4o-mini"),
     output_type=ConversationAgentOutput,
     system_prompt=(
         "You are an expert learning advisor AI. Given a user's chat transcript, extract the following as structured JSON:\n"
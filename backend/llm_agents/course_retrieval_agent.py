@@ -1,12 +1,14 @@
 """
-CourseRetrievalAgent: Selects and packages the most relevant modules/subtopics from candidate courses for a user's skill gap using an LLM.
-- Input: skills_gap (List[str]), candidate_courses (List[Dict])
+CourseRetrievalAgent: Selects and packages the most relevant modules/subtopics from candidate modules for a user's skill gap using an LLM.
+- Input: skills_gap (List[str]), candidate_modules (List[Dict], top-N from the module-level index)
 - Output: recommended_modules (List[Dict])
 - Modern pydantic-ai Agent pattern, async-ready.
 """
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
+from openai_clients import openai_model
 from typing import List, Dict
+import json
 
 class ModuleRecommendation(BaseModel):
     course_title: str
@@ -20,7 +22,11 @@ class CourseRetrievalAgentOutput(BaseModel):
 
 # Example input:
 # skills_gap = ["Data Visualization", "APIs"]
-# candidate_courses = [ ... ]
+# candidate_modules = [
+#   {"course_title": "Data Analysis with Pandas", "module_title": "Visualization with Matplotlib",
+#    "module_description": "Plotting and visualizing data.", "subtopics": ["Line & Bar Charts", "Histograms"]},
+#   ...
+# ]
 #
 # Example output:
 # {"recommended_modules": [
@@ -35,13 +41,13 @@ class CourseRetrievalAgentOutput(BaseModel):
 # ]}
 
 course_retrieval_agent = Agent(
-    "openai:gpt-4o-mini",
+    openai_model("gpt-4o-mini"),
     output_type=CourseRetrievalAgentOutput,
     system_prompt=(
         "You are an expert learning path designer for a personalized education platform. "
-        "Given a user's skill gaps and a list of candidate courses (each with modules and subtopics), your job is to select and package the most relevant modules and subtopics to help close those gaps.\n"
+        "Given a user's skill gaps and a short list of candidate modules (each with its course title, description and subtopics), your job is to select and package the most relevant modules and subtopics to help close those gaps.\n"
         "Instructions:\n"
-        "- For each skill gap, select the most relevant module(s) from any course.\n"
+        "- For each skill gap, select the most relevant module(s) from the candidates; copy course_title, module_title and module_description exactly.\n"
         "- Prefer diversity: avoid selecting multiple modules covering the same content unless necessary.\n"
         "- For each module, select only the subtopics that are most relevant to the skill gap(s).\n"
         "- For each recommended module, provide a short, clear rationale in 'why_selected'.\n"
@@ -53,6 +59,21 @@ course_retrieval_agent = Agent(
     ),
 )
 
+def compact_module(module: Dict) -> Dict:
+    """Only the fields the agent needs to pick a module (drops price, position and course skills)."""
+    return {
+        "course_title": module["course_title"],
+        "module_title": module["title"],
+        "module_description": module.get("description", ""),
+        "subtopics": module.get("subtopics", []),
+    }
+
+def build_course_retrieval_prompt(skills_gap: List[str], candidate_modules: List[Dict]) -> str:
+    return json.dumps(
+        {"skills_gap": skills_gap, "candidate_modules": [compact_module(m) for m in candidate_modules]},
+        ensure_ascii=False,
+    )
+
 # Usage example (async):
-# result = await course_retrieval_agent.run(skills_gap=[...], candidate_courses=[...])
+# result = await course_retrieval_agent.run(build_course_retrieval_prompt([...], [...]))
 # print(result.output)
@@ -0,0 +1,63 @@
+"""
+Deterministic module selection: the fast path in front of course_retrieval_agent.
+- Confidence is the share of gap skills that are an exact skills tag of some candidate module
+  (candidates are already ranked by course_retriever.retrieve_modules, so the first tagged one wins).
+- The catalog only tags courses, and catalog_modules copies those tags onto every module, so this is
+  course-level confidence: it says the module's course teaches the skill, not that this module does.
+  Retrieval ranking (BM25 and embeddings over module text) is what picks the module within the course.
+- At or above settings.FAST_PATH_MIN_CONFIDENCE, ModuleRecommendation objects are packaged
+  directly with templated why_selected text; below it the caller falls back to the LLM.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import settings
+from embeddings.lexical import first_tagged, normalize_skill, tokenize
+from llm_agents.course_retrieval_agent import ModuleRecommendation
+
+
+def match_confidence(skills_gap: List[str], candidate_modules: List[Dict]) -> Tuple[float, Dict[str, int]]:
+    """Returns (confidence in [0, 1], {gap skill: candidate row}) for the exact-tag matches."""
+    if not skills_gap or not candidate_modules:
+        return 0.0, {}
+    matches = first_tagged(skills_gap, candidate_modules)
+    return len(matches) / len({normalize_skill(s) for s in skills_gap}), matches
+
+
+def _selected_subtopics(module: Dict, skills: List[str]) -> List[str]:
+    # Reason: Keep subtopics that mention a gap skill; if none do, the whole module is relevant
+    terms = {term for skill in skills for term in tokenize(skill)}
+    picked = [s for s in module.get("subtopics", []) if terms & set(tokenize(s))]
+    return picked or list(module.get("subtopics", []))
+
+
+def _why_selected(module: Dict, skills: List[str]) -> str:
+    return f"Covers {', '.join(skills)}: '{module['course_title']}' is tagged with {'these skills' if len(skills) > 1 else 'this skill'}."
+
+
+def select_modules(
+    skills_gap: List[str],
+    candidate_modules: List[Dict],
+    min_confidence: Optional[float] = None,
+) -> Tuple[Optional[List[ModuleRecommendation]], float]:
+    """
+    Returns (recommended modules, confidence), or (None, confidence) when the LLM should decide.
+    One recommendation per distinct module, in candidate rank order.
+    """
+    min_confidence = settings.FAST_PATH_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    confidence, matches = match_confidence(skills_gap, candidate_modules)
+    if not matches or confidence < min_confidence:
+        return None, confidence
+    skills_by_row: Dict[int, List[str]] = {}
+    for skill, row in matches.items():
+        skills_by_row.setdefault(row, []).append(skill)
+    recommended = [
+        ModuleRecommendation(
+            course_title=candidate_modules[row]["course_title"],
+            module_title=candidate_modules[row]["title"],
+            module_description=candidate_modules[row].get("description", ""),
+            selected_subtopics=_selected_subtopics(candidate_modules[row], skills),
+            why_selected=_why_selected(candidate_modules[row], skills),
+        )
+        for row, skills in sorted(skills_by_row.items())
+    ]
+    return recommended, confidence
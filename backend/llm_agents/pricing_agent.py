@@ -2,11 +2,17 @@
 PricingAgent: Adjusts recommended module-level bundle to fit within user's budget.
 - Input: recommended_modules (List[Module]), budget_eur (int)
 - Output: final_bundle (List[Module] with final_price)
-- Modern pydantic-ai Agent pattern, async-ready.
+- The DAG prices bundles with bundle_optimizer.optimize_bundle (no LLM round-trip);
+  adjust_pricing applies the same optimizer to already-priced modules.
+- The pydantic-ai pricing_agent is kept for callers that still want the LLM variant.
 """
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
+from openai_clients import openai_model
 from typing import List, Optional
+import json
+
+from bundle_optimizer import covered_skills, select_within_budget, volume_discount
 
 class Module(BaseModel):
     course_title: str
@@ -20,24 +26,21 @@ class Module(BaseModel):
 class PricingAgentOutput(BaseModel):
     final_bundle: List[Module] = Field(..., description="Final bundle of modules with adjusted pricing.")
 
-async def adjust_pricing(recommended_modules: List[Module], budget_eur: int) -> List[Module]:
-    total = sum(m.price for m in recommended_modules)
-    if total <= budget_eur:
-        for m in recommended_modules:
-            m.final_price = m.price
-        return recommended_modules
-    discount = budget_eur / total if total > 0 else 1.0
-    bundle = []
-    for m in recommended_modules:
-        new_price = max(1, int(m.price * discount))
-        bundle.append(Module(**m.dict(), final_price=new_price))
-    # Drop modules if still over budget due to rounding
-    while sum(m.final_price for m in bundle) > budget_eur and bundle:
-        bundle.pop()
-    return bundle
+async def adjust_pricing(recommended_modules: List[Module], budget_eur: int, skills_gap: Optional[List[str]] = None) -> List[Module]:
+    """
+    Keeps the modules that cover the most of skills_gap within budget and applies the volume discount.
+    Runs the optimizer even when the bundle already fits, so 3+ module bundles are always discounted.
+    """
+    coverage = [covered_skills(m.model_dump(), skills_gap or []) for m in recommended_modules]
+    chosen = select_within_budget([m.price for m in recommended_modules], coverage, budget_eur)
+    rate = volume_discount(len(chosen))
+    return [
+        Module(**recommended_modules[i].model_dump(exclude={"final_price"}), final_price=int(recommended_modules[i].price * (1 - rate)))
+        for i in chosen
+    ]
 
 pricing_agent = Agent(
-    "openai:gpt-4o-mini",
+    openai_model("gpt-4o-mini"),
     output_type=PricingAgentOutput,
     system_prompt=(
         "Given a recommended module-level learning bundle and a budget in EUR, adjust the pricing so the bundle fits the budget. "
@@ -47,6 +50,10 @@ pricing_agent = Agent(
     ),
 )
 
+def build_pricing_prompt(recommended_modules: List, budget_eur) -> str:
+    modules = [m.model_dump() if isinstance(m, BaseModel) else m for m in recommended_modules or []]
+    return json.dumps({"recommended_modules": modules, "budget_eur": budget_eur}, ensure_ascii=False)
+
 # Usage example (async):
-# result = await pricing_agent.run(recommended_courses=[...], budget_eur=200)
+# result = await pricing_agent.run(build_pricing_prompt([...], 200))
 # print(result.output)
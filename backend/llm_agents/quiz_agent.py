@@ -6,8 +6,10 @@ QuizAgent: Generates or retrieves MCQ quizzes for a given skill/module.
 """
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
+from openai_clients import openai_model
 from typing import List, Dict
 from embeddings.loader import load_quiz
+from llm_agents.agent_cache import run_agent
 import asyncio
 
 class QuizQuestion(BaseModel):
@@ -19,7 +21,7 @@ class QuizAgentOutput(BaseModel):
     quiz: List[QuizQuestion] = Field(..., description="List of MCQ questions.")
 
 quiz_agent = Agent(
-    "openai:gpt-4o-mini",
+    openai_model("gpt-4o-mini"),
     output_type=QuizAgentOutput,
     system_prompt=(
         "Given a skill and module title, generate 3 multiple-choice questions to test understanding. "
@@ -28,14 +30,16 @@ quiz_agent = Agent(
     ),
 )
 
+def build_quiz_prompt(current_skill: str, module_title: str) -> str:
+    return f"Skill: {current_skill}\nModule: {module_title}"
+
 async def get_quiz(current_skill: str, module_title: str) -> QuizAgentOutput:
     # Try static pool first
     static_quiz = load_quiz(current_skill, module_title)
     if static_quiz:
         return QuizAgentOutput(quiz=[QuizQuestion(**q) for q in static_quiz])
-    # Fallback to LLM
-    result = await quiz_agent.run(current_skill=current_skill, module_title=module_title)
-    return result.output
+    # Fallback to LLM (cached per skill/module when the agent cache is enabled)
+    return await run_agent(quiz_agent, build_quiz_prompt(current_skill, module_title))
 
 def validate_quiz_answers(quiz: List[QuizQuestion], answers: List[str]) -> Dict:
     correct = 0
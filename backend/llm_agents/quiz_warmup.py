@@ -0,0 +1,107 @@
+"""
+Quiz pre-generation for every (skill, module) pair in the course catalog.
+- Skips pairs already in the static quiz pool; generates the rest with bounded concurrency, retrying
+  transient errors (network, rate limits) with backoff.
+- Validates each quiz against QuizAgentOutput (and that every correct_answer is one of its options);
+  an invalid quiz is skipped, not retried, since the same prompt tends to fail the same way. Valid
+  quizzes are appended to quizzes.d/generated.jsonl, which the quiz pool hot-reloads.
+- Run as a CLI from backend/ (python -m llm_agents.quiz_warmup) or as a startup background task
+  (QUIZ_WARMUP_ON_STARTUP=1); either way its LLM calls use the scheduler's lowest-priority lane.
+"""
+import argparse
+import asyncio
+import json
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+import settings
+from embeddings.catalog import load_catalog
+from embeddings.loader import QUIZ_SHARD_DIR, get_quiz_pool, quiz_key
+from llm_agents.agent_cache import run_agent
+from llm_agents.quiz_agent import QuizAgentOutput, build_quiz_prompt, quiz_agent
+from llm_scheduler import WARMUP, llm_priority
+
+GENERATED_QUIZ_PATH = QUIZ_SHARD_DIR / "generated.jsonl"
+
+
+def catalog_quiz_pairs(courses: List[Dict]) -> List[Tuple[str, str]]:
+    """Every (course skill, module title) pair in the catalog, de-duplicated by normalized key."""
+    pairs = {}
+    for course in courses:
+        for skill in course.get("skills", []):
+            for module in course.get("modules", []):
+                pairs.setdefault(quiz_key(skill, module["title"]), (skill, module["title"]))
+    return list(pairs.values())
+
+
+def _validate(output: QuizAgentOutput) -> QuizAgentOutput:
+    output = QuizAgentOutput.model_validate(output.model_dump())
+    if not output.quiz:
+        raise ValueError("quiz has no questions")
+    for q in output.quiz:
+        if q.correct_answer not in q.options:
+            raise ValueError(f"correct_answer {q.correct_answer!r} is not one of the options")
+    return output
+
+
+async def _generate(skill: str, module_title: str, retries: int) -> Optional[QuizAgentOutput]:
+    for attempt in range(1, retries + 1):
+        try:
+            # Reason: Bypass the response cache so a retry actually asks for a new quiz
+            output = await run_agent(quiz_agent, build_quiz_prompt(skill, module_title), use_cache=False)
+            return _validate(output)
+        except (ValidationError, ValueError) as e:
+            print(f"[QUIZ WARMUP] Invalid quiz for {skill} / {module_title}, skipping: {e}")
+            return None
+        except Exception as e:
+            print(f"[QUIZ WARMUP] Generation failed for {skill} / {module_title} (attempt {attempt}): {e}")
+            await asyncio.sleep(min(2 ** attempt, 30))
+    return None
+
+
+async def warm_up_quizzes(concurrency: Optional[int] = None, retries: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, int]:
+    """Generates quizzes for catalog pairs missing from the pool; returns counts."""
+    concurrency = concurrency or settings.QUIZ_WARMUP_CONCURRENCY
+    retries = retries or settings.QUIZ_WARMUP_RETRIES
+    pool = get_quiz_pool()
+    pool.refresh(force=True)
+    missing = [pair for pair in catalog_quiz_pairs(load_catalog()) if quiz_key(*pair) not in pool]
+    if limit is not None:
+        missing = missing[:limit]
+    print(f"[QUIZ WARMUP] {len(missing)} (skill, module) pairs need a quiz")
+
+    QUIZ_SHARD_DIR.mkdir(exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"generated": 0, "failed": 0}
+
+    async def warm(skill: str, module_title: str) -> None:
+        async with semaphore:
+            output = await _generate(skill, module_title, retries)
+        if output is None:
+            counts["failed"] += 1
+            return
+        entry = {"skill": skill, "module_title": module_title, "quiz": [q.model_dump() for q in output.quiz]}
+        # Reason: One short append per quiz; a line is never interleaved since writes happen on the event loop thread
+        with open(GENERATED_QUIZ_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        counts["generated"] += 1
+
+    with llm_priority(WARMUP):
+        await asyncio.gather(*(warm(skill, module_title) for skill, module_title in missing))
+    pool.refresh(force=True)
+    print(f"[QUIZ WARMUP] Generated {counts['generated']}, failed {counts['failed']}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate quizzes for every (skill, module) in the course catalog.")
+    parser.add_argument("--concurrency", type=int, default=settings.QUIZ_WARMUP_CONCURRENCY, help="Max quiz generations in flight.")
+    parser.add_argument("--retries", type=int, default=settings.QUIZ_WARMUP_RETRIES, help="Attempts per (skill, module) pair.")
+    parser.add_argument("--limit", type=int, default=None, help="Only generate this many quizzes.")
+    args = parser.parse_args()
+    asyncio.run(warm_up_quizzes(args.concurrency, args.retries, args.limit))
+
+
+if __name__ == "__main__":
+    main()
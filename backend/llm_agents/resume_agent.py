@@ -1,11 +1,9 @@
 import os
 from dotenv import load_dotenv
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
+from openai_clients import openai_embeddings, openai_model
+from llm_agents.agent_cache import run_agent
 import asyncio
 
 # Load API Key from .env
@@ -14,6 +12,12 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # ----------- Step 1: Apply Chunking -----------
 def chunk_resume_text(resume_text: str):
+    # Reason: Imported here; the API never chunks resumes and langchain_community is slow to import
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:  # langchain < 0.1 bundled the splitters
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
     resume_chunks = splitter.split_text(resume_text)
 
@@ -26,7 +30,9 @@ def chunk_resume_text(resume_text: str):
 
 # ----------- Step 2: Build RAG Retrieval Pipeline -----------
 def build_rag_retriever(resume_chunks):
-    embeddings = OpenAIEmbeddings()
+    from langchain_community.vectorstores import FAISS
+
+    embeddings = openai_embeddings()
     vectorstore = FAISS.from_texts(resume_chunks, embedding=embeddings)
     retriever = vectorstore.as_retriever()
     return retriever
@@ -38,8 +44,7 @@ class ResumeAgentOutput(BaseModel):
     summary: str = Field(..., description="Short summary of the candidate.")
 
 resume_agent = Agent(
-    "openai:gpt-4o-mini",
-    api_key=OPENAI_API_KEY,
+    openai_model("gpt-4o-mini"),
     output_type=ResumeAgentOutput,
     system_prompt=(
         "You are an expert career assistant. Based ONLY on the provided resume text, "
@@ -50,8 +55,7 @@ resume_agent = Agent(
 )
 
 async def extract_with_agent(text):
-    result = await resume_agent.run(text)
-    return result.output
+    return await run_agent(resume_agent, text)
 
 
 # ----------- Main Runner -----------
@@ -0,0 +1,344 @@
+"""
+Process-wide, rate-limit-aware scheduler for OpenAI traffic (agent runs and embeddings).
+- Token buckets for requests/min (LLM_RPM) and tokens/min (LLM_TPM); the token cost of a call is
+  estimated up front and settled against the reported usage afterwards.
+- Priority lanes: interactive requests are always admitted before batch jobs, and batch jobs
+  before warm-up jobs; FIFO within a lane. Callers pick a lane with `with llm_priority(BATCH):`
+  (a contextvar, so tasks and asyncio.to_thread calls started inside inherit it).
+- 429 and 5xx responses are retried with exponential backoff (full jitter), or exactly the server's
+  Retry-After / retry-after-ms when present; a 429 pauses admission for every lane, since the limit
+  is shared by the whole process. Connection errors and timeouts are retried with backoff only
+  (the SDK clients run with max_retries=0, so this is their only retry).
+- One dispatcher thread admits both async callers (run) and worker-thread callers (call).
+- stats(): per-lane queue depth, admitted calls, retries and wait-time percentiles.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+import httpx
+import openai
+
+import settings
+from telemetry import SCHEDULER_QUEUE, SCHEDULER_WAIT, record_retry
+
+T = TypeVar("T")
+
+INTERACTIVE, BATCH, WARMUP = "interactive", "batch", "warmup"
+LANES = (INTERACTIVE, BATCH, WARMUP)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_PRIORITY = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(lane: str):
+    """Runs the enclosed LLM/embedding calls (and tasks started inside) in the given lane."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown priority lane: {lane}")
+    token = _PRIORITY.set(lane)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def estimate_tokens(texts: Iterable[str]) -> int:
+    # Reason: ~4 characters per token for English text; settled against real usage when reported
+    return sum(len(text) // 4 + 1 for text in texts)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        self._refill(now)
+        # Reason: A single call larger than the whole bucket would otherwise wait forever
+        cost = min(cost, self.capacity)
+        return 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+
+    def take(self, cost: float, now: float) -> None:
+        self._refill(now)
+        self.tokens -= min(cost, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Returns (delta > 0) or charges (delta < 0) tokens after the fact; may go into debt."""
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_transient(error: BaseException) -> bool:
+    """Connection failures and timeouts, from the OpenAI SDK or raw httpx."""
+    return isinstance(error, (openai.APIConnectionError, httpx.TransportError))
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After / retry-after-ms header on the error's response, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class _Waiter:
+    __slots__ = ("lane", "cost", "enqueued", "cancelled", "_grant")
+
+    def __init__(self, lane: str, cost: int, grant: Callable[[], None]):
+        self.lane = lane
+        self.cost = cost
+        self.enqueued = time.monotonic()
+        self.cancelled = False
+        self._grant = grant
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        rpm: float,
+        tpm: float,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._paused_until = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._depth = {lane: 0 for lane in LANES}
+        self._admitted = {lane: 0 for lane in LANES}
+        self._retries = {lane: 0 for lane in LANES}
+        self._rate_limited = 0
+        self._waits = {lane: deque(maxlen=1000) for lane in LANES}
+
+    # ----- admission -----
+
+    def _wait_for(self, cost: int, now: float) -> float:
+        wait = self._paused_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(cost, now))
+        return wait
+
+    def _dispatch_loop(self) -> None:
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].cancelled:
+                    waiter = heapq.heappop(self._heap)[2]
+                    self._depth[waiter.lane] -= 1
+                    SCHEDULER_QUEUE.labels(waiter.lane).set(self._depth[waiter.lane])
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                waiter = self._heap[0][2]
+                wait = self._wait_for(waiter.cost, now)
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._heap)
+                if self.requests is not None:
+                    self.requests.take(1, now)
+                if self.tokens is not None:
+                    self.tokens.take(waiter.cost, now)
+                self._depth[waiter.lane] -= 1
+                self._admitted[waiter.lane] += 1
+                self._waits[waiter.lane].append(now - waiter.enqueued)
+                SCHEDULER_QUEUE.labels(waiter.lane).set(self._depth[waiter.lane])
+                SCHEDULER_WAIT.labels(waiter.lane).observe(now - waiter.enqueued)
+                try:
+                    waiter._grant()
+                except RuntimeError:
+                    pass  # Reason: The caller's event loop already closed; nobody is waiting any more
+
+    def _enqueue(self, lane: str, cost: int, grant: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(lane, cost, grant)
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch_loop, name="llm-scheduler", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (LANES.index(lane), next(self._seq), waiter))
+            self._depth[lane] += 1
+            SCHEDULER_QUEUE.labels(lane).set(self._depth[lane])
+            self._cond.notify()
+        return waiter
+
+    async def _acquire(self, lane: str, cost: int) -> None:
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def grant() -> None:
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        waiter = self._enqueue(lane, cost, grant)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._cond:
+                waiter.cancelled = True
+                self._cond.notify()
+            raise
+
+    def _acquire_blocking(self, lane: str, cost: int) -> None:
+        granted = threading.Event()
+        self._enqueue(lane, cost, granted.set)
+        granted.wait()
+
+    # ----- retries and accounting -----
+
+    def _retry_delay(self, error: BaseException, attempt: int, lane: str) -> Optional[float]:
+        code = status_code(error)
+        if (code not in RETRYABLE_STATUS and not is_transient(error)) or attempt >= self.max_retries:
+            return None
+        delay = retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        record_retry(lane, code)
+        with self._cond:
+            self._retries[lane] += 1
+            if code == 429:
+                self._rate_limited += 1
+                # Reason: The limit is per organization, so every lane backs off, not just this call
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self._cond.notify()
+        reason = f"HTTP {code}" if code is not None else type(error).__name__
+        print(f"[LLM SCHEDULER] {reason} on {lane} call (attempt {attempt + 1}); retrying in {delay:.1f}s")
+        return delay
+
+    def _settle(self, estimate: int, actual: Optional[int]) -> None:
+        if self.tokens is None or not actual:
+            return
+        with self._cond:
+            self.tokens.adjust(estimate - actual)
+            self._cond.notify()
+
+    # ----- public API -----
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        tokens: int,
+        usage: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """Awaits call() once admitted in the caller's lane, retrying rate-limit and server errors."""
+        lane = _PRIORITY.get()
+        for attempt in itertools.count():
+            await self._acquire(lane, tokens)
+            try:
+                result = await call()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, lane)
+                if delay is None:
+                    raise
+                if status_code(e) != 429:
+                    await asyncio.sleep(delay)
+                continue
+            self._settle(tokens, usage(result) if usage else None)
+            return result
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        tokens: int,
+        usage: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """Blocking variant of run() for worker threads (e.g. LangChain's sync embed_documents)."""
+        lane = _PRIORITY.get()
+        for attempt in itertools.count():
+            self._acquire_blocking(lane, tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, lane)
+                if delay is None:
+                    raise
+                if status_code(e) != 429:
+                    time.sleep(delay)
+                continue
+            self._settle(tokens, usage(result) if usage else None)
+            return result
+
+    def stats(self) -> Dict:
+        with self._cond:
+            lanes = {}
+            for lane in LANES:
+                waits = sorted(self._waits[lane])
+                lanes[lane] = {
+                    "queue_depth": self._depth[lane],
+                    "admitted": self._admitted[lane],
+                    "retries": self._retries[lane],
+                    "wait_p50_s": round(waits[len(waits) // 2], 4) if waits else 0.0,
+                    "wait_p95_s": round(waits[int(len(waits) * 0.95)], 4) if waits else 0.0,
+                    "wait_max_s": round(waits[-1], 4) if waits else 0.0,
+                }
+            now = time.monotonic()
+            for bucket in (self.requests, self.tokens):
+                if bucket is not None:
+                    bucket.wait_time(0, now)  # Refills to now
+            return {
+                "lanes": lanes,
+                "rate_limited": self._rate_limited,
+                "paused_for_s": round(max(0.0, self._paused_until - now), 3),
+                "requests_available": round(self.requests.tokens, 1) if self.requests else None,
+                "tokens_available": round(self.tokens.tokens, 1) if self.tokens else None,
+            }
+
+
+_SCHEDULER: Optional[LLMScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULER is None:
+                _SCHEDULER = LLMScheduler(
+                    settings.LLM_RPM,
+                    settings.LLM_TPM,
+                    settings.LLM_MAX_RETRIES,
+                    settings.LLM_BACKOFF_BASE_S,
+                    settings.LLM_BACKOFF_MAX_S,
+                )
+    return _SCHEDULER
+
+
+def scheduler_stats() -> Dict:
+    return get_scheduler().stats()
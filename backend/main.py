@@ -1,14 +1,71 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from api.routes import router
 from dotenv import load_dotenv
 import os
-import resume_parser_main
 import uvicorn
+import asyncio
+from parsing_pool import shutdown_parsing_pool
+from storage import close_session_store
+from openai_clients import close_http_clients
+from llm_agents.quiz_warmup import warm_up_quizzes
+import settings
+from telemetry import HTTP_SECONDS, render_metrics
+from warmup import readiness, run_warmup
 
 load_dotenv()
 
-app = FastAPI(title="Personalized Learning Marketplace API")
+_background_tasks = set()
+
+def _start_background(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Reason: Warm up in the background so the server is up (and /ready answers) meanwhile
+    _start_background(run_warmup())
+    if settings.QUIZ_WARMUP_ON_STARTUP:
+        _start_background(warm_up_quizzes())
+    try:
+        yield
+    finally:
+        for task in list(_background_tasks):
+            task.cancel()
+        shutdown_parsing_pool()
+        # Reason: Flush buffered session-store writes before the process exits
+        close_session_store()
+        await close_http_clients()
+
+app = FastAPI(title="Personalized Learning Marketplace API", lifespan=lifespan)
 app.include_router(router, prefix="/api")
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Reason: Label by route template, not raw path, so ids don't explode label cardinality
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_SECONDS.labels(request.method, route, str(status)).observe(time.perf_counter() - started)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    # Reason: 503 until warm-up finishes, so load balancers hold traffic off a cold instance
+    status = readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,146 @@
+"""
+One pooled HTTP client per process for all OpenAI traffic (agents, embeddings, scripts).
+- httpx clients with keep-alive, optional HTTP/2 (needs the `h2` package) and pool limits from
+  settings.HTTP_*; an async client for agents / async embeddings and a sync one for LangChain's
+  blocking embed_documents, both created on first use.
+- Factories inject them: openai_model() for pydantic-ai Agents, openai_embeddings() for LangChain,
+  get_openai_client() / get_sync_openai_client() for the raw SDK.
+- SDK-level retries are disabled (max_retries=0): llm_scheduler.py owns backoff for scheduled calls,
+  including connection errors and timeouts.
+- pool_stats(): requests sent plus open / idle / in-use connections per client.
+"""
+import importlib.util
+import os
+import threading
+from typing import Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from pydantic_ai.providers.openai import OpenAIProvider
+
+try:
+    from pydantic_ai.models.openai import OpenAIChatModel
+except ImportError:  # pydantic-ai releases before the Chat/Responses model split
+    from pydantic_ai.models.openai import OpenAIModel as OpenAIChatModel
+
+import settings
+from embeddings.cache import cached_embeddings
+
+# Reason: Re-entrant, since the SDK client factories create the HTTP clients while holding it
+_LOCK = threading.RLock()
+_ASYNC_HTTP: Optional[httpx.AsyncClient] = None
+_SYNC_HTTP: Optional[httpx.Client] = None
+_ASYNC_OPENAI: Optional[AsyncOpenAI] = None
+_SYNC_OPENAI: Optional[OpenAI] = None
+_REQUESTS = {"async": 0, "sync": 0}
+
+
+def http2_enabled() -> bool:
+    return settings.HTTP_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _client_options() -> Dict:
+    return {
+        "http2": http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_S,
+        ),
+        "timeout": httpx.Timeout(settings.HTTP_TIMEOUT_S, connect=settings.HTTP_CONNECT_TIMEOUT_S),
+    }
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _ASYNC_HTTP
+    if _ASYNC_HTTP is None:
+        with _LOCK:
+            if _ASYNC_HTTP is None:
+                async def count(request: httpx.Request) -> None:
+                    _REQUESTS["async"] += 1
+                _ASYNC_HTTP = httpx.AsyncClient(event_hooks={"request": [count]}, **_client_options())
+    return _ASYNC_HTTP
+
+
+def get_sync_http_client() -> httpx.Client:
+    global _SYNC_HTTP
+    if _SYNC_HTTP is None:
+        with _LOCK:
+            if _SYNC_HTTP is None:
+                def count(request: httpx.Request) -> None:
+                    _REQUESTS["sync"] += 1
+                _SYNC_HTTP = httpx.Client(event_hooks={"request": [count]}, **_client_options())
+    return _SYNC_HTTP
+
+
+def get_openai_client() -> AsyncOpenAI:
+    global _ASYNC_OPENAI
+    if _ASYNC_OPENAI is None:
+        with _LOCK:
+            if _ASYNC_OPENAI is None:
+                _ASYNC_OPENAI = AsyncOpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"), http_client=get_http_client(), max_retries=0,
+                )
+    return _ASYNC_OPENAI
+
+
+def get_sync_openai_client() -> OpenAI:
+    global _SYNC_OPENAI
+    if _SYNC_OPENAI is None:
+        with _LOCK:
+            if _SYNC_OPENAI is None:
+                _SYNC_OPENAI = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"), http_client=get_sync_http_client(), max_retries=0,
+                )
+    return _SYNC_OPENAI
+
+
+def openai_model(model_name: str):
+    """pydantic-ai model that talks to OpenAI through the shared client."""
+    return OpenAIChatModel(model_name, provider=OpenAIProvider(openai_client=get_openai_client()))
+
+
+def openai_embeddings(model: str = "text-embedding-ada-002"):
+    """LangChain OpenAIEmbeddings on the shared clients, wrapped with the persistent embedding cache."""
+    # Reason: langchain_openai (and langsmith behind it) is slow to import; only load it when embedding
+    from langchain_openai import OpenAIEmbeddings
+
+    return cached_embeddings(OpenAIEmbeddings(
+        model=model,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=get_sync_http_client(),
+        http_async_client=get_http_client(),
+        check_embedding_ctx_length=settings.EMBEDDING_CHECK_CTX_LENGTH,
+        max_retries=0,
+    ))
+
+
+def _pool_counts(client) -> Dict:
+    # Reason: httpx has no public pool API; read httpcore's pool and degrade to None if it moves
+    try:
+        connections = list(client._transport._pool.connections)
+    except AttributeError:
+        return {"open": None, "idle": None, "in_use": None}
+    idle = sum(1 for c in connections if c.is_idle())
+    return {"open": len(connections), "idle": idle, "in_use": len(connections) - idle}
+
+
+def pool_stats() -> Dict:
+    return {
+        "http2": http2_enabled(),
+        "max_connections": settings.HTTP_MAX_CONNECTIONS,
+        "max_keepalive": settings.HTTP_MAX_KEEPALIVE,
+        "async": {"requests": _REQUESTS["async"], **(_pool_counts(_ASYNC_HTTP) if _ASYNC_HTTP else {})},
+        "sync": {"requests": _REQUESTS["sync"], **(_pool_counts(_SYNC_HTTP) if _SYNC_HTTP else {})},
+    }
+
+
+async def close_http_clients() -> None:
+    global _ASYNC_HTTP, _SYNC_HTTP, _ASYNC_OPENAI, _SYNC_OPENAI
+    with _LOCK:
+        async_http, sync_http = _ASYNC_HTTP, _SYNC_HTTP
+        _ASYNC_HTTP = _SYNC_HTTP = _ASYNC_OPENAI = _SYNC_OPENAI = None
+    if async_http is not None:
+        await async_http.aclose()
+    if sync_http is not None:
+        sync_http.close()
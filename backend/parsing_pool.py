@@ -0,0 +1,87 @@
+"""
+Process pool for CPU-bound resume parsing (PyMuPDF), so the uvicorn event loop stays responsive.
+- Pool size: PDF_POOL_WORKERS; per-document timeout: PDF_PARSE_TIMEOUT_S (see settings.py).
+- A timed-out document is reported as a ValueError and the pool is recycled: queued jobs are cancelled,
+  its workers are terminated (a running job cannot be cancelled any other way) and the next call starts
+  a fresh pool. Jobs that were in flight on the recycled pool are re-run once on the new one.
+- A pool broken by a crashed worker is recycled the same way.
+- Workers start on first use; warm_up_parsing_pool() starts them (and imports PyMuPDF in each) up front.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+import settings
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_parsing_pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                # Reason: spawn, not fork, so workers don't inherit the server's threads, sockets and SQLite handles
+                _POOL = ProcessPoolExecutor(
+                    max_workers=settings.PDF_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _POOL
+
+
+def _recycle_pool(pool: ProcessPoolExecutor) -> None:
+    """Kills pool's workers and detaches it, so the next get_parsing_pool() call starts a new one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    # Reason: The executor has no public way to stop a running job; terminating its worker is the only one
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+async def run_in_parsing_pool(fn: Callable, *args, timeout: Optional[float] = None):
+    """Runs fn(*args) in the parsing pool without blocking the event loop."""
+    timeout = settings.PDF_PARSE_TIMEOUT_S if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = get_parsing_pool()
+        future = loop.run_in_executor(pool, fn, *args)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            _recycle_pool(pool)
+            raise ValueError(f"Resume parsing timed out after {timeout:.0f}s.")
+        except BrokenProcessPool:
+            recycled_elsewhere = pool is not _POOL
+            _recycle_pool(pool)
+            # Reason: Another job's timeout killed this pool under us; this job itself did nothing wrong
+            if attempt or not recycled_elsewhere:
+                raise ValueError("Resume parsing failed: the parser process crashed.")
+
+
+def _preload_parser() -> None:
+    import fitz  # noqa: F401  (PyMuPDF; the slow part of a worker's first job)
+    import embeddings.utils  # noqa: F401
+
+
+async def warm_up_parsing_pool() -> None:
+    """Starts every worker and imports the parser in it, so the first upload pays for neither."""
+    loop = asyncio.get_running_loop()
+    pool = get_parsing_pool()
+    # Reason: One job per worker; the executor spawns a new process while no worker is idle
+    await asyncio.gather(*(loop.run_in_executor(pool, _preload_parser) for _ in range(settings.PDF_POOL_WORKERS)))
+
+
+def shutdown_parsing_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
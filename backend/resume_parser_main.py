@@ -1,49 +1,67 @@
 import os
 import asyncio
+import base64
 #import uuid
 import json
 from dotenv import load_dotenv
-from embeddings.utils import extract_resume_text, extract_images_from_pdf
+from embeddings.utils import ingest_resume
 from llm_agents.resume_agent import extract_with_agent
+from parsing_pool import run_in_parsing_pool
 from typing import BinaryIO
+import settings
+from telemetry import span
 
 # Load environment variables
 load_dotenv()
 
 # ----------- Resume Processing Pipeline -----------
-async def process_resume(file: BinaryIO, filename: str):
-    try:
-        resume_text = extract_resume_text(file, filename)
-        print("\n✅ Resume text extracted.")
+async def parse_resume(file: BinaryIO, filename: str) -> dict:
+    """Parses one resume and extracts name, avatar, summary and skills; raises on failure."""
+    # Reason: PyMuPDF parsing is CPU-bound; run it in the process pool, off the event loop
+    with span("pdf.parse", "pdf" if filename.lower().endswith(".pdf") else "txt") as parse_span:
+        parsed = await run_in_parsing_pool(ingest_resume, file, filename, settings.PDF_MAX_PAGES)
+        parse_span.set(bytes=len(file), chars=len(parsed["text"]))
+    resume_text = parsed["text"]
 
-        avatar_uri = None
-        if filename.lower().endswith(".pdf"):
-            image_paths = extract_images_from_pdf(file)
-            print("🖼️ Images extracted:", image_paths)
-            avatar_uri = image_paths[0] if image_paths else None
+    avatar_uri = None
+    if parsed["avatar"]:
+        # Reason: Serve the avatar inline instead of writing every embedded image to images/
+        avatar_b64 = base64.b64encode(parsed["avatar"]).decode("ascii")
+        avatar_uri = f"data:image/{parsed['avatar_ext']};base64,{avatar_b64}"
 
-        print("\n🤖 Extracting structured data with ResumeAgent...")
-        result = await extract_with_agent(resume_text)  # 👈 Corrected here
+    result = await extract_with_agent(resume_text)
 
-        name = next((line.strip() for line in resume_text.splitlines() if line.strip()), "Unknown")
+    name = next((line.strip() for line in resume_text.splitlines() if line.strip()), "Unknown")
 
-        output = {
-            "name": name,
-            "avatarUri": avatar_uri,
-            "summary": result.summary,
-            "skills": result.skills
-        }
+    return {
+        "name": name,
+        "avatarUri": avatar_uri,
+        "summary": result.summary,
+        "skills": result.skills
+    }
+
+
+async def process_resume(file: BinaryIO, filename: str):
+    """Returns the parsed resume, or None on an unexpected error; a ValueError (unreadable file,
+    parse timeout) propagates so the caller can report its message."""
+    try:
+        print("\n🤖 Parsing resume and extracting structured data with ResumeAgent...")
+        output = await parse_resume(file, filename)
 
         print("\n📦 JSON Output:")
-        print(output)
+        print({**output, "avatarUri": "<inline image>" if output["avatarUri"] else None})
         return output
 
+    except ValueError as e:
+        print(f"\n❌ Error processing resume: {e}")
+        raise
     except Exception as e:
         print(f"\n❌ Error processing resume: {e}")
         return None
 
 
 # ----------- Main Runner -----------
+# Single file: python resume_parser_main.py; a whole directory: python -m bulk_ingest <dir>
 if __name__ == "__main__":
     filename = input("Enter the path to the resume file (.pdf or .txt): ").strip()
 
@@ -52,4 +70,7 @@ if __name__ == "__main__":
     else:
         with open(filename, "rb") as f:
             file_bytes = f.read()
-            process_resume(file_bytes, filename)
+        try:
+            asyncio.run(process_resume(file_bytes, filename))
+        except ValueError:
+            pass
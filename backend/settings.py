@@ -0,0 +1,101 @@
+"""
+Runtime settings for the backend, read from the environment (.env is loaded here).
+- Local state (caches, stores) lives under DATA_DIR unless a path is overridden.
+"""
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BACKEND_DIR = Path(__file__).parent
+DATA_DIR = Path(os.getenv("DATA_DIR", str(BACKEND_DIR / "data")))
+
+# Embedding cache (embeddings/cache.py)
+EMBEDDING_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", str(DATA_DIR / "embedding_cache.sqlite")))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+# Token-count inputs with tiktoken before embedding (downloads its BPE file on first use); disable for
+# OpenAI-compatible servers that only accept raw text, such as benchmarks/mock_openai.py
+EMBEDDING_CHECK_CTX_LENGTH = os.getenv("EMBEDDING_CHECK_CTX_LENGTH", "1").lower() in ("1", "true", "yes")
+
+# Course retrieval (course_retriever.py)
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "2048"))
+RETRIEVAL_CACHE_TTL_S = float(os.getenv("RETRIEVAL_CACHE_TTL_S", "3600"))
+INDEX_RELOAD_CHECK_S = float(os.getenv("INDEX_RELOAD_CHECK_S", "30"))
+# Modules handed to course_retrieval_agent (top-N from the module-level index)
+MODULE_CANDIDATES = int(os.getenv("MODULE_CANDIDATES", "8"))
+# Skip course_retrieval_agent when at least this share of gap skills is an exact tag of a candidate
+# module (llm_agents/module_selector.py); set above 1 to always use the LLM
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "1.0"))
+
+# OpenAI rate limits shared by every agent run and embedding call (llm_scheduler.py); 0 disables a limit
+LLM_RPM = float(os.getenv("LLM_RPM", "500"))
+LLM_TPM = float(os.getenv("LLM_TPM", "200000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE_S = float(os.getenv("LLM_BACKOFF_BASE_S", "1"))
+LLM_BACKOFF_MAX_S = float(os.getenv("LLM_BACKOFF_MAX_S", "60"))
+# Completion tokens assumed per agent run before the real usage is known
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "600"))
+
+# Shared HTTP client for OpenAI traffic (openai_clients.py)
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "1").lower() in ("1", "true", "yes")
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "60"))
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "60"))
+HTTP_CONNECT_TIMEOUT_S = float(os.getenv("HTTP_CONNECT_TIMEOUT_S", "10"))
+
+# Tracing (telemetry.py); OTLP/HTTP trace export is off unless an endpoint is set, e.g. http://localhost:4318
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "qhack-backend")
+
+# Agent response cache (llm_agents/agent_cache.py), opt-in
+AGENT_CACHE_ENABLED = os.getenv("AGENT_CACHE_ENABLED", "0").lower() in ("1", "true", "yes")
+AGENT_CACHE_BACKEND = os.getenv("AGENT_CACHE_BACKEND", "memory")  # "memory" or "sqlite"
+AGENT_CACHE_PATH = Path(os.getenv("AGENT_CACHE_PATH", str(DATA_DIR / "agent_cache.sqlite")))
+AGENT_CACHE_TTL_S = float(os.getenv("AGENT_CACHE_TTL_S", "86400"))
+AGENT_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "10000"))
+
+# DAG stages run by graph/dag.run_full_pipeline
+# (resume, conversation, skills_gap, course_candidates, course_retrieval, pricing, quiz)
+PIPELINE_STAGES = [
+    s.strip() for s in os.getenv("PIPELINE_STAGES", "conversation,skills_gap,course_candidates,course_retrieval").split(",")
+    if s.strip()
+]
+
+# Batch recommendations (POST /api/recommend-bundle/batch, graph/batch.py)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# Candidate retrieval runs for a wave of items once this many are ready or the oldest has waited this long
+BATCH_RETRIEVAL_WAVE_SIZE = int(os.getenv("BATCH_RETRIEVAL_WAVE_SIZE", "32"))
+BATCH_RETRIEVAL_WAVE_MS = float(os.getenv("BATCH_RETRIEVAL_WAVE_MS", "200"))
+
+# Resume parsing process pool (parsing_pool.py)
+PDF_POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARSE_TIMEOUT_S = float(os.getenv("PDF_PARSE_TIMEOUT_S", "20"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+
+# Session store for resumes, upload hashes and XP/badges (storage.py)
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory")  # "memory" or "sqlite"
+SESSION_STORE_PATH = Path(os.getenv("SESSION_STORE_PATH", str(DATA_DIR / "sessions.sqlite")))
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", str(7 * 24 * 3600)))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))  # per namespace, both backends
+SESSION_FLUSH_INTERVAL_S = float(os.getenv("SESSION_FLUSH_INTERVAL_S", "0.5"))
+# sqlite backend: namespaces written synchronously, so other workers see them immediately
+SESSION_WRITE_THROUGH = [
+    s.strip() for s in os.getenv("SESSION_WRITE_THROUGH", "resumes,resume_hashes").split(",") if s.strip()
+]
+
+# Static quiz pool (embeddings/loader.py): seconds between checks for changed quiz files
+QUIZ_POOL_CHECK_S = float(os.getenv("QUIZ_POOL_CHECK_S", "5"))
+
+# Quiz pre-generation (llm_agents/quiz_warmup.py)
+QUIZ_WARMUP_ON_STARTUP = os.getenv("QUIZ_WARMUP_ON_STARTUP", "0").lower() in ("1", "true", "yes")
+QUIZ_WARMUP_CONCURRENCY = int(os.getenv("QUIZ_WARMUP_CONCURRENCY", "4"))
+QUIZ_WARMUP_RETRIES = int(os.getenv("QUIZ_WARMUP_RETRIES", "3"))
+
+# Startup warm-up (warmup.py): failed steps are retried with exponential backoff, capped at the max delay;
+# WARMUP_MAX_ATTEMPTS = 0 retries until every step succeeds
+WARMUP_RETRY_BASE_S = float(os.getenv("WARMUP_RETRY_BASE_S", "1"))
+WARMUP_RETRY_MAX_S = float(os.getenv("WARMUP_RETRY_MAX_S", "60"))
+WARMUP_MAX_ATTEMPTS = int(os.getenv("WARMUP_MAX_ATTEMPTS", "0"))
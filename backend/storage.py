@@ -0,0 +1,270 @@
+"""
+Pluggable session store for resumes, upload fingerprints and user progress (XP/badges).
+- SessionStore: namespaced key-value interface with batched reads (get_many) and atomic
+  per-key read-modify-write (update / incr).
+- MemoryStore: per-namespace LRU + TTL (caching.LRUTTLCache); bounded memory, single process.
+- SQLiteStore: local SQLite file in WAL mode. set/delete are buffered and written back in
+  batches by a background thread, so other workers sharing the file see them up to
+  flush_interval later; namespaces listed in write_through (e.g. resumes, which another worker
+  may be asked for right after upload) are written synchronously instead. update/incr run in an
+  IMMEDIATE transaction, so they stay atomic across workers. Every minute the writer drops
+  expired rows and, past max_entries per namespace, the least recently written ones.
+- SQLite calls block on disk and on other writers' locks; call the store via asyncio.to_thread
+  from async code.
+- Backend selected with SESSION_STORE_BACKEND=memory|sqlite (see settings.py).
+"""
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import settings
+from caching import LRUTTLCache
+
+_SQLITE_MAX_VARS = 500
+_MAINTENANCE_INTERVAL_S = 60
+_DELETED = object()
+
+
+class SessionStore(ABC):
+    @abstractmethod
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Returns {key: value} for the keys that exist (and have not expired)."""
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any]) -> Any:
+        """Atomically replaces the value with fn(current value or None) and returns it."""
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return self.get_many(namespace, [key]).get(key, default)
+
+    def incr(self, namespace: str, key: str, amount: int = 1) -> int:
+        return self.update(namespace, key, lambda value: (value or 0) + amount)
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryStore(SessionStore):
+    def __init__(self, max_entries: int, ttl: Optional[float]):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._namespaces: Dict[str, LRUTTLCache] = {}
+        self._lock = threading.RLock()
+
+    def _ns(self, namespace: str) -> LRUTTLCache:
+        cache = self._namespaces.get(namespace)
+        if cache is None:
+            with self._lock:
+                cache = self._namespaces.setdefault(namespace, LRUTTLCache(self.max_entries, self.ttl))
+        return cache
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        cache = self._ns(namespace)
+        found = {}
+        for key in keys:
+            value = cache.get(key, _DELETED)
+            if value is not _DELETED:
+                found[key] = value
+        return found
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        self._ns(namespace).set(key, value)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._ns(namespace).pop(key)
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any]) -> Any:
+        cache = self._ns(namespace)
+        with self._lock:
+            value = fn(cache.get(key))
+            cache.set(key, value)
+        return value
+
+
+class SQLiteStore(SessionStore):
+    def __init__(
+        self,
+        path: Path,
+        ttl: Optional[float],
+        flush_interval: float = 0.5,
+        max_entries: Optional[int] = None,
+        write_through: Iterable[str] = (),
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.write_through = frozenset(write_through)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires_at REAL, PRIMARY KEY (namespace, key))"
+        )
+        # Write-behind buffer: (namespace, key) -> (json value or _DELETED, expires_at)
+        self._pending: Dict[Tuple[str, str], Tuple[Any, Optional[float]]] = {}
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="session-store-writer", daemon=True)
+        self._writer.start()
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl if self.ttl else None
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        now = time.time()
+        with self._lock:
+            missing = []
+            for key in keys:
+                pending = self._pending.get((namespace, key))
+                if pending is None:
+                    missing.append(key)
+                elif pending[0] is not _DELETED:
+                    found[key] = json.loads(pending[0])
+            for i in range(0, len(missing), _SQLITE_MAX_VARS):
+                chunk = missing[i:i + _SQLITE_MAX_VARS]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM kv WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    [namespace, *chunk, now],
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+        return found
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._pending[(namespace, key)] = (json.dumps(value), self._expires_at())
+            if namespace in self.write_through:
+                self._flush_locked()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._pending[(namespace, key)] = (_DELETED, None)
+            if namespace in self.write_through:
+                self._flush_locked()
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any]) -> Any:
+        with self._lock:
+            self._flush_locked()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM kv WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (namespace, key, time.time()),
+                ).fetchone()
+                value = fn(json.loads(row[0]) if row else None)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value), self._expires_at()),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        upserts = [(ns, key, value, expires_at) for (ns, key), (value, expires_at) in pending.items() if value is not _DELETED]
+        deletes = [(ns, key) for (ns, key), (value, _) in pending.items() if value is _DELETED]
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)", upserts
+            )
+            self._conn.executemany("DELETE FROM kv WHERE namespace = ? AND key = ?", deletes)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            # Reason: Keep unflushed writes (newer buffered values win) so the next flush retries them
+            pending.update(self._pending)
+            self._pending = pending
+            raise
+
+    def purge(self) -> None:
+        """Deletes expired rows and, past max_entries in a namespace, its least recently written rows."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            if not self.max_entries:
+                return
+            # Reason: INSERT OR REPLACE gives the row a new, highest rowid, so rowid order is write order
+            namespaces = self._conn.execute(
+                "SELECT namespace FROM kv GROUP BY namespace HAVING COUNT(*) > ?", (self.max_entries,)
+            ).fetchall()
+            for (namespace,) in namespaces:
+                self._conn.execute(
+                    "DELETE FROM kv WHERE namespace = ? AND rowid IN "
+                    "(SELECT rowid FROM kv WHERE namespace = ? ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                    (namespace, namespace, self.max_entries),
+                )
+
+    def _write_loop(self) -> None:
+        last_purge = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.monotonic() - last_purge > _MAINTENANCE_INTERVAL_S:
+                    self.purge()
+                    last_purge = time.monotonic()
+            except sqlite3.Error as e:
+                print(f"[STORE] Write-back failed, will retry: {e}")
+
+    def close(self) -> None:
+        self._stop.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        self._conn.close()
+
+
+_STORE: Optional[SessionStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Returns the process-wide session store for the configured backend."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                if settings.SESSION_STORE_BACKEND == "sqlite":
+                    _STORE = SQLiteStore(
+                        settings.SESSION_STORE_PATH,
+                        settings.SESSION_TTL_S,
+                        settings.SESSION_FLUSH_INTERVAL_S,
+                        settings.SESSION_MAX_ENTRIES,
+                        settings.SESSION_WRITE_THROUGH,
+                    )
+                else:
+                    _STORE = MemoryStore(settings.SESSION_MAX_ENTRIES, settings.SESSION_TTL_S)
+    return _STORE
+
+
+def close_session_store() -> None:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is not None:
+            _STORE.close()
+            _STORE = None
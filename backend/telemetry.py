@@ -0,0 +1,130 @@
+"""
+Per-stage latency tracing, exported as Prometheus metrics (GET /metrics) and optionally over OTLP.
+- span(stage, name): times a block (DAG node, PDF parse, embedding call, FAISS search, Agent.run)
+  into the qhack_stage_seconds histogram, labelled by stage, name and ok/error status.
+- Spans carry attributes (tokens in/out, retries, cache hits); token counts also feed
+  qhack_llm_tokens_total. Retries and cache lookups are counted even outside a span.
+- OTLP export (traces) is enabled by OTEL_EXPORTER_OTLP_ENDPOINT and needs the optional
+  opentelemetry-sdk / opentelemetry-exporter-otlp packages; spans nest via contextvars.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+STAGE_SECONDS = Histogram(
+    "qhack_stage_seconds", "Wall time per pipeline stage.", ["stage", "name", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_SECONDS = Histogram(
+    "qhack_http_request_seconds", "HTTP request latency.", ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter("qhack_llm_tokens_total", "OpenAI tokens by call site and direction.", ["stage", "name", "direction"])
+LLM_RETRIES = Counter("qhack_llm_retries_total", "Scheduler retries by lane and HTTP status.", ["lane", "status"])
+CACHE_LOOKUPS = Counter("qhack_cache_lookups_total", "Cache lookups by cache and result.", ["cache", "result"])
+SCHEDULER_WAIT = Histogram(
+    "qhack_llm_scheduler_wait_seconds", "Time calls wait for admission by the LLM scheduler.", ["lane"],
+    buckets=LATENCY_BUCKETS,
+)
+SCHEDULER_QUEUE = Gauge("qhack_llm_scheduler_queue_depth", "Calls waiting in each scheduler lane.", ["lane"])
+
+
+class Span:
+    __slots__ = ("stage", "name", "attributes")
+
+    def __init__(self, stage: str, name: str):
+        self.stage = stage
+        self.name = name
+        self.attributes: Dict[str, object] = {}
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: int = 1) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+
+_CURRENT: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("telemetry_span", default=None)
+_TRACER = None
+
+
+def _otel_tracer():
+    global _TRACER
+    if _TRACER is None and settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        try:
+            from opentelemetry import trace
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError:
+            print("[TELEMETRY] OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk is not installed; OTLP export disabled.")
+            settings.OTEL_EXPORTER_OTLP_ENDPOINT = ""
+            return None
+        provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=f"{settings.OTEL_EXPORTER_OTLP_ENDPOINT.rstrip('/')}/v1/traces")))
+        trace.set_tracer_provider(provider)
+        _TRACER = trace.get_tracer("qhack")
+        print(f"[TELEMETRY] Exporting traces to {settings.OTEL_EXPORTER_OTLP_ENDPOINT}")
+    return _TRACER
+
+
+@contextmanager
+def span(stage: str, name: str = "") -> Iterator[Span]:
+    """Times the enclosed block as one stage; use the yielded Span to attach attributes."""
+    current = Span(stage, name)
+    token = _CURRENT.set(current)
+    tracer = _otel_tracer()
+    otel_cm = tracer.start_as_current_span(f"{stage} {name}".strip()) if tracer else None
+    otel_span = otel_cm.__enter__() if otel_cm else None
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield current
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage, name, status).observe(time.perf_counter() - started)
+        for direction in ("in", "out"):
+            tokens = current.attributes.get(f"tokens_{direction}")
+            if tokens:
+                LLM_TOKENS.labels(stage, name, direction).inc(tokens)
+        _CURRENT.reset(token)
+        if otel_cm:
+            for key, value in current.attributes.items():
+                otel_span.set_attribute(key, value)
+            otel_span.set_attribute("status", status)
+            otel_cm.__exit__(None, None, None)
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def record_cache(cache: str, hits: int, misses: int) -> None:
+    if hits:
+        CACHE_LOOKUPS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(cache, "miss").inc(misses)
+    current = _CURRENT.get()
+    if current is not None:
+        current.add(f"{cache}_cache_hits", hits)
+        current.add(f"{cache}_cache_misses", misses)
+
+
+def record_retry(lane: str, status: Optional[int]) -> None:
+    LLM_RETRIES.labels(lane, str(status) if status is not None else "connection").inc()
+    current = _CURRENT.get()
+    if current is not None:
+        current.add("retries")
+
+
+def render_metrics():
+    """(body, content type) for the Prometheus /metrics endpoint."""
+    return generate_latest(), CONTENT_TYPE_LATEST
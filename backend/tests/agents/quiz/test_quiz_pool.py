@@ -0,0 +1,39 @@
+import json
+import os
+from embeddings.loader import QuizPool, QUIZ_PATH
+
+QUIZ = [{"question": "Q?", "options": ["a", "b"], "correct_answer": "a"}]
+
+
+def test_lookup_is_case_and_whitespace_insensitive():
+    pool = QuizPool(path=QUIZ_PATH, check_interval=60)
+    assert pool.get("  python ", "INTRO TO  PYTHON") is not None
+    assert pool.get("Python", "Unknown Module") is None
+
+
+def test_loads_jsonl_shards_and_reloads_on_change(tmp_path):
+    base = tmp_path / "quizzes.json"
+    base.write_text(json.dumps([{"skill": "SQL", "module_title": "Joins", "quiz": QUIZ}]))
+    shards = tmp_path / "quizzes.d"
+    shards.mkdir()
+    shard = shards / "generated.jsonl"
+    shard.write_text(json.dumps({"skill": "Docker", "module_title": "Images", "quiz": QUIZ}) + "\n")
+
+    pool = QuizPool(path=base, shard_dir=shards, check_interval=0)
+    assert len(pool) == 2
+    assert pool.get("docker", "images") == QUIZ
+
+    with open(shard, "a") as f:
+        f.write(json.dumps({"skill": "Git", "module_title": "Branches", "quiz": QUIZ}) + "\n")
+    os.utime(shard, ns=(0, os.stat(shard).st_mtime_ns + 1_000_000))
+    assert pool.get("git", "branches") == QUIZ
+
+
+def test_file_vanishing_between_listing_and_stat_is_skipped(tmp_path):
+    base = tmp_path / "quizzes.json"
+    base.write_text(json.dumps([{"skill": "SQL", "module_title": "Joins", "quiz": QUIZ}]))
+    pool = QuizPool(path=base, shard_dir=tmp_path / "quizzes.d", check_interval=0)
+    gone = tmp_path / "gone.jsonl"
+    pool._sources = lambda: [base, gone]
+    assert pool.get("sql", "joins") == QUIZ
+    assert len(pool) == 1
@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+from embeddings.loader import QuizPool
+from llm_agents import quiz_warmup
+from llm_agents.quiz_agent import QuizAgentOutput
+
+COURSES = [
+    {"title": "Data", "skills": ["Python", "SQL"], "modules": [{"title": "Basics"}]},
+    {"title": "Ops", "skills": ["Docker"], "modules": [{"title": "Images"}]},
+]
+VALID = {"quiz": [{"question": "Q?", "options": ["a", "b"], "correct_answer": "a"}]}
+INVALID = {"quiz": [{"question": "Q?", "options": ["a", "b"], "correct_answer": "c"}]}
+
+
+def test_warm_up_retries_transient_errors_and_skips_invalid_and_existing_quizzes(monkeypatch, tmp_path):
+    base = tmp_path / "quizzes.json"
+    base.write_text(json.dumps([{"skill": "Python", "module_title": "Basics", "quiz": VALID["quiz"]}]))
+    shards = tmp_path / "quizzes.d"
+    pool = QuizPool(path=base, shard_dir=shards, check_interval=0)
+    prompts = []
+    replies = {
+        "SQL": [ConnectionError("reset by peer"), VALID],
+        "Docker": [INVALID, VALID],
+    }
+
+    async def fake_run_agent(agent, prompt, use_cache=True):
+        prompts.append(prompt)
+        reply = replies[prompt.split("\n")[0].removeprefix("Skill: ")].pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return QuizAgentOutput.model_validate(reply)
+
+    real_sleep = asyncio.sleep
+
+    async def no_backoff(delay):
+        await real_sleep(0)
+
+    monkeypatch.setattr(quiz_warmup, "run_agent", fake_run_agent)
+    monkeypatch.setattr(quiz_warmup, "load_catalog", lambda: COURSES)
+    monkeypatch.setattr(quiz_warmup, "get_quiz_pool", lambda: pool)
+    monkeypatch.setattr(quiz_warmup, "QUIZ_SHARD_DIR", shards)
+    monkeypatch.setattr(quiz_warmup, "GENERATED_QUIZ_PATH", shards / "generated.jsonl")
+    monkeypatch.setattr(quiz_warmup.asyncio, "sleep", no_backoff)
+
+    counts = asyncio.run(quiz_warmup.warm_up_quizzes(concurrency=2, retries=3))
+
+    assert counts == {"generated": 1, "failed": 1}
+    # Python / Basics was already in the pool; SQL was retried once; Docker's invalid quiz was not retried
+    assert sorted(prompts) == ["Skill: Docker\nModule: Images", "Skill: SQL\nModule: Basics", "Skill: SQL\nModule: Basics"]
+    assert replies["Docker"] == [VALID]
+    assert pool.get("sql", "basics") == VALID["quiz"]
+    assert pool.get("docker", "images") is None
@@ -0,0 +1,21 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from api import routes
+
+
+def test_non_positive_batch_concurrency_is_rejected_before_streaming():
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+
+    async def post(concurrency):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            body = {"items": [{"resume_id": "r1", "chat_transcript": "hi"}], "concurrency": concurrency}
+            return await client.post("/api/recommend-bundle/batch", json=body)
+
+    for concurrency in (-1, 0):
+        response = asyncio.run(post(concurrency))
+        assert response.status_code == 422
+        assert response.headers["content-type"].startswith("application/json")
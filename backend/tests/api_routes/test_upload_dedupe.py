@@ -0,0 +1,60 @@
+import asyncio
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+from api import routes
+
+PARSED = {"name": "Ada", "avatarUri": None, "summary": "Engineer.", "skills": ["python"]}
+
+
+def _client(monkeypatch):
+    calls = []
+
+    async def fake_process_resume(file_bytes, filename):
+        calls.append(filename)
+        await asyncio.sleep(0.1)
+        return dict(PARSED)
+
+    monkeypatch.setattr(routes, "process_resume", fake_process_resume)
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    return client, calls
+
+
+def _upload(client, content: bytes):
+    return client.post("/api/upload-resume", files={"file": ("cv.txt", content, "text/plain")})
+
+
+def test_same_bytes_uploaded_twice_are_parsed_once(monkeypatch):
+    content = f"resume {uuid.uuid4()}".encode()
+
+    async def scenario():
+        client, calls = _client(monkeypatch)
+        async with client:
+            first = (await _upload(client, content)).json()
+            second = (await _upload(client, content)).json()
+        return first, second, calls
+
+    first, second, calls = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert first["resume_id"] == second["resume_id"]
+    assert first["skills"] == ["python"]
+
+
+def test_concurrent_uploads_of_the_same_bytes_share_one_parse(monkeypatch):
+    content = f"resume {uuid.uuid4()}".encode()
+
+    async def scenario():
+        client, calls = _client(monkeypatch)
+        async with client:
+            responses = await asyncio.gather(*(_upload(client, content) for _ in range(3)))
+            other = await _upload(client, content + b" v2")
+        return [r.json() for r in responses], other.json(), calls
+
+    responses, other, calls = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert len({r["resume_id"] for r in responses}) == 1
+    assert other["resume_id"] != responses[0]["resume_id"]
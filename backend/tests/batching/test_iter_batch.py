@@ -0,0 +1,69 @@
+import asyncio
+
+import settings
+from graph import batch
+from graph.dag import Node
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.waves = []
+
+    def retrieve_modules_many(self, skills_gaps, top_n):
+        self.waves.append(len(skills_gaps))
+        return [[{"title": gap[0]}] for gap in skills_gaps]
+
+
+def _nodes(delays):
+    async def pre(state):
+        await asyncio.sleep(delays[state.resume_text])
+        return {"skills_gap": [state.resume_text]}
+
+    async def post(state):
+        return {"recommended_modules": state.candidate_modules}
+
+    return [
+        Node("skills_gap", pre, ("resume_text",), ("skills_gap",)),
+        Node(batch.RETRIEVAL_STAGE, None, ("skills_gap",), ("candidate_modules",)),
+        Node("course_retrieval", post, ("skills_gap", "candidate_modules"), ("recommended_modules",)),
+    ]
+
+
+def test_retrieval_runs_in_waves_so_fast_items_are_not_held_back(monkeypatch):
+    delays = {"fast-1": 0.0, "fast-2": 0.0, "slow": 0.5}
+    retriever = FakeRetriever()
+    monkeypatch.setattr(batch, "select_nodes", lambda stages=None: _nodes(delays))
+    monkeypatch.setattr(batch, "get_course_retriever", lambda: retriever)
+    monkeypatch.setattr(settings, "BATCH_RETRIEVAL_WAVE_SIZE", 2)
+    monkeypatch.setattr(settings, "BATCH_RETRIEVAL_WAVE_MS", 50)
+
+    async def collect():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        order = []
+        async for position, state in batch.iter_batch([(name, "") for name in delays]):
+            order.append((position, state.recommended_modules, loop.time() - started))
+        return order
+
+    order = asyncio.run(collect())
+    assert retriever.waves == [2, 1]
+    assert [position for position, _, _ in order][-1] == 2
+    assert order[0][2] < 0.3
+    assert {position: modules for position, modules, _ in order} == {
+        0: [{"title": "fast-1"}], 1: [{"title": "fast-2"}], 2: [{"title": "slow"}],
+    }
+
+
+def test_partial_wave_is_flushed_after_the_wave_timeout(monkeypatch):
+    delays = {"a": 0.0, "b": 0.4}
+    retriever = FakeRetriever()
+    monkeypatch.setattr(batch, "select_nodes", lambda stages=None: _nodes(delays))
+    monkeypatch.setattr(batch, "get_course_retriever", lambda: retriever)
+    monkeypatch.setattr(settings, "BATCH_RETRIEVAL_WAVE_SIZE", 10)
+    monkeypatch.setattr(settings, "BATCH_RETRIEVAL_WAVE_MS", 50)
+
+    async def collect():
+        return [position async for position, _ in batch.iter_batch([(name, "") for name in delays])]
+
+    assert asyncio.run(collect()) == [0, 1]
+    assert retriever.waves == [1, 1]
@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+import json
+
+import bulk_ingest
+from bulk_ingest import drop_partial_line, ingest_directory, load_checkpoint
+
+
+def _resumes(tmp_path):
+    root = tmp_path / "resumes"
+    root.mkdir()
+    for name in ("a", "b", "c"):
+        (root / f"{name}.txt").write_text(f"{name} resume")
+    return root
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _checkpoint(tmp_path, partial: str = ""):
+    output = tmp_path / "out.jsonl"
+    lines = [
+        {"path": "a.txt", "sha256": _sha("a resume"), "status": "ok", "result": {}},
+        {"path": "b.txt", "sha256": _sha("b resume"), "status": "error", "error": "timeout"},
+    ]
+    output.write_text("".join(json.dumps(line) + "\n" for line in lines) + partial)
+    return output
+
+
+def _stub_parser(monkeypatch):
+    parsed = []
+
+    async def fake_parse_resume(file_bytes, filename):
+        parsed.append(filename)
+        return {"skills": [filename]}
+
+    monkeypatch.setattr(bulk_ingest, "parse_resume", fake_parse_resume)
+    return parsed
+
+
+def test_checkpoint_skips_ok_documents_and_retries_failed_ones(monkeypatch, tmp_path):
+    parsed = _stub_parser(monkeypatch)
+    output = _checkpoint(tmp_path)
+    counts = asyncio.run(ingest_directory(_resumes(tmp_path), output, concurrency=2))
+    assert sorted(parsed) == ["b.txt", "c.txt"]
+    assert counts == {"ok": 2, "error": 0, "skipped": 1}
+
+
+def test_skip_failed_also_skips_documents_that_failed_before(monkeypatch, tmp_path):
+    parsed = _stub_parser(monkeypatch)
+    output = _checkpoint(tmp_path)
+    counts = asyncio.run(ingest_directory(_resumes(tmp_path), output, skip_failed=True))
+    assert parsed == ["c.txt"]
+    assert counts["skipped"] == 2
+
+
+def test_resume_after_a_truncated_last_line_keeps_every_record_parseable(monkeypatch, tmp_path):
+    parsed = _stub_parser(monkeypatch)
+    output = _checkpoint(tmp_path, partial='{"path": "c.txt", "sha256": "ab')
+    root = _resumes(tmp_path)
+    asyncio.run(ingest_directory(root, output))
+    entries = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [e["path"] for e in entries[2:]] == sorted(parsed) == ["b.txt", "c.txt"]
+    # A second run finds everything done
+    assert load_checkpoint(output) >= {("c.txt", _sha("c resume")), ("b.txt", _sha("b resume"))}
+    parsed.clear()
+    asyncio.run(ingest_directory(root, output))
+    assert parsed == []
+
+
+def test_drop_partial_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"b": 2}\n')
+    drop_partial_line(path)
+    assert path.read_bytes() == b'{"a": 1}\n{"b": 2}\n'
+    path.write_bytes(b'{"a": 1}\n{"b": ' + b"x" * 10_000)
+    drop_partial_line(path)
+    assert path.read_bytes() == b'{"a": 1}\n'
+    path.write_bytes(b'{"a": ')
+    drop_partial_line(path)
+    assert path.read_bytes() == b""
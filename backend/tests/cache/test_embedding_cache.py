@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from embeddings.cache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 1.0]
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = EmbeddingCache(tmp_path / "emb.sqlite", max_entries=100)
+    cache.put_many("m", ["a"], [[1.0, 2.0]])
+    assert cache.get_many("m", ["a", "b", "a"]) == [[1.0, 2.0], None, [1.0, 2.0]]
+    assert cache.get_many("other-model", ["a"]) == [None]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 1)
+
+
+def test_identical_texts_in_one_batch_are_embedded_once(tmp_path):
+    underlying = CountingEmbeddings()
+    embeddings = CachedEmbeddings(underlying, "m", EmbeddingCache(tmp_path / "emb.sqlite", max_entries=100))
+    vectors = embeddings.embed_documents(["python  basics", "sql", "python basics"])
+    assert underlying.calls == [["python  basics", "sql"]]
+    assert vectors[0] == vectors[2]
+    assert asyncio.run(embeddings.aembed_documents(["sql", "docker"])) == [vectors[1], [6.0, 1.0]]
+    assert underlying.calls[-1] == ["docker"]
+
+
+def test_queries_embed_the_original_text(tmp_path):
+    underlying = CountingEmbeddings()
+    embeddings = CachedEmbeddings(underlying, "m", EmbeddingCache(tmp_path / "emb.sqlite", max_entries=100))
+    assert embeddings.embed_query("  spaced   query ") == [17.0, 1.0]
+    assert underlying.calls == [["  spaced   query "]]
+    assert embeddings.embed_query("spaced query") == [17.0, 1.0]
+    assert len(underlying.calls) == 1
+
+
+def test_evicts_least_recently_used_down_to_the_cap(tmp_path):
+    cache = EmbeddingCache(tmp_path / "emb.sqlite", max_entries=10)
+    for i in range(10):
+        cache.put_many("m", [f"t{i}"], [[float(i)]])
+        time.sleep(0.001)
+    cache.get_many("m", ["t0"])  # Refresh t0 so t1 is now the oldest
+    cache.put_many("m", ["t10"], [[10.0]])
+    assert cache.stats()["entries"] == 9
+    assert cache.get_many("m", ["t0", "t1", "t2", "t10"]) == [[0.0], None, None, [10.0]]
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = tmp_path / "emb.sqlite"
+    EmbeddingCache(path, max_entries=100).put_many("m", ["a"], [[0.5, 0.25]])
+    reopened = EmbeddingCache(path, max_entries=100)
+    assert reopened.get_many("m", [" a "]) == [[0.5, 0.25]]
+    assert reopened.stats()["entries"] == 1
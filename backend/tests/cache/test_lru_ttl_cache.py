@@ -0,0 +1,34 @@
+import time
+from caching import LRUTTLCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUTTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_expired_entries_are_misses():
+    cache = LRUTTLCache(maxsize=4, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_stats_track_hit_rate_across_clear():
+    cache = LRUTTLCache(maxsize=4)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.clear()
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["size"] == 0
@@ -0,0 +1,29 @@
+import time
+from caching import SQLiteTTLCache
+
+
+def test_values_persist_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    SQLiteTTLCache(path, maxsize=10).set("k", '{"quiz": []}')
+    cache = SQLiteTTLCache(path, maxsize=10)
+    assert cache.get("k") == '{"quiz": []}'
+    assert len(cache) == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = SQLiteTTLCache(tmp_path / "cache.sqlite", maxsize=10, ttl=0.01)
+    cache.set("k", "v")
+    time.sleep(0.02)
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_size_bounded_eviction_drops_least_recently_used(tmp_path):
+    cache = SQLiteTTLCache(tmp_path / "cache.sqlite", maxsize=10)
+    for i in range(10):
+        cache.set(f"k{i}", str(i))
+    cache.get("k0")
+    cache.set("k10", "10")
+    assert len(cache) == 9
+    assert cache.get("k0") == "0"
+    assert cache.get("k1") is None
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+
+from graph import dag
+from graph.dag import Node, iter_graph, run_full_pipeline
+
+
+def test_independent_nodes_overlap_and_timings_are_recorded(monkeypatch):
+    spans = {}
+
+    def slow(name, outputs):
+        async def fn(state):
+            spans[name] = [time.perf_counter()]
+            await asyncio.sleep(0.2)
+            spans[name].append(time.perf_counter())
+            return outputs
+        return fn
+
+    async def combine(state):
+        return {"skills_gap": sorted(set(state.goal_skills) - set(state.skills))}
+
+    nodes = [
+        Node("resume", slow("resume", {"skills": ["python"]}), ("resume_text",), ("skills",)),
+        Node("conversation", slow("conversation", {"goal_skills": ["python", "sql"]}), ("chat_transcript",), ("goal_skills",)),
+        Node("skills_gap", combine, ("skills", "goal_skills"), ("skills_gap",)),
+    ]
+    monkeypatch.setattr(dag, "select_nodes", lambda stages=None: nodes)
+
+    started = time.perf_counter()
+    state = asyncio.run(run_full_pipeline("resume", "chat"))
+    elapsed = time.perf_counter() - started
+
+    assert state.skills_gap == ["sql"]
+    # Each slow node sleeps 0.2s; run one after the other they would take 0.4s
+    assert elapsed < 0.35
+    assert spans["conversation"][0] < spans["resume"][1] and spans["resume"][0] < spans["conversation"][1]
+    assert set(state.timings) == {"resume", "conversation", "skills_gap"}
+    assert state.timings["resume"] >= 0.2
+
+
+def test_failing_node_cancels_its_running_siblings():
+    cancelled = asyncio.Event()
+
+    async def fast(state):
+        return {"skills": ["python"]}
+
+    async def slow(state):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {"goal_skills": []}
+
+    async def broken(state):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("agent failed")
+
+    nodes = [
+        Node("resume", fast, ("resume_text",), ("skills",)),
+        Node("conversation", slow, ("chat_transcript",), ("goal_skills",)),
+        Node("quiz", broken, ("skills",), ("quiz",)),
+    ]
+
+    async def scenario():
+        timings = {}
+        with pytest.raises(RuntimeError, match="agent failed"):
+            async for name, _, elapsed in iter_graph(nodes, {"resume_text": "", "chat_transcript": ""}):
+                timings[name] = elapsed
+        return timings
+
+    started = time.perf_counter()
+    timings = asyncio.run(scenario())
+    assert time.perf_counter() - started < 1
+    assert cancelled.is_set()
+    assert list(timings) == ["resume"]
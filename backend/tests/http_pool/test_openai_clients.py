@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import openai_clients
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fresh_clients(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    for name in ("_ASYNC_HTTP", "_SYNC_HTTP", "_ASYNC_OPENAI", "_SYNC_OPENAI"):
+        monkeypatch.setattr(openai_clients, name, None)
+    monkeypatch.setattr(openai_clients, "_REQUESTS", {"async": 0, "sync": 0})
+    yield openai_clients
+    asyncio.run(openai_clients.close_http_clients())
+
+
+def test_sdk_and_langchain_clients_share_one_pool(fresh_clients, monkeypatch):
+    monkeypatch.setattr(openai_clients, "cached_embeddings", lambda embeddings: embeddings)
+    async_http, sync_http = fresh_clients.get_http_client(), fresh_clients.get_sync_http_client()
+
+    assert fresh_clients.get_openai_client()._client is async_http
+    assert fresh_clients.get_sync_openai_client()._client is sync_http
+    assert fresh_clients.get_openai_client() is fresh_clients.get_openai_client()
+    embeddings = fresh_clients.openai_embeddings()
+    assert embeddings.client._client._client is sync_http
+    assert embeddings.async_client._client._client is async_http
+
+
+def test_pool_stats_counts_requests_and_idle_connections(fresh_clients):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = fresh_clients.get_sync_http_client()
+        for _ in range(3):
+            assert client.get(f"http://127.0.0.1:{server.server_port}/").text == "ok"
+        stats = fresh_clients.pool_stats()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Reason: Keep-alive reuses one connection, which sits idle once the responses are read
+    assert stats["sync"] == {"requests": 3, "open": 1, "idle": 1, "in_use": 0}
+    assert stats["async"] == {"requests": 0}
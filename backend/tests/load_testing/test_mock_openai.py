@@ -0,0 +1,57 @@
+import base64
+
+import numpy as np
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from benchmarks.loadtest import compare, percentile
+from benchmarks.mock_openai import SchemaSampler, create_app
+
+
+class Question(BaseModel):
+    question: str
+    options: list[str]
+    correct_answer: str
+
+
+class Quiz(BaseModel):
+    quiz: list[Question]
+    skills: list[str]
+
+
+def test_sampler_output_is_deterministic_and_valid():
+    schema = Quiz.model_json_schema()
+    first = SchemaSampler(schema, seed=7, skills=["python", "sql"]).sample(schema)
+    assert first == SchemaSampler(schema, seed=7, skills=["python", "sql"]).sample(schema)
+    quiz = Quiz.model_validate(first)
+    assert set(quiz.skills) <= {"python", "sql"}
+    assert all(q.correct_answer in q.options for q in quiz.quiz)
+
+
+def test_chat_answers_the_output_tool_and_embeddings_are_stable():
+    client = TestClient(create_app())
+    schema = Quiz.model_json_schema()
+    reply = client.post("/v1/chat/completions", json={
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": "Skill: SQL"}],
+        "tools": [{"type": "function", "function": {"name": "final_result", "parameters": schema}}],
+    }).json()
+    call = reply["choices"][0]["message"]["tool_calls"][0]["function"]
+    assert call["name"] == "final_result"
+    Quiz.model_validate_json(call["arguments"])
+
+    body = {"model": "text-embedding-ada-002", "input": ["python", [123, 456]], "encoding_format": "base64"}
+    first, second = (client.post("/v1/embeddings", json=body).json()["data"] for _ in range(2))
+    vectors = [np.frombuffer(base64.b64decode(d["embedding"]), dtype="float32") for d in first]
+    assert [v.shape for v in vectors] == [(1536,), (1536,)]
+    assert np.allclose(np.linalg.norm(vectors[0]), 1.0)
+    assert first == second
+
+
+def test_percentile_and_regression_check():
+    values = sorted(float(i) for i in range(1, 101))
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    baseline = {"quiz": {"p95_ms": 100.0, "rps": 50.0}}
+    assert compare({"quiz": {"p95_ms": 120.0, "rps": 45.0}}, baseline, 0.25) == []
+    assert len(compare({"quiz": {"p95_ms": 130.0, "rps": 30.0}}, baseline, 0.25)) == 2
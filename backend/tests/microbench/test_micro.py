@@ -0,0 +1,39 @@
+from benchmarks.micro import compare, measure, measure_case, run_sync, synthetic_catalog
+from graph.dag import PipelineState, compute_skills_gap
+
+
+def test_measure_reports_per_call_times():
+    timing = measure(lambda: sum(range(100)), min_time=0.05, rounds=3)
+    assert timing.rounds == 3 and timing.loops >= 1
+    assert 0 < timing.min_s <= timing.median_s < 0.01
+
+
+def test_run_sync_drives_cpu_only_dag_nodes():
+    state = PipelineState(skills=["python"], goal_skills=["python", "sql"])
+    assert run_sync(compute_skills_gap(state)) == {"skills_gap": ["sql"]}
+
+
+def test_synthetic_catalog_is_seeded_and_shaped_like_courses_json():
+    catalog = synthetic_catalog(50)
+    assert catalog == synthetic_catalog(50)
+    assert len(catalog) == 50 and {"title", "skills", "price", "modules"} <= set(catalog[0])
+
+
+def test_compare_flags_only_slowdowns_beyond_the_threshold():
+    baseline = {"a": {"min_s": 1.0}, "b": {"min_s": 1.0}}
+    results = {"a": {"min_s": 1.2}, "b": {"min_s": 1.5}, "new": {"min_s": 9.0}}
+    regressions = compare(results, baseline, 0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("b:")
+
+
+def test_compare_normalizes_by_calibration_time():
+    baseline = {"a": {"min_s": 1.0, "normalized": 10.0}, "b": {"min_s": 1.0, "normalized": 10.0}}
+    # "a" is 80% slower on a machine whose calibration loop is 2x slower: not a regression
+    results = {"a": {"min_s": 1.8, "normalized": 9.0}, "b": {"min_s": 1.8, "normalized": 18.0}}
+    regressions = compare(results, baseline, 0.5)
+    assert len(regressions) == 1 and regressions[0].startswith("b:")
+
+
+def test_measure_case_records_calibration_time():
+    result = measure_case(lambda: None, min_time=0.02, rounds=3)
+    assert result["calibration_s"] > 0 and result["normalized"] > 0 and result["rounds"] == 3
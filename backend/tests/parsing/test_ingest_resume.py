@@ -0,0 +1,62 @@
+import fitz
+import pytest
+
+from embeddings import utils
+from embeddings.utils import ingest_resume
+
+
+def make_pdf(pages, images=()):
+    """PDF with one text line per page; images are (page index, width, height) solid-colour pixmaps."""
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number + 1} experience")
+    for page_index, width, height in images:
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, width, height), False)
+        pixmap.clear_with(120)
+        doc[page_index].insert_image(fitz.Rect(300, 100, 300 + width, 100 + height), pixmap=pixmap)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_max_pages_caps_the_text_that_is_read():
+    parsed = ingest_resume(make_pdf(5), "cv.pdf", max_pages=2)
+    assert "Page 2" in parsed["text"] and "Page 3" not in parsed["text"]
+    assert "Page 5" in ingest_resume(make_pdf(5), "cv.pdf")["text"]
+
+
+def test_avatar_is_the_first_reasonably_sized_roughly_square_image():
+    # Too small, then too wide, then a photo-like image on page 2
+    pdf = make_pdf(2, images=[(0, 32, 32), (0, 300, 100), (1, 120, 100)])
+    parsed = ingest_resume(pdf, "cv.pdf")
+    assert parsed["avatar"] is not None and parsed["avatar_ext"]
+    pixmap = fitz.Pixmap(parsed["avatar"])
+    assert (pixmap.width, pixmap.height) == (120, 100)
+
+
+def test_no_avatar_when_no_image_qualifies():
+    parsed = ingest_resume(make_pdf(1, images=[(0, 63, 200), (0, 201, 100)]), "cv.pdf")
+    assert parsed["avatar"] is None and parsed["avatar_ext"] is None
+
+
+def test_avatar_heuristic_boundaries():
+    assert utils._looks_like_avatar(64, 128)
+    assert not utils._looks_like_avatar(63, 63)
+    assert not utils._looks_like_avatar(64, 129)
+
+
+def test_text_files_skip_pdf_parsing():
+    assert ingest_resume(b"  Ada Lovelace\nPython  ", "cv.txt") == {
+        "text": "Ada Lovelace\nPython", "avatar": None, "avatar_ext": None,
+    }
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        ingest_resume(b"data", "cv.docx")
+
+
+def test_corrupt_page_is_reported_as_value_error(monkeypatch):
+    def broken(self, *args, **kwargs):
+        raise RuntimeError("bad content stream")
+
+    monkeypatch.setattr(fitz.Page, "get_text", broken)
+    with pytest.raises(ValueError, match="page 1"):
+        ingest_resume(make_pdf(1), "cv.pdf")
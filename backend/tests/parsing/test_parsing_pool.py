@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+import pytest
+
+import parsing_pool
+from parsing_pool import run_in_parsing_pool, shutdown_parsing_pool
+
+
+def test_timeout_recycles_the_pool_and_the_next_job_runs():
+    async def scenario():
+        assert await run_in_parsing_pool(abs, -2, timeout=30) == 2
+        pool = parsing_pool.get_parsing_pool()
+        workers = list(pool._processes.values())
+        with pytest.raises(ValueError, match="timed out"):
+            await run_in_parsing_pool(time.sleep, 30, timeout=0.5)
+        assert parsing_pool._POOL is None
+        assert await run_in_parsing_pool(abs, -3, timeout=30) == 3
+        assert parsing_pool._POOL is not pool
+        return workers
+
+    try:
+        workers = asyncio.run(scenario())
+        assert workers
+        for process in workers:
+            process.join(5)
+            assert not process.is_alive()
+    finally:
+        shutdown_parsing_pool()
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from llm_agents.pricing_agent import Module, adjust_pricing
+
+
+def module(title, price, subtopics=()):
+    return Module(course_title="Course", module_title=title, module_description="", selected_subtopics=list(subtopics),
+                  why_selected="", price=price)
+
+
+def adjust(modules, budget, skills_gap=None):
+    return asyncio.run(adjust_pricing(modules, budget, skills_gap))
+
+
+def test_bundle_that_fits_is_kept_at_list_price():
+    bundle = adjust([module("Python", 30, ["python"]), module("SQL", 30, ["sql"])], 100, ["Python", "SQL"])
+    assert [(m.module_title, m.final_price) for m in bundle] == [("Python", 30), ("SQL", 30)]
+
+
+def test_over_budget_keeps_the_modules_covering_the_most_gap_skills():
+    modules = [module("Python intro", 50, ["python"]), module("More Python", 50, ["python"]), module("SQL", 50, ["sql"])]
+    bundle = adjust(modules, 100, ["Python", "SQL"])
+    assert [m.module_title for m in bundle] == ["Python intro", "SQL"]
+    assert sum(m.final_price for m in bundle) <= 100
+
+
+def test_discount_tier_boundary():
+    # 3 x 35 = 105 list; the 3-module 10% tier brings it to 94.5, so all three fit a budget of 100
+    three = adjust([module(str(i), 35) for i in range(3)], 100, [])
+    assert [m.final_price for m in three] == [31, 31, 31]
+    # Just under the tier: two modules get no discount
+    two = adjust([module(str(i), 35) for i in range(2)], 100, [])
+    assert [m.final_price for m in two] == [35, 35]
+    # 5 modules reach the 15% tier
+    five = adjust([module(str(i), 20) for i in range(5)], 100, [])
+    assert [m.final_price for m in five] == [17] * 5
+
+
+def test_empty_skills_gap_keeps_the_most_modules_then_the_cheapest():
+    bundle = adjust([module("A", 60), module("B", 30), module("C", 30)], 100, [])
+    assert [m.module_title for m in bundle] == ["B", "C"]
+    assert adjust([module("A", 60)], 100) == adjust([module("A", 60)], 100, [])
+    assert adjust([], 100, []) == []
+
+
+def test_long_skill_gap_falls_back_to_greedy_within_budget():
+    gap = [f"skill{i}" for i in range(40)]
+    modules = [module(f"M{i}", 10 + i % 7, [f"skill{i}"]) for i in range(40)]
+    started = time.perf_counter()
+    bundle = adjust(modules, 200, gap)
+    assert time.perf_counter() - started < 2
+    assert 0 < len(bundle) < 40
+    assert sum(m.final_price for m in bundle) <= 200
+    # Greedy takes the cheapest modules first when each covers one new skill
+    assert all(m.price <= 13 for m in bundle)
@@ -0,0 +1,46 @@
+from bundle_optimizer import PriceBook, optimize_bundle, select_within_budget, volume_discount
+
+COURSES = [
+    {"title": "SQL for Analysts", "skills": ["SQL"], "price": 60,
+     "modules": [{"title": "Joins"}, {"title": "Aggregations"}]},
+    {"title": "Intro to Python", "skills": ["Python"], "price": 90,
+     "modules": [{"title": "Basics"}, {"title": "Functions"}, {"title": "Data"}]},
+]
+
+
+def module(course_title, module_title):
+    return {"course_title": course_title, "module_title": module_title, "module_description": "",
+            "selected_subtopics": [], "why_selected": ""}
+
+
+def test_price_book_splits_course_price_across_modules():
+    book = PriceBook(COURSES)
+    assert book.price("sql for analysts", "Joins") == 30
+    assert book.price("Intro to Python", "Renamed module") == 30
+    assert book.price("Unknown", "Joins") == 0
+
+
+def test_prefers_coverage_over_list_position():
+    # The first two modules only cover Python; dropping by position would lose SQL
+    chosen = select_within_budget([30, 30, 30], [frozenset({"python"}), frozenset({"python"}), frozenset({"sql"})], 60)
+    assert chosen == (0, 2)
+
+
+def test_volume_discount_can_make_a_bigger_bundle_fit():
+    # 3 x 35 = 105 list, 94.5 after the 3-module discount: fits a budget of 100
+    assert select_within_budget([35, 35, 35], [frozenset()] * 3, 100) == (0, 1, 2)
+    assert volume_discount(2) == 0.0 and volume_discount(5) == 0.15
+
+
+def test_optimize_bundle_stays_within_budget():
+    modules = [module("Intro to Python", "Basics"), module("Intro to Python", "Functions"),
+               module("SQL for Analysts", "Joins"), module("SQL for Analysts", "Aggregations")]
+    bundle = optimize_bundle(modules, 100, ["Python", "SQL"], PriceBook(COURSES))
+    assert [m["module_title"] for m in bundle] == ["Basics", "Functions", "Joins"]
+    assert [m["final_price"] for m in bundle] == [27, 27, 27]
+    assert sum(m["final_price"] for m in bundle) <= 100
+
+
+def test_missing_budget_keeps_everything():
+    modules = [module("SQL for Analysts", "Joins")]
+    assert optimize_bundle(modules, None, ["SQL"], PriceBook(COURSES))[0]["final_price"] == 30
@@ -0,0 +1,64 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+from embeddings import catalog, embed_courses
+
+COURSES = [
+    {"id": "py", "title": "Intro to Python", "description": "Python basics.", "skills": ["Python"],
+     "modules": [{"title": "Syntax", "description": "Loops.", "subtopics": ["for"]}]},
+    {"id": "sql", "title": "SQL for Analysts", "description": "Queries.", "skills": ["SQL"], "modules": []},
+]
+
+
+class FakeEmbeddings:
+    async def create(self, input, model):
+        vectors = [np.random.default_rng(len(text)).standard_normal(8).tolist() for text in input]
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=v) for i, v in enumerate(vectors)])
+
+
+def _use_tmp_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(catalog, "VERSIONS_DIR", tmp_path / "versions")
+    monkeypatch.setattr(embed_courses, "INDEX_DIR", tmp_path)
+    monkeypatch.setattr(embed_courses, "VERSIONS_DIR", tmp_path / "versions")
+    monkeypatch.setattr(embed_courses, "MANIFEST_PATH", tmp_path / "manifest.json")
+    monkeypatch.setattr(embed_courses, "load_catalog", lambda: list(COURSES))
+
+
+def test_rebuild_writes_a_version_directory_and_points_the_manifest_at_it(monkeypatch, tmp_path):
+    _use_tmp_index(monkeypatch, tmp_path)
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+
+    asyncio.run(embed_courses.rebuild_index(client=client))
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    directory = catalog.index_dir(manifest)
+
+    assert directory.parent == tmp_path / "versions"
+    assert manifest["count"] == len(json.loads((directory / catalog.META_FILE).read_text())) == 2
+    assert manifest["module_count"] == 1
+    assert not (tmp_path / catalog.INDEX_FILE).exists()
+
+
+def test_rebuild_prunes_old_versions_and_reuses_vectors(monkeypatch, tmp_path):
+    _use_tmp_index(monkeypatch, tmp_path)
+    monkeypatch.setattr(embed_courses, "KEEP_VERSIONS", 2)
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    old = tmp_path / "versions" / "20000101T000000-old"
+    old.mkdir(parents=True)
+
+    asyncio.run(embed_courses.rebuild_index(client=client))
+    first = json.loads((tmp_path / "manifest.json").read_text())["version"]
+    stats = asyncio.run(embed_courses.rebuild_index(client=client))
+    second = json.loads((tmp_path / "manifest.json").read_text())["version"]
+
+    assert second != first
+    assert sorted(p.name for p in (tmp_path / "versions").iterdir()) == [first, second]
+    assert not old.exists()
+    assert stats["courses"]["reused"] == 2
+
+
+def test_index_dir_falls_back_to_flat_layout_for_old_manifests():
+    assert catalog.index_dir({}) == catalog.INDEX_DIR
+    assert catalog.index_dir({"version": "v1"}) == catalog.VERSIONS_DIR / "v1"
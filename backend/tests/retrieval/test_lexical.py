@@ -0,0 +1,59 @@
+from embeddings.catalog import catalog_modules, module_key
+from embeddings.lexical import BM25Index, LexicalCourseIndex, SkillIndex, first_tagged, tokenize
+from embeddings.retriever import retrieve_courses
+
+COURSES = [
+    {"title": "Intro to Python", "description": "Python basics.", "skills": ["Python"], "modules": []},
+    {"title": "SQL for Analysts", "description": "Query data with SQL.", "skills": ["SQL", "Databases"], "modules": []},
+    {"title": "Data Engineering", "description": "Pipelines with Python and SQL.", "skills": ["ETL"],
+     "modules": [{"title": "Warehousing", "description": "Star schemas.", "subtopics": ["dbt"]}]},
+]
+
+
+def test_tokenize_keeps_language_names():
+    assert tokenize("C++, C# and Node.js.") == ["c++", "c#", "and", "node.js"]
+
+
+def test_skill_index_is_case_insensitive():
+    index = SkillIndex(COURSES)
+    assert index.lookup(["python", " SQL "]) == {0: 1, 1: 1}
+    assert index.covers(["sql", "Databases"])
+    assert not index.covers(["sql", "dbt"])
+
+
+def test_bm25_matches_module_subtopics():
+    index = BM25Index([c["description"] + " dbt" * (i == 2) for i, c in enumerate(COURSES)])
+    assert list(index.score("dbt")) == [2]
+
+
+def test_exact_tag_hits_rank_first():
+    index = LexicalCourseIndex(COURSES)
+    assert index.search(["SQL"], top_n=2) == [1, 2]
+
+
+def test_module_index_ranks_individual_modules():
+    courses = COURSES + [
+        {"id": 7, "title": "Analytics", "description": "Reporting.", "skills": ["SQL"],
+         "modules": [{"title": "Dashboards", "description": "Charts.", "subtopics": []},
+                     {"title": "Window Functions", "description": "Advanced SQL queries.", "subtopics": ["OVER"]}]},
+    ]
+    modules = catalog_modules(courses)
+    assert [module_key(m) for m in modules] == ["Data Engineering:0", "7:0", "7:1"]
+    rows = LexicalCourseIndex(modules).search(["window functions"], top_n=1)
+    assert modules[rows[0]]["title"] == "Window Functions"
+
+
+def test_retrieve_courses_ranks_matches_first_and_pads_deterministically():
+    first = retrieve_courses(["Python"], top_n=3)
+    assert first == retrieve_courses(["python"], top_n=3)
+    assert "Python" in first[0]["skills"]
+    assert len(first) == 3
+
+
+def test_first_tagged_picks_best_ranked_row_per_skill():
+    modules = catalog_modules(COURSES + [
+        {"title": "SQL II", "description": "More SQL.", "skills": ["sql"], "modules": [{"title": "Joins"}]},
+    ])
+    items = [{"skills": ["ETL"]}, {"skills": ["SQL", "Databases"]}, {"skills": ["sql"]}]
+    assert first_tagged(["sql", "Python"], items) == {"sql": 1}
+    assert first_tagged(["Databases"], modules) == {}
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from llm_scheduler import BATCH, INTERACTIVE, WARMUP, LLMScheduler, TokenBucket, llm_priority, retry_after
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_token_bucket_refills_at_the_per_minute_rate():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    bucket.take(60, now)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+def test_retry_after_reads_seconds_and_milliseconds():
+    assert retry_after(RateLimited({"retry-after": "2"})) == 2.0
+    assert retry_after(RateLimited({"retry-after-ms": "250"})) == 0.25
+    assert retry_after(RateLimited({})) is None
+
+
+def test_interactive_lane_is_admitted_before_batch_and_warmup():
+    scheduler = LLMScheduler(rpm=0, tpm=0)
+    order = []
+
+    async def call(name):
+        order.append(name)
+
+    async def main():
+        # Reason: Hold admission so all three are queued before the dispatcher picks one
+        scheduler._paused_until = time.monotonic() + 0.1
+        tasks = []
+        for lane in (WARMUP, BATCH, INTERACTIVE):
+            with llm_priority(lane):
+                tasks.append(asyncio.create_task(scheduler.run(lambda lane=lane: call(lane), tokens=1)))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == [INTERACTIVE, BATCH, WARMUP]
+    assert scheduler.stats()["lanes"][BATCH]["admitted"] == 1
+
+
+def test_rate_limited_call_is_retried_after_the_server_delay():
+    scheduler = LLMScheduler(rpm=0, tpm=0, max_retries=2)
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RateLimited({"retry-after-ms": "50"})
+        return "ok"
+
+    assert scheduler.call(flaky, tokens=1) == "ok"
+    assert attempts[1] - attempts[0] >= 0.05
+    assert scheduler.stats()["rate_limited"] == 1
+
+
+def test_non_retryable_errors_propagate():
+    scheduler = LLMScheduler(rpm=0, tpm=0)
+
+    def broken():
+        raise KeyError("bad")
+
+    with pytest.raises(KeyError):
+        scheduler.call(broken, tokens=1)
+
+
+def test_connection_errors_and_timeouts_are_retried_with_backoff():
+    scheduler = LLMScheduler(rpm=0, tpm=0, max_retries=3, backoff_base=0.01, backoff_max=0.01)
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    errors = [httpx.ConnectError("refused", request=request), openai.APITimeoutError(request=request)]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert scheduler.call(flaky, tokens=1) == "ok"
+    stats = scheduler.stats()
+    assert stats["lanes"][INTERACTIVE]["retries"] == 2
+    assert stats["rate_limited"] == 0
+    assert scheduler._paused_until == 0.0
+
+
+def test_connection_errors_give_up_after_max_retries():
+    scheduler = LLMScheduler(rpm=0, tpm=0, max_retries=1, backoff_base=0.01, backoff_max=0.01)
+    request = httpx.Request("GET", "https://api.openai.com/v1/models")
+
+    def down():
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(scheduler.run(lambda: asyncio.to_thread(down), tokens=1))
+    assert scheduler.stats()["lanes"][INTERACTIVE]["retries"] == 1
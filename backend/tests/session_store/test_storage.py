@@ -0,0 +1,75 @@
+import threading
+import pytest
+from storage import MemoryStore, SQLiteStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryStore(max_entries=100, ttl=None)
+    else:
+        store = SQLiteStore(tmp_path / "sessions.sqlite", ttl=None, flush_interval=0.05)
+        yield store
+        store.close()
+
+
+def test_set_get_many_and_delete(store):
+    store.set("resumes", "a", {"name": "Ada"})
+    store.set("resumes", "b", {"name": "Bob"})
+    assert store.get_many("resumes", ["a", "b", "missing"]) == {"a": {"name": "Ada"}, "b": {"name": "Bob"}}
+    store.delete("resumes", "a")
+    assert store.get("resumes", "a") is None
+    assert store.get("other", "b") is None
+
+
+def test_concurrent_increments_are_atomic(store):
+    def bump():
+        for _ in range(50):
+            store.incr("xp", "user")
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.get("xp", "user") == 200
+
+
+def test_sqlite_writes_survive_reopen(tmp_path):
+    path = tmp_path / "sessions.sqlite"
+    store = SQLiteStore(path, ttl=None)
+    store.set("resumes", "a", {"skills": ["python"]})
+    store.close()
+    reopened = SQLiteStore(path, ttl=None)
+    assert reopened.get("resumes", "a") == {"skills": ["python"]}
+    reopened.close()
+
+
+def test_memory_store_is_bounded_per_namespace():
+    store = MemoryStore(max_entries=2, ttl=None)
+    for key in "abc":
+        store.set("resumes", key, key)
+    assert store.get_many("resumes", "abc") == {"b": "b", "c": "c"}
+
+
+def test_sqlite_store_evicts_least_recently_written_rows(tmp_path):
+    store = SQLiteStore(tmp_path / "sessions.sqlite", ttl=None, max_entries=2)
+    for key in "abc":
+        store.set("resumes", key, key)
+    store.set("other", "x", 1)
+    store.purge()
+    assert store.get_many("resumes", "abc") == {"b": "b", "c": "c"}
+    assert store.get("other", "x") == 1
+    store.close()
+
+
+def test_sqlite_write_through_namespace_is_visible_to_other_workers(tmp_path):
+    path = tmp_path / "sessions.sqlite"
+    writer = SQLiteStore(path, ttl=None, flush_interval=60, write_through=["resumes"])
+    reader = SQLiteStore(path, ttl=None, flush_interval=60)
+    writer.set("resumes", "a", {"name": "Ada"})
+    writer.set("user_progress", "u", {"xp": 10})
+    assert reader.get("resumes", "a") == {"name": "Ada"}
+    assert reader.get("user_progress", "u") is None
+    writer.close()
+    reader.close()
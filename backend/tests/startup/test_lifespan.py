@@ -0,0 +1,38 @@
+import asyncio
+
+import main
+
+
+def test_lifespan_starts_warmups_and_releases_resources_on_shutdown(monkeypatch):
+    events = []
+
+    async def fake_run_warmup():
+        events.append("warmup")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            events.append("warmup_cancelled")
+            raise
+
+    async def fake_warm_up_quizzes():
+        events.append("quiz_warmup")
+
+    async def fake_close_http_clients():
+        events.append("http_clients")
+
+    monkeypatch.setattr(main, "run_warmup", fake_run_warmup)
+    monkeypatch.setattr(main, "warm_up_quizzes", fake_warm_up_quizzes)
+    monkeypatch.setattr(main.settings, "QUIZ_WARMUP_ON_STARTUP", True)
+    monkeypatch.setattr(main, "shutdown_parsing_pool", lambda: events.append("parsing_pool"))
+    monkeypatch.setattr(main, "close_session_store", lambda: events.append("session_store"))
+    monkeypatch.setattr(main, "close_http_clients", fake_close_http_clients)
+
+    async def run():
+        async with main.app.router.lifespan_context(main.app):
+            await asyncio.sleep(0)
+            assert sorted(events) == ["quiz_warmup", "warmup"]
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert events[2:] == ["parsing_pool", "session_store", "http_clients", "warmup_cancelled"]
+    assert not main._background_tasks
@@ -0,0 +1,57 @@
+import asyncio
+
+from benchmarks.import_profile import parse_importtime, summarize
+from warmup import is_ready, readiness, run_warmup
+
+
+def test_ready_only_after_every_step_succeeds():
+    calls = []
+
+    async def async_step():
+        calls.append("async")
+
+    state = asyncio.run(run_warmup([("sync", lambda: calls.append("sync")), ("async", async_step)]))
+    assert calls == ["sync", "async"]
+    assert state["ready"] and is_ready()
+    assert set(state["steps"]) == {"sync", "async"}
+
+
+def test_failed_step_is_recorded_and_keeps_the_process_unready():
+    def broken():
+        raise RuntimeError("index missing")
+
+    state = asyncio.run(run_warmup([("course_index", broken), ("quiz_pool", lambda: None)], max_attempts=2,
+                                   retry_base_s=0.01))
+    assert not state["ready"] and state["status"] == "failed"
+    assert state["attempts"] == 2
+    assert state["errors"] == {"course_index": "index missing"}
+    assert "quiz_pool" in readiness()["steps"]
+
+
+def test_step_that_fails_once_is_retried_until_ready():
+    calls = []
+
+    def flaky():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("session store locked")
+
+    state = asyncio.run(run_warmup([("session_store", flaky), ("quiz_pool", lambda: calls.append("quiz"))],
+                                   retry_base_s=0.01))
+    assert state["ready"] and is_ready() and state["status"] == "ready"
+    assert state["attempts"] == 2 and state["errors"] == {}
+    # Only the failed step runs again
+    assert calls == [0, "quiz", 2]
+
+
+def test_importtime_report_groups_by_package():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     numpy.core",
+        "import time:       400 |        500 |   numpy",
+        "import time:        50 |        550 | settings",
+    ])
+    report = summarize(parse_importtime(stderr), "settings", top=5)
+    assert report["total_ms"] == 0.6
+    assert report["packages_ms"] == {"numpy": 0.5}
+    assert report["backend_modules_ms"] == {"settings": 0.6}
@@ -0,0 +1,34 @@
+import pytest
+
+from telemetry import CACHE_LOOKUPS, LLM_TOKENS, STAGE_SECONDS, current_span, record_cache, render_metrics, span
+
+
+def _count(stage, name, status):
+    return next(
+        s.value for m in STAGE_SECONDS.collect() for s in m.samples
+        if s.name.endswith("_count") and s.labels == {"stage": stage, "name": name, "status": status}
+    )
+
+
+def test_span_records_latency_tokens_and_cache_attributes():
+    with span("agent.run", "SpanTest") as test_span:
+        assert current_span() is test_span
+        record_cache("agent", hits=1, misses=2)
+        test_span.set(tokens_in=120, tokens_out=30)
+    assert current_span() is None
+    assert test_span.attributes["agent_cache_hits"] == 1
+    assert test_span.attributes["agent_cache_misses"] == 2
+    assert _count("agent.run", "SpanTest", "ok") == 1
+    assert LLM_TOKENS.labels("agent.run", "SpanTest", "in")._value.get() == 120
+    assert LLM_TOKENS.labels("agent.run", "SpanTest", "out")._value.get() == 30
+    assert CACHE_LOOKUPS.labels("agent", "miss")._value.get() >= 2
+
+
+def test_span_marks_errors_and_metrics_render():
+    with pytest.raises(ValueError):
+        with span("pdf.parse", "span-error-test"):
+            raise ValueError("broken pdf")
+    assert _count("pdf.parse", "span-error-test", "error") == 1
+    body, content_type = render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b'qhack_stage_seconds_count{name="span-error-test",stage="pdf.parse",status="error"} 1.0' in body
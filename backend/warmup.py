@@ -0,0 +1,106 @@
+"""
+Startup warm-up and the readiness state behind GET /ready.
+- run_warmup() runs once, in the background after startup: constructs the OpenAI clients, loads the
+  course and module indexes, opens the embedding cache and session store, loads the quiz pool and
+  starts the PDF parsing workers, so the first requests don't pay for any of it.
+- Each step is timed (and traced as a "warmup" span); a failed step is logged, recorded and retried
+  in the background with capped exponential backoff (WARMUP_RETRY_BASE_S .. WARMUP_RETRY_MAX_S) until
+  it succeeds, so a dependency that comes up late (index, disk, network) doesn't leave the process
+  unready for good. The process is ready once every step has succeeded; it is "failed" only when
+  WARMUP_MAX_ATTEMPTS is set and used up.
+- readiness(): {"ready", "status": "starting" | "retrying" | "ready" | "failed", "attempts",
+  "steps": {name: seconds}, "errors"}.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from course_retriever import get_course_retriever
+from embeddings.cache import get_embedding_cache
+from embeddings.loader import get_quiz_pool
+from openai_clients import get_openai_client, get_sync_openai_client
+from parsing_pool import warm_up_parsing_pool
+from storage import get_session_store
+import settings
+from telemetry import span
+
+_STATE: Dict = {"status": "starting", "attempts": 0, "steps": {}, "errors": {}, "started": None, "finished": None}
+
+
+def _openai_clients() -> None:
+    get_openai_client()
+    get_sync_openai_client()
+
+
+# (name, step); sync steps run in a worker thread so the event loop keeps serving /ready and /metrics
+STEPS: List[Tuple[str, Callable]] = [
+    ("openai_clients", _openai_clients),
+    ("embedding_cache", get_embedding_cache),
+    ("course_index", lambda: get_course_retriever().warm_up()),
+    ("session_store", get_session_store),
+    ("quiz_pool", lambda: get_quiz_pool().refresh()),
+    ("parsing_pool", warm_up_parsing_pool),
+]
+
+
+async def _run_step(step: Callable) -> None:
+    if asyncio.iscoroutinefunction(step):
+        await step()
+    else:
+        await asyncio.to_thread(step)
+
+
+async def run_warmup(
+    steps: Optional[List[Tuple[str, Callable]]] = None,
+    max_attempts: Optional[int] = None,
+    retry_base_s: Optional[float] = None,
+    retry_max_s: Optional[float] = None,
+) -> Dict:
+    """
+    Runs every warm-up step in order, then retries the failed ones with backoff until they succeed
+    (or max_attempts passes are used up; 0 = no limit); returns the readiness state.
+    """
+    max_attempts = settings.WARMUP_MAX_ATTEMPTS if max_attempts is None else max_attempts
+    retry_base_s = settings.WARMUP_RETRY_BASE_S if retry_base_s is None else retry_base_s
+    retry_max_s = settings.WARMUP_RETRY_MAX_S if retry_max_s is None else retry_max_s
+    _STATE.update(status="starting", attempts=0, steps={}, errors={}, started=time.time(), finished=None)
+    pending = list(steps or STEPS)
+    while True:
+        _STATE["attempts"] += 1
+        failed = []
+        for name, step in pending:
+            started = time.perf_counter()
+            try:
+                with span("warmup", name):
+                    await _run_step(step)
+                _STATE["errors"].pop(name, None)
+            except Exception as e:
+                _STATE["errors"][name] = str(e)
+                failed.append((name, step))
+                print(f"[WARMUP] {name} failed (attempt {_STATE['attempts']}): {e}")
+            _STATE["steps"][name] = round(time.perf_counter() - started, 3)
+        pending = failed
+        if not pending or (max_attempts and _STATE["attempts"] >= max_attempts):
+            break
+        delay = min(retry_max_s, retry_base_s * 2 ** (_STATE["attempts"] - 1))
+        _STATE["status"] = "retrying"
+        print(f"[WARMUP] Retrying {', '.join(name for name, _ in pending)} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    _STATE["finished"] = time.time()
+    _STATE["status"] = "failed" if _STATE["errors"] else "ready"
+    print(f"[WARMUP] {_STATE['status']} in {_STATE['finished'] - _STATE['started']:.1f}s: {_STATE['steps']}")
+    return readiness()
+
+
+def is_ready() -> bool:
+    return _STATE["status"] == "ready"
+
+
+def readiness() -> Dict:
+    return {
+        "ready": is_ready(),
+        "status": _STATE["status"],
+        "attempts": _STATE["attempts"],
+        "steps": dict(_STATE["steps"]),
+        "errors": dict(_STATE["errors"]),
+    }